@@ -0,0 +1,76 @@
+"""Compressed input benchmark
+
+Compares parsing gzip, bz2, xz and zip compressed files, decompressed while
+they are read, against parsing the pre-decompressed file.
+
+Usage:
+    python3 benchmarks/bench_compressed.py [people-count]
+"""
+import bz2
+import gzip
+import lzma
+import os
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gedcom"))
+
+import gedcom  # noqa: E402
+from generate import write_tree  # noqa: E402
+
+REPEATS = 3
+
+
+def best_time(func, *args):
+    """returns the fastest of REPEATS calls of func in seconds
+    """
+    times = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def compress(filename, compressed, opener):
+    """write a compressed copy of a file
+    """
+    with open(filename, "rb") as source, opener(compressed, "wb") as out:
+        shutil.copyfileobj(source, out, 1 << 20)
+
+
+def main():
+    """run the benchmark
+    """
+    people_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "bench.ged")
+        write_tree(filename, people_count)
+        size = os.path.getsize(filename)
+        inputs = [("plain", filename)]
+        for name, opener in (("gzip", gzip.open), ("bz2", bz2.open), ("xz", lzma.open)):
+            compressed = filename + "." + name
+            compress(filename, compressed, opener)
+            inputs.append((name, compressed))
+        archive = os.path.join(tmp_dir, "bench.zip")
+        with zipfile.ZipFile(archive, "w", zipfile.ZIP_DEFLATED) as out:
+            out.write(filename, "bench.ged")
+            out.write(filename, "copy.ged")
+        inputs.append(("zip", archive + "!bench.ged"))
+
+        print("people:     %i (%.1f MB uncompressed)" % (people_count, size / 1e6))
+        plain_time = None
+        for name, path in inputs:
+            elapsed = best_time(gedcom.load_file, path)
+            if plain_time is None:
+                plain_time = elapsed
+            on_disk = os.path.getsize(path.split("!")[0])
+            print("%-6s %6.1f MB on disk  parse %.3f s  %5.1f MB/s  %.2fx plain" % (
+                name, on_disk / 1e6, elapsed, size / 1e6 / elapsed, elapsed / plain_time))
+
+
+if __name__ == "__main__":
+    main()
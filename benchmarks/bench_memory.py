@@ -0,0 +1,81 @@
+"""Memory benchmark of string interning
+
+Parses a generated gedcom file in two fresh processes, once as usual and once
+with the interning of xrefs, name parts and repeated fact values turned off,
+and compares the memory held by the parsed tree.
+
+Usage:
+    python3 benchmarks/bench_memory.py [people-count]
+"""
+import gc
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gedcom"))
+
+from generate import write_tree  # noqa: E402
+
+
+def resident_bytes():
+    """returns the resident memory of this process, the peak where /proc isn't available
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except IOError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def measure(filename, interned):
+    """parse a file and print the people count and the bytes it holds, run in the child process
+    """
+    import families
+    import gedcom
+    import people
+    import person
+    import record_builder
+    if not interned:
+        # str() of a str is the same object, so nothing is shared any more
+        for module in (people, families, person, record_builder):
+            module.intern = str
+    gc.collect()
+    before = resident_bytes()
+    _, peeps, fam = gedcom.load_file(filename)
+    gc.collect()
+    print(len(peeps.individuals), resident_bytes() - before)
+
+
+def run_child(filename, interned):
+    """returns (people count, bytes held) measured in a fresh interpreter
+    """
+    output = subprocess.check_output([sys.executable, os.path.abspath(__file__), "--child", filename,
+                                      "intern" if interned else "plain"])
+    people_count, held = output.split()
+    return int(people_count), int(held)
+
+
+def main():
+    """run the benchmark
+    """
+    people_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "bench.ged")
+        write_tree(filename, people_count)
+
+        parsed, plain = run_child(filename, False)
+        _, interned = run_child(filename, True)
+        print("people:       %i" % parsed)
+        print("not interned: %8.1f MB" % (plain / 1e6))
+        print("interned:     %8.1f MB (%.1f MB saved, %.0f%%, %.0f bytes per person)" % (
+            interned / 1e6, (plain - interned) / 1e6, 100.0 * (plain - interned) / plain,
+            float(plain - interned) / parsed))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 4 and sys.argv[1] == "--child":
+        measure(sys.argv[2], sys.argv[3] == "intern")
+    else:
+        main()
@@ -0,0 +1,50 @@
+"""Snapshot cache benchmark
+
+Compares parsing a generated gedcom file against loading its sidecar snapshot.
+
+Usage:
+    python3 benchmarks/bench_snapshot.py [people-count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gedcom"))
+
+import gedcom  # noqa: E402
+import snapshot  # noqa: E402
+from generate import write_tree  # noqa: E402
+
+
+def timed(func, *args):
+    """returns the result and elapsed seconds of calling func
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """run the benchmark
+    """
+    people_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "bench.ged")
+        write_tree(filename, people_count)
+
+        _, parse_time = timed(gedcom.load_file, filename, False)
+        _, first_time = timed(gedcom.load_file, filename, True)
+        cached, load_time = timed(snapshot.load_snapshot, filename)
+        assert cached is not None
+
+        print("people:                 %i" % len(cached[1].individuals))
+        print("gedcom size:            %.1f MB" % (os.path.getsize(filename) / 1e6))
+        print("snapshot size:          %.1f MB" % (os.path.getsize(snapshot.snapshot_path(filename)) / 1e6))
+        print("parse:                  %.3f s" % parse_time)
+        print("parse + write snapshot: %.3f s" % first_time)
+        print("load snapshot:          %.3f s (%.1fx faster)" % (load_time, parse_time / load_time))
+
+
+if __name__ == "__main__":
+    main()
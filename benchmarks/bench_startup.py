@@ -0,0 +1,40 @@
+"""Startup benchmark for the gedcom program
+
+Times complete interpreter runs of gedcom.py in validation only mode and
+with the full report tables, which is what batch jobs pay per file.
+
+Usage:
+    python3 benchmarks/bench_startup.py [runs]
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PROGRAM = os.path.join(ROOT, "gedcom", "gedcom.py")
+SAMPLE = os.path.join(ROOT, "samples", "sample_01.ged")
+
+
+def time_runs(args, runs):
+    """returns the best and mean wall clock time in ms of running the program
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, PROGRAM] + args, stdout=subprocess.DEVNULL, check=True)
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), sum(timings) / len(timings)
+
+
+def main():
+    """run the benchmark
+    """
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    for label, args in (("validate only", ["--validate-only", SAMPLE]), ("full report", [SAMPLE])):
+        best, mean = time_runs(args, runs)
+        print("%-14s best %7.1f ms  mean %7.1f ms  (%i runs)" % (label, best, mean, runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Writer benchmark
+
+Compares writing a parsed tree back out against parsing it.
+
+Usage:
+    python3 benchmarks/bench_writer.py [people-count]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "gedcom"))
+
+import gedcom  # noqa: E402
+import writer  # noqa: E402
+from generate import write_tree  # noqa: E402
+
+
+def timed(func, *args, **kwargs):
+    """returns the result and elapsed seconds of calling func
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    """run the benchmark
+    """
+    people_count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        filename = os.path.join(tmp_dir, "bench.ged")
+        output = os.path.join(tmp_dir, "written.ged")
+        write_tree(filename, people_count)
+
+        (_, peeps, fam), parse_time = timed(gedcom.load_file, filename, keep_extras=True)
+        _, write_time = timed(writer.write_file, output, peeps, fam)
+
+        print("people:       %i" % len(peeps.individuals))
+        print("written size: %.1f MB" % (os.path.getsize(output) / 1e6))
+        print("parse:        %.3f s" % parse_time)
+        print("write:        %.3f s (%.1fx faster than parsing, %.0f records/s)" % (
+            write_time, parse_time / write_time, (len(peeps.individuals) + len(fam.families)) / write_time))
+
+
+if __name__ == "__main__":
+    main()
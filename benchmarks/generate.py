@@ -0,0 +1,65 @@
+"""Synthetic GEDCOM generator used by the benchmarks
+
+Writes a lineage-linked file of families with a husband, a wife and three
+children each, so every person has dates, birth places, names and family links.
+
+Usage:
+    python3 benchmarks/generate.py people-count output.ged
+"""
+import random
+import sys
+
+SURNAMES = ["Smith", "Tiger", "Mouse", "Hemmingway", "Ocarina", "Dangerfield", "Agrabah", "Green"]
+GIVEN_NAMES = ["Bob", "Alice", "Link", "Zelda", "Ernest", "Margo", "Donald", "Roomba", "Tony", "Gumby"]
+PLACES = ["Hoboken, New Jersey, USA", "Springfield, Illinois, USA", "Cork, Ireland", "Hyrule Castle, Hyrule",
+          "Napoli, Campania, Italy", "Dublin, Ireland"]
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+CHILDREN_PER_FAMILY = 3
+
+
+def _date(rand, start_year):
+    """random gedcom date string in the year range given
+    """
+    return "%i %s %i" % (rand.randint(1, 28), rand.choice(MONTHS), rand.randint(start_year, start_year + 20))
+
+
+def write_tree(filename, people_count, seed=555):
+    """write a synthetic gedcom file with roughly people_count individuals
+
+    Args:
+        filename (string): output path
+        people_count (int): number of individuals to write
+        seed (int): random seed so runs are repeatable
+    """
+    rand = random.Random(seed)
+    family_size = CHILDREN_PER_FAMILY + 2
+    with open(filename, "w") as out:
+        out.write("0 HEAD\n1 GEDC\n2 VERS 5.5.1\n2 FORM LINEAGE-LINKED\n1 CHAR UTF-8\n")
+        for fam_num in range(1, people_count // family_size + 1):
+            fam_id = "@F%i@" % fam_num
+            surname = rand.choice(SURNAMES)
+            first = (fam_num - 1) * family_size + 1
+            husb_id = "@I%i@" % first
+            wife_id = "@I%i@" % (first + 1)
+            child_ids = ["@I%i@" % (first + 2 + idx) for idx in range(CHILDREN_PER_FAMILY)]
+
+            for person_id, gender, year in [(husb_id, "M", 1900), (wife_id, "F", 1900)]:
+                out.write("0 %s INDI\n1 NAME %s /%s/\n1 SEX %s\n1 BIRT\n2 DATE %s\n2 PLAC %s\n1 FAMS %s\n" %
+                          (person_id, rand.choice(GIVEN_NAMES), surname, gender, _date(rand, year),
+                           rand.choice(PLACES), fam_id))
+            for child_id in child_ids:
+                out.write("0 %s INDI\n1 NAME %s /%s/\n1 SEX %s\n1 BIRT\n2 DATE %s\n2 PLAC %s\n1 FAMC %s\n" %
+                          (child_id, rand.choice(GIVEN_NAMES), surname, rand.choice("MF"),
+                           _date(rand, 1945), rand.choice(PLACES), fam_id))
+
+            out.write("0 %s FAM\n1 HUSB %s\n1 WIFE %s\n1 MARR\n2 DATE %s\n" %
+                      (fam_id, husb_id, wife_id, _date(rand, 1925)))
+            for child_id in child_ids:
+                out.write("1 CHIL %s\n" % child_id)
+        out.write("0 TRLR\n")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("Usage: " + sys.argv[0] + " people-count output.ged")
+    write_tree(sys.argv[2], int(sys.argv[1]))
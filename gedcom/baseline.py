@@ -0,0 +1,120 @@
+"""Baseline
+Known validation findings that aren't reported again
+
+A baseline file is written from the messages of a run and lists one finding
+per line as user story, individual or family id and a fingerprint of the
+message text, separated by tabs.  Loaded into a set, every new message is
+looked up once and dropped when it is known, so only the new findings are
+reported.
+
+With rule skipping on, a rule isn't run at all for an individual or family the
+baseline has findings of that rule's user stories for.  New findings of a
+skipped rule for that individual or family aren't found either.  Rules report
+one user story each, the family date checks that report several, some of them
+under the spouses' ids, are skipped one user story and id at a time.
+"""
+import hashlib
+
+HEADER = "# gedcom validation baseline 1"
+
+
+def fingerprint(message):
+    """returns the fingerprint of a message text, 16 hex digits
+
+    Args:
+        message (string): formatted message
+    Returns:
+        string
+    """
+    return hashlib.blake2b(message.encode("utf-8"), digest_size=8).hexdigest()
+
+
+class Baseline(object):
+    """Baseline
+    Set of known findings keyed on (user story, id, fingerprint)
+
+    Args:
+        keys (iterable): (user story, id, fingerprint) of the known findings
+        record (bool): remember the findings of this run, known or new, needed by save
+    """
+
+    def __init__(self, keys=(), record=False):
+        self._keys = set(keys)
+        # (user story, id) with known findings, for skipping rules
+        self._entities = {(story, record_id) for story, record_id, _ in self._keys}
+        self._found = set() if record else None
+        # (user story, id) of the rules skipped, their known findings are still current
+        self._skipped = set()
+        self._suppressed = 0
+
+    @classmethod
+    def load(cls, filename, record=False):
+        """read a baseline file
+
+        Args:
+            filename (string): baseline written by save
+            record (bool): see Baseline
+        Returns:
+            Baseline
+        Raises:
+            IOError: when the file can't be read
+            ValueError: when a line isn't a user story, id and fingerprint separated by tabs
+        """
+        keys = []
+        with open(filename, encoding="utf-8") as lines:
+            for number, line in enumerate(lines, 1):
+                if line.startswith("#") or not line.strip():
+                    continue
+                key = tuple(line.rstrip("\r\n").split("\t"))
+                if len(key) != 3:
+                    raise ValueError("%s line %i: expected user story, id and fingerprint separated by tabs"
+                                     % (filename, number))
+                keys.append(key)
+        return cls(keys, record)
+
+    def check(self, user_story, user_id, message):
+        """look up a finding, counted as suppressed when it is known
+
+        Args:
+            user_story (string): user story of the message
+            user_id (string): id of the individual or family
+            message (string): formatted message
+        Returns:
+            bool True when the finding is in the baseline
+        """
+        key = (user_story, user_id, fingerprint(message))
+        if self._found is not None:
+            self._found.add(key)
+        if key in self._keys:
+            self._suppressed += 1
+            return True
+        return False
+
+    def has_findings(self, user_stories, user_id):
+        """returns whether the baseline has findings of any of the user stories for an id.
+        The rule of the user stories is skipped when it does
+        """
+        for story in user_stories:
+            if (story, user_id) in self._entities:
+                if self._found is not None:
+                    self._skipped.update((known, user_id) for known in user_stories)
+                return True
+        return False
+
+    def get_suppressed_count(self):
+        """returns the number of findings dropped as known
+        """
+        return self._suppressed
+
+    def save(self, filename):
+        """write the findings of this run, known and new, as a baseline file.
+        The known findings of skipped rules are kept
+
+        Args:
+            filename (string): file written
+        """
+        with open(filename, "w", encoding="utf-8") as out:
+            out.write(HEADER + "\n")
+            skipped = {key for key in self._keys if key[:2] in self._skipped}
+            for key in sorted(self._found | skipped):
+                out.write("\t".join(key) + "\n")
@@ -0,0 +1,208 @@
+"""Batch
+Validates many gedcom files in a pool of worker processes
+
+Each worker parses and validates files in process with the same Tags, People,
+Families and ValidationMessages pipeline as gedcom.py, so there is no interpreter
+start per file.  A summary line is printed for every file as it finishes followed
+by an aggregate report.
+
+Usage:
+    python3 gedcom.py batch [--workers N] [--recover] [--as-of YYYY-MM-DD] directory-or-glob-or-file ...
+"""
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from reader import expand_members
+from tags import TagsError
+import gedcom
+
+USAGE = "Usage: " + sys.argv[0] + " batch [--workers N] [--recover] [--as-of YYYY-MM-DD] directory-or-glob-or-file ..."
+# file endings picked up in directories, zip archives are expanded into their gedcom members
+GEDCOM_EXTENSIONS = (".ged", ".ged.gz", ".ged.bz2", ".ged.xz", ".zip")
+
+
+def collect_files(patterns):
+    """expand directories (recursively, gedcom files and archives only), globs and
+    file names.  Zip archives are expanded into archive.zip!member.ged names
+
+    Args:
+        patterns (string[]): directories, glob patterns or file names
+    Returns:
+        string[] sorted unique file names
+    """
+    files = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for root, _, names in os.walk(pattern):
+                files.update(os.path.join(root, name) for name in names
+                             if name.lower().endswith(GEDCOM_EXTENSIONS))
+        elif glob.has_magic(pattern):
+            files.update(name for name in glob.glob(pattern, recursive=True) if os.path.isfile(name))
+        else:
+            files.add(pattern)
+    members = set()
+    for filename in files:
+        if os.path.isfile(filename):
+            members.update(expand_members(filename))
+        else:
+            # reported as unreadable by validate_file
+            members.add(filename)
+    return sorted(members)
+
+
+def validate_file(filename, recover=False, as_of=None):
+    """parse and validate a single file.  Runs inside the worker processes so it
+    only returns plain data
+
+    Args:
+        filename (string): gedcom file
+        recover (bool): count parse errors as PARSE messages instead of failing the file
+        as_of (datetime): date ages and the current time checks are taken at, None for now
+    Returns:
+        dict with the file name, people and family counts, message counts per user story,
+        parse and validate times in seconds and an error string when the file couldn't be read
+        or validated
+    """
+    result = {"file": filename, "people": 0, "families": 0, "counts": {},
+              "parse_time": 0.0, "validate_time": 0.0, "error": None}
+    start = time.perf_counter()
+    try:
+        validation_msgs, peeps, fam = gedcom.load_file(filename, recover=recover, as_of=as_of)
+        parsed = time.perf_counter()
+        fam.validate()
+        peeps.validate()
+    except IOError as err:
+        result["error"] = "could not read file: " + str(err)
+        return result
+    except TagsError as err:
+        result["error"] = str(err)
+        return result
+    except ValueError as err:
+        # invalid dates raise from strptime
+        result["error"] = str(err)
+        return result
+    except Exception as err:
+        # a rule failing on unexpected data only fails this file, not the batch
+        result["error"] = "%s: %s" % (type(err).__name__, err)
+        return result
+
+    result["parse_time"] = parsed - start
+    result["validate_time"] = time.perf_counter() - parsed
+    result["people"] = len(peeps.individuals)
+    result["families"] = len(fam.families)
+    result["counts"] = validation_msgs.get_counts()
+    return result
+
+
+def format_counts(counts):
+    """format message counts per user story as US01=2 US11=1
+    """
+    return " ".join("%s=%i" % (story, counts[story]) for story in sorted(counts))
+
+
+def print_file_summary(result):
+    """print the one line summary of a validated file
+    """
+    if result["error"] is not None:
+        print("%s\tERROR\t%s" % (result["file"], result["error"]))
+        return
+    print("%s\tpeople=%i families=%i messages=%i parse=%.1fms validate=%.1fms\t%s" % (
+        result["file"], result["people"], result["families"], sum(result["counts"].values()),
+        result["parse_time"] * 1000, result["validate_time"] * 1000, format_counts(result["counts"])))
+
+
+def print_aggregate(results, elapsed):
+    """print the totals over all validated files
+    """
+    totals = {}
+    failed = [result for result in results if result["error"] is not None]
+    for result in results:
+        for story, count in result["counts"].items():
+            totals[story] = totals.get(story, 0) + count
+
+    print("")
+    print("Batch Summary")
+    print("files: %i ok: %i errors: %i" % (len(results), len(results) - len(failed), len(failed)))
+    print("people: %i families: %i messages: %i" % (
+        sum(result["people"] for result in results), sum(result["families"] for result in results),
+        sum(totals.values())))
+    print("parse: %.2fs validate: %.2fs wall: %.2fs (%.1f files/s)" % (
+        sum(result["parse_time"] for result in results), sum(result["validate_time"] for result in results),
+        elapsed, len(results) / elapsed if elapsed else 0.0))
+    for story in sorted(totals):
+        print("%s\t%i" % (story, totals[story]))
+
+
+def run_batch(filenames, workers=None, recover=False, as_of=None):
+    """validate files across a process pool, printing each summary as it finishes
+
+    Args:
+        filenames (string[]): gedcom files
+        workers (int): number of worker processes, defaults to the cpu count
+        recover (bool): collect parse errors instead of failing files
+        as_of (datetime): date of the run in every worker, None for the current time
+    Returns:
+        dict[] results of validate_file in completion order
+    """
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(validate_file, filename, recover, as_of): filename for filename in filenames}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as err:
+                # the worker itself failed, e.g. it was killed
+                result = {"file": futures[future], "people": 0, "families": 0, "counts": {},
+                          "parse_time": 0.0, "validate_time": 0.0, "error": "%s: %s" % (type(err).__name__, err)}
+            print_file_summary(result)
+            sys.stdout.flush()
+            results.append(result)
+    print_aggregate(results, time.perf_counter() - start)
+    return results
+
+
+def run(argv):
+    """batch command line entry point
+
+    Args:
+        argv (string[]): arguments after "batch"
+    Returns:
+        int exit status, 1 when any file could not be validated
+    """
+    workers = None
+    recover = False
+    as_of = None
+    patterns = []
+    args = iter(argv)
+    for arg in args:
+        if arg in ("--workers", "-j"):
+            try:
+                workers = int(next(args))
+            except (StopIteration, ValueError):
+                sys.exit(USAGE)
+            if workers < 1:
+                sys.exit(USAGE)
+        elif arg == "--recover":
+            recover = True
+        elif arg == "--as-of":
+            as_of = gedcom.parse_as_of(next(args, ""))
+            if as_of is None:
+                sys.exit(USAGE)
+        elif arg.startswith("-"):
+            sys.exit(USAGE)
+        else:
+            patterns.append(arg)
+
+    filenames = collect_files(patterns)
+    if not filenames:
+        sys.exit(USAGE)
+
+    results = run_batch(filenames, workers, recover, as_of)
+    return 1 if any(result["error"] is not None for result in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run(sys.argv[1:]))
@@ -0,0 +1,383 @@
+"""Columnar
+Memory mapped columnar snapshot of people and families for read heavy workers
+
+The file is a header, a section table and 8 byte aligned sections of fixed width
+integer columns plus one string heap.  Opening it only maps the file, nothing is
+unpickled or copied.  Every column is available as a memoryview (usable directly
+with numpy.frombuffer) and People/Families lookups are served from the mapped
+buffers, building a Person or Family object only for the record asked for
+(once, later lookups return the same object).
+
+Dates are stored as proleptic Gregorian ordinals with 0 meaning no date, strings
+and xrefs as indexes into the string heap and family/person links as start
+offsets into a shared link column.  Source spans are stored as start and end
+byte offset pairs, NO_VALUE when a record has no span.
+"""
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Mapping
+from datetime import datetime
+from family import Family
+from families import Families
+from people import People
+from person import Person
+from record_index import natural_key
+
+COLUMNAR_VERSION = 3
+MAGIC = b"GEDCOL\0\0"
+# magic, version, byte order (0 little, 1 big), section count
+HEADER = struct.Struct("<8sIII")
+# name, array typecode, file offset, item count
+SECTION = struct.Struct("<8s4sQQ")
+ALIGNMENT = 8
+NO_VALUE = -1
+GENDER_CODES = {"": 0, "M": 1, "F": 2}
+GENDERS = ("", "M", "F")
+
+
+class ColumnarError(Exception):
+    """ColumnarError raised when a file is not a columnar snapshot this version can read
+
+    Args:
+        message (str): error message
+    """
+
+
+class _StringTable(object):
+    """builds the string heap while writing, each distinct string is stored once
+    """
+
+    def __init__(self):
+        self._index = {}
+        self.heap = bytearray()
+        self.offsets = array("q", [0])
+
+    def add(self, value):
+        """returns the index of the string in the heap, NO_VALUE for None
+        """
+        if value is None:
+            return NO_VALUE
+        idx = self._index.get(value)
+        if idx is None:
+            idx = len(self._index)
+            self._index[value] = idx
+            self.heap += value.encode("utf-8")
+            self.offsets.append(len(self.heap))
+        return idx
+
+
+def _ordinal(date):
+    """returns the date ordinal or 0 when there is no date
+    """
+    return 0 if date is None else date.toordinal()
+
+
+def _add_span(column, span):
+    """append the start and end offsets of a source span, NO_VALUE for no span
+    """
+    column.extend((NO_VALUE, NO_VALUE) if span is None else span)
+
+
+def _sorted_rows(id_column, strings):
+    """row numbers ordered by the utf-8 bytes of their id so lookups can bisect
+    """
+    keys = [bytes(strings.heap[strings.offsets[idx]:strings.offsets[idx + 1]]) for idx in id_column]
+    return array("i", sorted(range(len(keys)), key=keys.__getitem__))
+
+
+def write_columnar(filename, peeps, fam):
+    """write people and families to a columnar snapshot file
+
+    Args:
+        filename (string): output path
+        peeps (People): people to write
+        fam (Families): families to write
+    """
+    strings = _StringTable()
+    cols = {}
+    for name in ("p_id", "p_name", "p_given", "p_surn", "p_sfx", "p_birth", "p_death", "p_famc", "p_fams",
+                 "f_id", "f_husb", "f_wife", "f_marr", "f_div", "f_chil"):
+        cols[name] = array("i")
+    cols["p_gender"] = array("b")
+    for name in ("p_famc_o", "p_fams_o", "f_chil_o"):
+        cols[name] = array("q", [0])
+    cols["p_span"] = array("q")
+    cols["f_span"] = array("q")
+
+    for person in peeps.individuals.values():
+        cols["p_id"].append(strings.add(person.get_person_id()))
+        cols["p_name"].append(strings.add(person.get_name()))
+        cols["p_given"].append(strings.add(person.get_given_name()))
+        cols["p_surn"].append(strings.add(person.get_surname()))
+        cols["p_sfx"].append(strings.add(person.get_name_suffix()))
+        cols["p_gender"].append(GENDER_CODES.get(person.get_gender(), 0))
+        cols["p_birth"].append(_ordinal(person.get_birth_date()))
+        cols["p_death"].append(_ordinal(person.get_death_date()))
+        cols["p_famc"].extend(strings.add(fam_id) for fam_id in person.get_children_of_families())
+        cols["p_famc_o"].append(len(cols["p_famc"]))
+        cols["p_fams"].extend(strings.add(fam_id) for fam_id in person.get_spouse_of_families())
+        cols["p_fams_o"].append(len(cols["p_fams"]))
+        _add_span(cols["p_span"], person.get_source_span())
+
+    for family in fam.families.values():
+        cols["f_id"].append(strings.add(family.get_family_id()))
+        cols["f_husb"].append(strings.add(family.get_husband_id()))
+        cols["f_wife"].append(strings.add(family.get_wife_id()))
+        cols["f_marr"].append(_ordinal(family.get_married_date()))
+        cols["f_div"].append(_ordinal(family.get_divorced_date()))
+        cols["f_chil"].extend(strings.add(child_id) for child_id in family.get_children())
+        cols["f_chil_o"].append(len(cols["f_chil"]))
+        _add_span(cols["f_span"], family.get_source_span())
+
+    cols["p_order"] = _sorted_rows(cols["p_id"], strings)
+    cols["f_order"] = _sorted_rows(cols["f_id"], strings)
+    cols["s_offs"] = strings.offsets
+    cols["s_heap"] = array("B", bytes(strings.heap))
+
+    names = sorted(cols)
+    offset = HEADER.size + SECTION.size * len(names)
+    table = []
+    for name in names:
+        offset += -offset % ALIGNMENT
+        table.append(SECTION.pack(name.encode("ascii"), cols[name].typecode.encode("ascii"),
+                                  offset, len(cols[name])))
+        offset += len(cols[name]) * cols[name].itemsize
+
+    with open(filename, "wb") as out:
+        out.write(HEADER.pack(MAGIC, COLUMNAR_VERSION, int(sys.byteorder == "big"), len(names)))
+        out.write(b"".join(table))
+        for name in names:
+            out.write(b"\0" * (-out.tell() % ALIGNMENT))
+            cols[name].tofile(out)
+
+
+class ColumnarTree(object):
+    """ColumnarTree
+    Read only view of a columnar snapshot file mapped into memory
+
+    Args:
+        filename (string): path of the columnar snapshot
+    Attributes:
+        person_count (int): number of individuals
+        family_count (int): number of families
+    """
+
+    def __init__(self, filename):
+        with open(filename, "rb") as file_data:
+            try:
+                self._map = mmap.mmap(file_data.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as err:
+                raise ColumnarError("corrupt columnar snapshot " + filename + ": " + str(err))
+        self._buffer = memoryview(self._map)
+        self._columns = {}
+        try:
+            self._read_sections()
+        except (struct.error, ValueError, TypeError) as err:
+            self.close()
+            raise ColumnarError("corrupt columnar snapshot " + filename + ": " + str(err))
+        self.person_count = len(self._columns["p_id"])
+        self.family_count = len(self._columns["f_id"])
+
+    def _read_sections(self):
+        """map every section of the file to a typed memoryview
+        """
+        magic, version, big_endian, count = HEADER.unpack_from(self._buffer, 0)
+        if magic != MAGIC or version != COLUMNAR_VERSION:
+            raise ValueError("unsupported format or version")
+        if big_endian != int(sys.byteorder == "big"):
+            raise ValueError("written on a machine with another byte order")
+        for idx in range(count):
+            name, typecode, offset, length = SECTION.unpack_from(self._buffer, HEADER.size + idx * SECTION.size)
+            typecode = typecode.rstrip(b"\0").decode("ascii")
+            size = length * array(typecode).itemsize
+            self._columns[name.rstrip(b"\0").decode("ascii")] = self._buffer[offset:offset + size].cast(typecode)
+
+    def column(self, name):
+        """returns a column as a memoryview without copying it,
+        numpy.frombuffer(tree.column("p_birth"), dtype="i4") works on it as well
+        """
+        return self._columns[name]
+
+    def string(self, idx):
+        """returns the string at an index of the string heap, None for NO_VALUE
+        """
+        if idx == NO_VALUE:
+            return None
+        offs = self._columns["s_offs"]
+        return str(self._columns["s_heap"][offs[idx]:offs[idx + 1]], "utf-8")
+
+    def find_row(self, prefix, record_id):
+        """binary search the sorted id index for a record id
+
+        Args:
+            prefix (string): "p" for people or "f" for families
+            record_id (string): xref of the record
+        Returns:
+            int row number or None when the id is not in the file
+        """
+        key = record_id.encode("utf-8")
+        ids = self._columns[prefix + "_id"]
+        order = self._columns[prefix + "_order"]
+        offs = self._columns["s_offs"]
+        heap = self._columns["s_heap"]
+        low, high = 0, len(order)
+        while low < high:
+            mid = (low + high) // 2
+            str_idx = ids[order[mid]]
+            if heap[offs[str_idx]:offs[str_idx + 1]].tobytes() < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low < len(order):
+            row = order[low]
+            if self.string(ids[row]) == record_id:
+                return row
+        return None
+
+    def links(self, name, row):
+        """returns the strings of a link column (p_famc, p_fams, f_chil) for a row
+        """
+        offs = self._columns[name + "_o"]
+        values = self._columns[name]
+        return [self.string(values[idx]) for idx in range(offs[row], offs[row + 1])]
+
+    def date(self, name, row):
+        """returns the datetime stored in a date column for a row or None
+        """
+        ordinal = self._columns[name][row]
+        return datetime.fromordinal(ordinal) if ordinal else None
+
+    def span(self, prefix, row):
+        """returns the source span (start, end) of a row or None
+
+        Args:
+            prefix (string): "p" for people or "f" for families
+            row (int): row number
+        """
+        spans = self._columns[prefix + "_span"]
+        start = spans[row * 2]
+        return None if start == NO_VALUE else (start, spans[row * 2 + 1])
+
+    def person(self, row):
+        """build the Person stored at a row
+        """
+        person = Person(self.string(self._columns["p_id"][row]))
+        person.set_name(self.string(self._columns["p_name"][row]))
+        # the parts can come from GIVN and SURN lines instead of the name
+        person.set_name_parts(self.string(self._columns["p_given"][row]), self.string(self._columns["p_surn"][row]),
+                              self.string(self._columns["p_sfx"][row]))
+        person.set_gender(GENDERS[self._columns["p_gender"][row]])
+        person.set_date_value(self.date("p_birth", row), "birth")
+        person.set_date_value(self.date("p_death", row), "death")
+        for fam_id in self.links("p_famc", row):
+            person.add_children_of_family(fam_id)
+        for fam_id in self.links("p_fams", row):
+            person.add_spouse_of_family(fam_id)
+        span = self.span("p", row)
+        if span is not None:
+            person.set_source_span(*span)
+        return person
+
+    def family(self, row):
+        """build the Family stored at a row
+        """
+        family = Family(self.string(self._columns["f_id"][row]))
+        family.set_husband_id(self.string(self._columns["f_husb"][row]))
+        family.set_wife_id(self.string(self._columns["f_wife"][row]))
+        family.set_date_value(self.date("f_marr", row), "married")
+        family.set_date_value(self.date("f_div", row), "divorced")
+        for child_id in self.links("f_chil", row):
+            family.add_child(child_id)
+        span = self.span("f", row)
+        if span is not None:
+            family.set_source_span(*span)
+        return family
+
+    def close(self):
+        """release the memory map.  Records already built stay usable, columns
+        handed out by column() must not be used anymore
+        """
+        for view in self._columns.values():
+            view.release()
+        self._columns = {}
+        self._buffer.release()
+        self._map.close()
+
+
+class MappedRecords(Mapping):
+    """MappedRecords
+    Read only mapping of record id to Person or Family served off a ColumnarTree.
+    Drop in replacement for People.individuals and Families.families
+
+    Args:
+        tree (ColumnarTree): mapped snapshot
+        prefix (string): "p" for people or "f" for families
+    """
+
+    def __init__(self, tree, prefix):
+        self._tree = tree
+        self._prefix = prefix
+        self._build = tree.person if prefix == "p" else tree.family
+        # records built so far, a record is built once so the references
+        # resolved between records stay valid
+        self._built = {}
+        # ids in natural order, the mapping is read only so they are sorted once
+        self._ordered = None
+
+    def get_version(self):
+        """returns the number of changes, always 0 as the mapping is read only.
+        See RecordIndex.get_version
+        """
+        return 0
+
+    def get_ordered_ids(self):
+        """returns the ids in natural order, see record_index
+        Returns:
+            string[]
+        """
+        if self._ordered is None:
+            self._ordered = sorted(self, key=natural_key)
+        return self._ordered
+
+    def __getitem__(self, record_id):
+        record = self._built.get(record_id)
+        if record is not None:
+            return record
+        row = self._tree.find_row(self._prefix, record_id)
+        if row is None:
+            raise KeyError(record_id)
+        record = self._build(row)
+        self._built[record_id] = record
+        return record
+
+    def __contains__(self, record_id):
+        return self._tree.find_row(self._prefix, record_id) is not None
+
+    def __iter__(self):
+        ids = self._tree.column(self._prefix + "_id")
+        return (self._tree.string(idx) for idx in ids)
+
+    def __len__(self):
+        return len(self._tree.column(self._prefix + "_id"))
+
+
+def load_columnar(filename, validation_msgs):
+    """open a columnar snapshot as People and Families whose lookups go to the mapped file.
+    Parse time messages (US22) aren't stored in the snapshot, validation can be run as usual
+
+    Args:
+        filename (string): path of the columnar snapshot
+        validation_msgs (ValidationMessages): messages for validation runs
+    Returns:
+        (People, Families, ColumnarTree)
+    """
+    tree = ColumnarTree(filename)
+    peeps = People(validation_msgs)
+    fam = Families(peeps, validation_msgs)
+    peeps.set_families(fam)
+    validation_msgs.set_span_lookup(peeps.find_source_span)
+    peeps.individuals = MappedRecords(tree, "p")
+    fam.families = MappedRecords(tree, "f")
+    return peeps, fam, tree
@@ -0,0 +1,306 @@
+"""Daemon
+Keeps parsed and validated gedcom trees in memory and serves them over a local HTTP/JSON API
+
+Trees are loaded once at start up.  Requests are handled on threads against the
+loaded trees which are never modified after loading.  A reload builds a complete
+new tree and then replaces the old one, requests in flight keep the tree they started with.
+With --watch the files are polled and changed files are reloaded in the background.
+
+Usage:
+    python3 gedcom.py daemon [--port N] [--watch SECONDS] path-to-gedcom-file ...
+
+API (all responses are JSON):
+    GET  /trees                              loaded trees
+    GET  /trees/<name>/messages              validation messages
+    GET  /trees/<name>/people/<id>           single individual
+    GET  /trees/<name>/families/<id>         single family
+    GET  /trees/<name>/reports               report names
+    GET  /trees/<name>/reports/<report>      report table as text
+    POST /trees/<name>/reload                re-parse the tree's file
+"""
+import contextlib
+import io
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import unquote
+from loaded_tree import LoadedTree, tree_name
+from tags import TagsError
+from watcher import FileWatcher, TreeHolder
+
+USAGE = "Usage: " + sys.argv[0] + " daemon [--port N] [--watch SECONDS] path-to-gedcom-file ..."
+DEFAULT_PORT = 5550
+HOST = "127.0.0.1"
+
+# report name: (tree attribute, method name)
+REPORTS = {
+    "individuals": ("people", "print_all"),
+    "deceased": ("people", "us29_print_deceased"),
+    "single": ("people", "us31_print_single"),
+    "recent_births": ("people", "us35_print_recent_births"),
+    "recent_deaths": ("people", "us36_print_recent_deaths"),
+    "upcoming_birthdays": ("people", "us_38_print_upcoming_birthdays"),
+    "families": ("families", "print_all"),
+    "married": ("families", "us30_print_married"),
+    "multiple_births": ("families", "us32_print_multiple_births"),
+    "orphans": ("families", "us33_print_orphans"),
+    "big_age_diff": ("families", "us34_print_big_age_diff"),
+    "upcoming_anniversaries": ("families", "us_39_print_upcoming_anniversaries"),
+}
+
+
+def _date(value):
+    """iso date string of a datetime or None
+    """
+    return None if value is None else value.date().isoformat()
+
+
+def person_to_dict(person, as_of=None):
+    """returns a json friendly dict of a Person
+
+    Args:
+        person (Person): individual
+        as_of (datetime): date of the tree the age is taken at, see People.get_as_of
+    """
+    return {
+        "id": person.get_person_id(),
+        "name": person.get_name(),
+        "gender": person.get_gender(),
+        "birth": _date(person.get_birth_date()),
+        "death": _date(person.get_death_date()),
+        "alive": person.get_is_alive(),
+        "age": person.get_age(as_of),
+        "child_of": person.get_children_of_families(),
+        "spouse_of": person.get_spouse_of_families()
+    }
+
+
+def family_to_dict(family):
+    """returns a json friendly dict of a Family
+    """
+    return {
+        "id": family.get_family_id(),
+        "husband": family.get_husband_id(),
+        "wife": family.get_wife_id(),
+        "married": _date(family.get_married_date()),
+        "divorced": _date(family.get_divorced_date()),
+        "children": family.get_children()
+    }
+
+
+class TreeRegistry(object):
+    """TreeRegistry
+    The trees served by the daemon by name, each in a TreeHolder.  Lookups don't
+    lock, a reload swaps the holder's tree once the new tree is completely loaded
+
+    Args:
+        filenames (string[]): gedcom files to load
+        watch_interval (float): seconds between polls of the files, None to not watch
+    Raises:
+        ValueError: when two files give trees of the same name
+    """
+
+    def __init__(self, filenames, watch_interval=None):
+        self._holders = {}
+        self._watchers = []
+        # reports print to stdout which is process wide, so rendering is serialized
+        self._render_lock = threading.Lock()
+        # trees are named by their file name only, checked before anything is loaded
+        names = {}
+        for filename in filenames:
+            name = tree_name(filename)
+            if name in names:
+                raise ValueError("%s and %s would both be served as tree %s" % (names[name], filename, name))
+            names[name] = filename
+        for name, filename in names.items():
+            self._holders[name] = TreeHolder(filename, LoadedTree)
+        # watching starts once every tree loaded
+        if watch_interval is not None:
+            for holder in self._holders.values():
+                watcher = FileWatcher(holder.filename, lambda _, holder=holder: holder.reload_async(), watch_interval)
+                watcher.start()
+                self._watchers.append(watcher)
+
+    def names(self):
+        """returns the names of the loaded trees
+        """
+        return sorted(self._holders.keys())
+
+    def get(self, name):
+        """returns the current tree with the name or None
+        """
+        holder = self._holders.get(name)
+        return None if holder is None else holder.get()
+
+    def get_holder(self, name):
+        """returns the TreeHolder of a tree or None
+        """
+        return self._holders.get(name)
+
+    def reload(self, name):
+        """re-parse and validate a tree's file and swap it in
+
+        Returns:
+            LoadedTree the new tree or None when no tree has that name
+        """
+        holder = self._holders.get(name)
+        if holder is None:
+            return None
+        return holder.reload()
+
+    def close(self):
+        """stop watching the files
+        """
+        for watcher in self._watchers:
+            watcher.stop()
+        self._watchers = []
+
+    def render_report(self, tree, report):
+        """returns the text of a report table of a tree
+        """
+        owner, method = REPORTS[report]
+        output = io.StringIO()
+        with self._render_lock, contextlib.redirect_stdout(output):
+            getattr(getattr(tree, owner), method)()
+        return output.getvalue()
+
+
+def _holder_summary(holder):
+    """summary of the current tree of a holder with its version and last reload error
+    """
+    summary = holder.get().summary()
+    summary["version"] = holder.version
+    summary["reload_error"] = None if holder.last_error is None else str(holder.last_error)
+    return summary
+
+
+class DaemonRequestHandler(BaseHTTPRequestHandler):
+    """DaemonRequestHandler
+    Maps the API paths to the tree registry of the server
+    """
+
+    def log_message(self, format, *args):
+        """requests are not logged, errors are returned to the client
+        """
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _parts(self):
+        return [unquote(part) for part in self.path.split("?", 1)[0].strip("/").split("/")]
+
+    def do_GET(self):
+        """handle the read only API calls
+        """
+        registry = self.server.registry
+        parts = self._parts()
+        if parts == ["trees"]:
+            return self._send(200, [_holder_summary(registry.get_holder(name)) for name in registry.names()])
+        if len(parts) < 3 or parts[0] != "trees" or registry.get(parts[1]) is None:
+            return self._send(404, {"error": "not found"})
+
+        # keep the tree for the whole request even if it is reloaded meanwhile
+        tree = registry.get(parts[1])
+        resource = parts[2:]
+        if resource == ["messages"]:
+            return self._send(200, tree.messages.get_messages())
+        if resource == ["reports"]:
+            return self._send(200, sorted(REPORTS.keys()))
+        if len(resource) == 2 and resource[0] == "reports" and resource[1] in REPORTS:
+            return self._send(200, {"report": resource[1], "text": registry.render_report(tree, resource[1])})
+        if len(resource) == 2 and resource[0] == "people" and resource[1] in tree.people.individuals:
+            return self._send(200, person_to_dict(tree.people.individuals[resource[1]], tree.people.get_as_of()))
+        if len(resource) == 2 and resource[0] == "families" and resource[1] in tree.families.families:
+            return self._send(200, family_to_dict(tree.families.families[resource[1]]))
+        return self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        """handle reload requests
+        """
+        parts = self._parts()
+        if len(parts) != 3 or parts[0] != "trees" or parts[2] != "reload":
+            return self._send(404, {"error": "not found"})
+        try:
+            tree = self.server.registry.reload(parts[1])
+        except Exception as err:
+            # the previous tree stays loaded whatever failed, e.g. a rule on unexpected data
+            return self._send(500, {"error": "reload failed: %s: %s" % (type(err).__name__, err)})
+        if tree is None:
+            return self._send(404, {"error": "not found"})
+        return self._send(200, _holder_summary(self.server.registry.get_holder(parts[1])))
+
+
+class DaemonServer(ThreadingMixIn, HTTPServer):
+    """DaemonServer
+    Threaded HTTP server bound to the local host only
+
+    Args:
+        registry (TreeRegistry): trees to serve
+        port (int): port to listen on, 0 picks a free port
+    """
+    daemon_threads = True
+
+    def __init__(self, registry, port=DEFAULT_PORT):
+        HTTPServer.__init__(self, (HOST, port), DaemonRequestHandler)
+        self.registry = registry
+
+
+def run(argv):
+    """daemon command line entry point
+
+    Args:
+        argv (string[]): arguments after "daemon"
+    """
+    port = DEFAULT_PORT
+    watch_interval = None
+    filenames = []
+    args = iter(argv)
+    for arg in args:
+        if arg == "--port":
+            try:
+                port = int(next(args))
+            except (StopIteration, ValueError):
+                sys.exit(USAGE)
+        elif arg == "--watch":
+            try:
+                watch_interval = float(next(args))
+            except (StopIteration, ValueError):
+                sys.exit(USAGE)
+        elif arg.startswith("-"):
+            sys.exit(USAGE)
+        else:
+            filenames.append(arg)
+    if not filenames:
+        sys.exit(USAGE)
+
+    try:
+        registry = TreeRegistry(filenames, watch_interval)
+    except IOError as err:
+        sys.exit("ERROR: " + str(err))
+    except TagsError as err:
+        sys.exit(str(err))
+    except Exception as err:
+        # two trees of the same name or a rule failing on unexpected data
+        sys.exit("ERROR: %s: %s" % (type(err).__name__, err))
+
+    server = DaemonServer(registry, port)
+    print("Serving %s on http://%s:%i" % (", ".join(registry.names()), HOST, server.server_address[1]))
+    sys.stdout.flush()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        registry.close()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    run(sys.argv[1:])
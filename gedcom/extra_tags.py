@@ -0,0 +1,93 @@
+"""ExtraTags
+Opt in side store for the lines of INDI and FAM records the grammar doesn't recognize
+
+Vendor _TAGS, misplaced tags and their sub lines are otherwise dropped while
+parsing, this keeps them so a record can be written back out.  Lines are kept
+in flat typed arrays with the tag as an interned tag id, only the value strings
+are Python objects, so memory grows with what is kept and is capped by max_lines.
+Person and Family objects aren't touched, the lines of a record are a contiguous
+row range looked up by the record.
+"""
+from array import array
+
+
+class ExtraTags(object):
+    """ExtraTags
+    Kept unrecognized lines by record
+
+    Args:
+        max_lines (int): most lines kept, None for no limit.  Lines after that are counted in dropped
+    Attributes:
+        dropped (int): number of lines not kept because the store was full
+    """
+
+    def __init__(self, max_lines=None):
+        self.max_lines = max_lines
+        self.dropped = 0
+        self._tag_names = []
+        self._tag_ids = {}
+        self._levels = array("B")
+        self._tags = array("I")
+        # index into the record's facts the line comes before
+        self._anchors = array("I")
+        self._values = []
+        # record: (first row, row after the last)
+        self._rows = {}
+        self._last_record = None
+
+    def __len__(self):
+        return len(self._values)
+
+    def tag_id(self, tag):
+        """returns the id of a tag, adding it when it's new
+        """
+        tag_id = self._tag_ids.get(tag)
+        if tag_id is None:
+            tag_id = len(self._tag_names)
+            self._tag_ids[tag] = tag_id
+            self._tag_names.append(tag)
+        return tag_id
+
+    def add(self, record, anchor, level, tag, value):
+        """keep a line of a record.  Lines must be added in file order
+
+        Args:
+            record (Person or Family): record the line belongs to
+            anchor (int): number of facts of the record before the line
+            level (int): level of the line
+            tag (string): tag of the line
+            value (string): value of the line
+        Returns:
+            bool False when the store is full and the line was dropped
+        """
+        if self.max_lines is not None and len(self._values) >= self.max_lines:
+            self.dropped += 1
+            return False
+        row = len(self._values)
+        self._levels.append(min(level, 255))
+        self._tags.append(self.tag_id(tag))
+        self._anchors.append(anchor)
+        self._values.append(value)
+        if record is self._last_record:
+            self._rows[record] = (self._rows[record][0], row + 1)
+        else:
+            self._rows[record] = (row, row + 1)
+            self._last_record = record
+        return True
+
+    def get_lines(self, record):
+        """returns the kept lines of a record in file order
+
+        Args:
+            record (Person or Family): record
+        Returns:
+            list of (anchor, level, tag, value) tuples
+        """
+        start, end = self._rows.get(record, (0, 0))
+        return [(self._anchors[row], self._levels[row], self._tag_names[self._tags[row]], self._values[row])
+                for row in range(start, end)]
+
+    def get_records(self):
+        """returns the records that have kept lines
+        """
+        return list(self._rows.keys())
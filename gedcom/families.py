@@ -1,13 +1,14 @@
 """Families GEDCOM
 Parses family tags from the gedcom data passed to it line by line as they appear in the gedcom files
 """
-import re
 from datetime import datetime
 from datetime import timedelta
-from time import strftime
-from prettytable import PrettyTable
+from sys import intern
 from people import People
+from person import years_between
 from family import Family
+from record_builder import RecordBuilder
+from record_index import RecordIndex, natural_key, ordered_ids
 
 
 class Families(object):
@@ -15,28 +16,83 @@ class Families(object):
     Contains logic for processing family tags
 
     Attributes:
-        families (:list:Family): dict of families
+        families (:list:Family): dict of families, a RecordIndex keyed by family id
         _curr_family (Family): family of the current processing line
     Args:
         people (:list:People): people used for looking up individuals
     """
 
     CLASS_IDENTIFIER = "FAMILY"
-    DAYS_IN_YEAR = 365.2425
+    # user stories reported by a rule: rule run on every family by validate.  The
+    # date checks report US02 under the spouses' ids and skip each check on its own
+    RULES = (
+        ((), "_us02_us04_us05_us06_us10_validate_dates"),
+        (("US01",), "_us01_validate_marr_div_dates"),
+        (("US09",), "_us09_validate_death_of_parents_before_child_birth"),
+        (("US16",), "_us16_validate_males_in_family_same_last_name"),
+        (("US25",), "_us25_validate_children_names_and_birthdays_are_different"),
+        (("US15",), "_us15_validate_fewer_than_15_siblings"),
+        (("US11",), "_us11_validate_no_bigamy"),
+        (("US26",), "_us26_validate_corresponding_entries"),
+        (("US17",), "_us17_validate_no_marriage_to_decendants"),
+        (("US14",), "_us14_validate_less_than_5_multi_births"),
+        (("US12",), "_us12_validate_parents_not_too_old"),
+        (("US21",), "_us21_validate_correct_gender_roles"),
+    )
 
     def __init__(self, people, validation_messages):
-        self.families = {}
+        self.families = RecordIndex()
         self._curr_family = None
-        self._current_level_1 = None
+        # builder used when lines are passed to process_line_data directly
+        self._builder = None
         self._people = people
         self._msgs = validation_messages
-        self._current_time = datetime.now()
-        # parses names in the format Bob /Hope/ where the last name has slashes around it
-        self._last_name_regex = re.compile(r'\/(.*)\/')
-        self._first_name_regex = re.compile(r'(.*) \/')
+        # versions of the records the references of families and of people
+        # were last resolved at, see ensure_references
+        self._families_resolved = None
+        self._people_resolved = None
+
+    def __getstate__(self):
+        """pickles without the resolved versions, the records are pickled without
+        their references
+        """
+        state = self.__dict__.copy()
+        state["_families_resolved"] = None
+        state["_people_resolved"] = None
+        return state
+
+    def _records_version(self):
+        """returns the versions of the families and individuals mappings, None when
+        one of them doesn't count its changes
+        """
+        families = getattr(self.families, "get_version", None)
+        individuals = getattr(self._people.individuals, "get_version", None)
+        if families is None or individuals is None:
+            return None
+        return families(), individuals()
+
+    @property
+    def _current_time(self):
+        """date of the tree the checks against the current time use, see People.set_as_of
+        """
+        return self._people.get_as_of()
+
+    def register_handlers(self, builder):
+        """register the FAM record handlers with a record builder
+
+        Args:
+            builder (RecordBuilder): builder driven with the lines of the file
+        """
+        builder.register(None, "FAM", self._start_family)
+        builder.register("FAM", "HUSB", self._set_husband)
+        builder.register("FAM", "WIFE", self._set_wife)
+        builder.register("FAM", "CHIL", self._add_child)
+        builder.register("MARR", "DATE", self._set_married_date)
+        builder.register("DIV", "DATE", self._set_divorced_date)
 
     def process_line_data(self, data):
-        """line data is a dict of the format:
+        """process a single line through a record builder with only the family handlers.
+        line data is a dict of the format:
         {
             "level": int,
             "tag": string,
@@ -44,51 +100,138 @@ class Families(object):
             "valid": "Y" or "N"
         }
         """
-
         if data["valid"] == "N":
             raise ValueError
 
-        if data["level"] < 2:
-            self._current_level_1 = None
+        if self._builder is None:
+            self._builder = RecordBuilder()
+            self.register_handlers(self._builder)
+        self._builder.process_line_data(data)
 
-        if data["tag"] == "FAM":
-            self._curr_family = Family(data["args"])
-            # US22
-            if data["args"] in self.families:
-                self._msgs.add_message(self.CLASS_IDENTIFIER, "US22", data["args"], "NA",
-                                       "Not unique family ID " + data["args"] + " ")
+    def _start_family(self, data):
+        # xrefs are interned so a record id and all links to it share one string
+        self._curr_family = Family(intern(data["args"]))
+        # US22
+        if data["args"] in self.families:
+            self._msgs.add_message(self.CLASS_IDENTIFIER, "US22", data["args"], "NA",
+                                   "Not unique family ID %s ", args=(data["args"],))
 
-            self.families[data["args"]] = self._curr_family
+        self.families[self._curr_family.get_family_id()] = self._curr_family
+        return self._curr_family
 
-        if data["tag"] == "MARR":
-            self._current_level_1 = "MARR"
+    def _set_husband(self, data):
+        self._curr_family.set_husband_id(intern(data["args"]))
 
-        if data["tag"] == "DIV":
-            self._current_level_1 = "DIV"
+    def _set_wife(self, data):
+        self._curr_family.set_wife_id(intern(data["args"]))
 
-        if data["tag"] == "HUSB":
-            self._curr_family.set_husband_id(data["args"])
-            self._current_level_1 = "HUSB"
+    def _add_child(self, data):
+        self._curr_family.add_child(intern(data["args"]))
 
-        if data["tag"] == "WIFE":
-            self._curr_family.set_wife_id(data["args"])
-            self._current_level_1 = "WIFE"
+    def _set_married_date(self, data):
+        self._curr_family.set_date(data["args"], "married")
 
-        if data["tag"] == "CHIL":
-            self._curr_family.add_child(data["args"])
-            self._current_level_1 = "CHIL"
+    def _set_divorced_date(self, data):
+        self._curr_family.set_date(data["args"], "divorced")
 
-        if data["tag"] == "DATE":
-            if self._current_level_1 == "MARR":
-                self._curr_family.set_date(data["args"], "married")
-            if self._current_level_1 == "DIV":
-                self._curr_family.set_date(data["args"], "divorced")
+    def resolve_references(self, report=False, families=True, people=True):
+        """link families and individuals by direct references, so rules and
+        reports follow Person and Family objects instead of looking up ids.
+        Ids that point to no record are left out of the references
+
+        Args:
+            report (bool): add an XREF validation message for every id that
+                points to no record
+            families (bool): resolve the links of families
+            people (bool): resolve the family links of individuals.  Reports on
+                families only need the links of families
+        """
+        version = self._records_version()
+        if families:
+            self._resolve_family_links(report)
+            self._families_resolved = version
+        if people:
+            self._resolve_person_links(report)
+            self._people_resolved = version
+
+    def ensure_references(self, families=True, people=True):
+        """resolve the references unless they were resolved since the records last
+        changed, so reports on a validated tree only read it
+
+        Args:
+            families (bool): the links of families are needed
+            people (bool): the family links of individuals are needed
+        """
+        version = self._records_version()
+        families = families and (version is None or version != self._families_resolved)
+        people = people and (version is None or version != self._people_resolved)
+        if families or people:
+            self.resolve_references(families=families, people=people)
+
+    def _resolve_family_links(self, report):
+        """set the husband, wife and children references of every family
+        """
+        individuals = self._people.individuals
+        # (family id, tag, id pointing to no individual)
+        dangling = []
+        for family_id, family in self.families.items():
+            husband_id = family.get_husband_id()
+            husband = None if husband_id is None else individuals.get(husband_id)
+            if husband is None and husband_id is not None:
+                dangling.append((family_id, "HUSB", husband_id))
+            wife_id = family.get_wife_id()
+            wife = None if wife_id is None else individuals.get(wife_id)
+            if wife is None and wife_id is not None:
+                dangling.append((family_id, "WIFE", wife_id))
+            children = []
+            for child_id in family.get_children():
+                child = individuals.get(child_id)
+                if child is None:
+                    dangling.append((family_id, "CHIL", child_id))
+                else:
+                    children.append(child)
+            family.set_references(husband, wife, children)
+        if report:
+            dangling.sort(key=lambda link: natural_key(link[0]))
+            for family_id, tag, person_id in dangling:
+                self._msgs.add_message(self.CLASS_IDENTIFIER, "XREF", family_id, "NA",
+                                       "%s %s points to no individual", args=(tag, person_id))
+
+    def _resolve_person_links(self, report):
+        """set the family references of every individual
+        """
+        individuals = self._people.individuals
+        families = self.families
+        # (person id, tag, id pointing to no family)
+        dangling = []
+        for person_id, person in individuals.items():
+            links = []
+            for tag, fam_ids in (("FAMC", person.get_children_of_families()),
+                                 ("FAMS", person.get_spouse_of_families())):
+                resolved = []
+                for fam_id in fam_ids:
+                    family = families.get(fam_id)
+                    if family is None:
+                        dangling.append((person_id, tag, fam_id))
+                    else:
+                        resolved.append(family)
+                links.append(resolved)
+            person.set_family_references(*links)
+        if report:
+            dangling.sort(key=lambda link: natural_key(link[0]))
+            for person_id, tag, fam_id in dangling:
+                self._msgs.add_message(People.CLASS_IDENTIFIER, "XREF", person_id,
+                                       individuals[person_id].get_name(), "%s %s points to no family",
+                                       args=(tag, fam_id))
 
     def print_all(self):
         """print all families information
         """
-        fam_keys = sorted(self.families.keys())
+        self.ensure_references(people=False)
+        fam_keys = ordered_ids(self.families)
 
+        # loaded lazily so validation only runs never import prettytable
+        from prettytable import PrettyTable
         p_table = PrettyTable(["ID", "Married", "Divorced", "Husband ID",
                                "Husband Name", "Wife ID", "Wife Name", "Children"])
         for idx in fam_keys:
@@ -103,21 +246,20 @@ class Families(object):
             husband_name = "NA"
             if family.get_husband_id() is not None:
                 husband_id = family.get_husband_id()
-                husband_name = self._people.individuals[husband_id].get_name()
+                if family.get_husband() is not None:
+                    husband_name = family.get_husband().get_name()
             wife_id = "NA"
             wife_name = "NA"
             if family.get_wife_id() is not None:
                 wife_id = family.get_wife_id()
-                wife_name = self._people.individuals[wife_id].get_name()
+                if family.get_wife() is not None:
+                    wife_name = family.get_wife().get_name()
             children_order = "NA"
-            if family.get_children() is not None:
-                children = family.get_children()
-                child_age = []
-            for child_id in children:
-                child = self._people.individuals[child_id]
-                if child.get_age is None:
-                    child_age = 1
-                child_age.append(child.get_age())
+            children = []
+            child_age = []
+            for child in family.get_child_people():
+                children.append(child.get_person_id())
+                child_age.append(child.get_age(self._current_time))
             keys = children
             values = child_age
             childid_age = dict(zip(keys, values))
@@ -141,22 +283,16 @@ class Families(object):
         """"
         Prints all married individuals
         """
-        families = self.families
-        individuals = self._people.individuals
+        self.ensure_references(people=False)
         married_ind = dict()
+        from prettytable import PrettyTable
         table = PrettyTable(["ID", "Name", "Married"])
 
-        for family_id in families:
-            # type: Family
-            family = self.families[family_id]
+        for family in self.families.values():
             if family.get_married_date() and family.get_divorced_date() is None:
-                husband = individuals[family.get_husband_id()]
-                if family.get_husband_id() not in married_ind:
-                    married_ind[family.get_husband_id()] = husband
-
-                wife = individuals[family.get_wife_id()]
-                if family.get_wife_id() not in married_ind:
-                    married_ind[family.get_wife_id()] = wife
+                for spouse in (family.get_husband(), family.get_wife()):
+                    if spouse is not None and spouse.get_person_id() not in married_ind:
+                        married_ind[spouse.get_person_id()] = spouse
 
         for individual_id, individual in married_ind.items():
             table.add_row([individual_id, individual.get_name(), True])
@@ -168,24 +304,20 @@ class Families(object):
         """"US32
         Prints all multiple births
         """
-        families = self.families
-        individuals = self._people.individuals
+        self.ensure_references(people=False)
+        from prettytable import PrettyTable
         table = PrettyTable(["ID", "Name", "Family ID", "Birthday"])
 
-        for family_id in families:
+        for family_id, family in self.families.items():
             child_bd = []
             children = []
-            # type: Family
-            family = self.families[family_id]
-            if family.get_children() is not None and len(family.get_children()) > 1:
-                for child_id in family.get_children():
-                    child = individuals[child_id]
-                    if child.get_birth_date is not None:
-                        children.append(child_id)
-                        child_bd.append(child.get_birth_date())
+            if len(family.get_child_people()) > 1:
+                for child in family.get_child_people():
+                    children.append(child)
+                    child_bd.append(child.get_birth_date())
                 for x in range(0, len(child_bd)):
                     if child_bd.count(child_bd[x]) > 1:
-                        table.add_row([children[x], individuals[children[x]].get_name(), family_id, child_bd[x]])
+                        table.add_row([children[x].get_person_id(), children[x].get_name(), family_id, child_bd[x]])
 
         print("Multiple Births")
         print(table)
@@ -194,31 +326,22 @@ class Families(object):
         """"
         Prints all orphaned individuals
         """
-        families = self.families
-        individuals = self._people.individuals
+        self.ensure_references(people=False)
+        from prettytable import PrettyTable
         table = PrettyTable(["ID", "Name", "Age"])
 
-        for family_id in families:
-            # type: Family
-            family = self.families[family_id]
-            if not family.get_children():
+        for family in self.families.values():
+            if not family.get_child_people():
                 continue
-            hus_id = family.get_husband_id()
-            husband = None
-            wife_id = family.get_wife_id()
-            wife = None
-            if wife_id is not None:
-                wife = individuals[wife_id]
-            if hus_id is not None:
-                husband = individuals[hus_id]
+            husband = family.get_husband()
+            wife = family.get_wife()
             if husband is None or wife is None:
                 continue
             if wife.get_death_date() is not None and husband.get_death_date() is not None:
-                for child_id in family.get_children():
-                    child = individuals[child_id]
-                    age = child.get_age()
+                for child in family.get_child_people():
+                    age = child.get_age(self._current_time)
                     if age is not None and age < 18:
-                        table.add_row([child_id, child.get_name(), child.get_age()])
+                        table.add_row([child.get_person_id(), child.get_name(), age])
 
         print("Orphans")
         print(table)
@@ -227,17 +350,17 @@ class Families(object):
         """"US39
         Prints Anniversaries within the next 30 days
         """
-        families = self.families
-        individuals = self._people.individuals
+        self.ensure_references(people=False)
+        from prettytable import PrettyTable
         table = PrettyTable(["ID", "Husband", "Wife", "Anniversary"])
 
-        for familiy_id in families:
-            # type: Family
-            family = self.families[familiy_id]
-            today = datetime.today()
+        for family in self.families.values():
+            today = self._current_time
             anniversary = family.get_married_date()
-            husband = individuals[family.get_husband_id()]
-            wife = individuals[family.get_wife_id()]
+            husband = family.get_husband()
+            wife = family.get_wife()
+            if husband is None or wife is None:
+                continue
             if anniversary is not None and husband.get_is_alive() and wife.get_is_alive():
                 family_current_anniversary = datetime(today.year, anniversary.month, anniversary.day)
                 if 0 <= (family_current_anniversary - today).days <= 30:
@@ -252,24 +375,16 @@ class Families(object):
         It doesn't matter if they're alive or dead as this is when they got married.
         Must have birth and married date.
         """
-        families = self.families
-        individuals = self._people.individuals
+        self.ensure_references(people=False)
+        from prettytable import PrettyTable
         table = PrettyTable(["ID", "Names", "Age Difference"])
 
-        for family_id in families:
-            # type: Family
-            family = self.families[family_id]
+        for family in self.families.values():
             if family.get_married_date() is None:
                 continue
             marr_date = family.get_married_date()
-            hus_id = family.get_husband_id()
-            husband = None
-            wife_id = family.get_wife_id()
-            wife = None
-            if wife_id is not None:
-                wife = individuals[wife_id]
-            if hus_id is not None:
-                husband = individuals[hus_id]
+            husband = family.get_husband()
+            wife = family.get_wife()
             if husband is None or wife is None:
                 continue
             wife_age = wife.get_age_at_date(marr_date)
@@ -288,51 +403,54 @@ class Families(object):
     def validate(self):
         """run through all the validation rules around families
         """
+        self.resolve_references(report=True)
         # ensure the order of the results doesn't change between runs
-        fam_keys = sorted(self.families.keys())
+        fam_keys = ordered_ids(self.families)
         fam_hashs = {}
+        rules = [(stories, getattr(self, name)) for stories, name in self.RULES]
+        # rules with known findings for a family can be skipped, see ValidationMessages.skip_rule
+        skipping = self._msgs.get_skip_rules()
         for idx in fam_keys:
             family = self.families[idx]
-            self._us02_us04_us05_us06_us10_validate_dates(family)
-            self._us01_validate_marr_div_dates(family)
-            self._us09_validate_death_of_parents_before_child_birth(family)
-            self._us16_validate_males_in_family_same_last_name(family)
-            self._us25_validate_children_names_and_birthdays_are_different(family)
-            self._us15_validate_fewer_than_15_siblings(family)
-            self._us11_validate_no_bigamy(family)
-            self._us26_validate_corresponding_entries(family)
-            self._us17_validate_no_marriage_to_decendants(family)
-            self._us14_validate_less_than_5_multi_births(family)
-            self._us12_validate_parents_not_too_old(family)
-            self._us21_validate_correct_gender_roles(family)
+            for stories, rule in rules:
+                if skipping and self._msgs.skip_rule(stories, idx):
+                    continue
+                rule(family)
+            # US24 compares families with each other so it always runs
             self._us24_hash_family(family, fam_hashs)
 
         self._us24_validate_duplicate_families(fam_hashs)
 
+    def _skip_check(self, user_story, user_id):
+        """returns whether a single check of a rule can be skipped for the id it
+        reports under, see ValidationMessages.skip_rule
+        """
+        return self._msgs.skip_rule((user_story,), user_id)
+
     def _us24_validate_duplicate_families(self, fam_hashs):
         """US24: Go through the hashes of the families and find the ones
         with more than one in the hash
         US24 No more than one family with the same spouses by name
         and the same marriage date should appear in a GEDCOM file.
         """
-        fam_keys = sorted(fam_hashs.keys())
-        for idx in fam_keys:
-            key = fam_hashs[idx]
+        # families are hashed in id order, so the hashes are in the order of their first family
+        for key in fam_hashs.values():
             dups = key["duplicate_families"]
             if dups:
                 self._msgs.add_message(self.CLASS_IDENTIFIER,
                                        "US24",
                                        key["first_family_id"],
                                        "NA",
-                                       "Duplicate families by spouse names and married date: " + ", ".join(dups))
+                                       "Duplicate families by spouse names and married date: %s",
+                                       args=(", ".join(dups),))
 
     def _us24_hash_family(self, family, fam_hashs):
         """ hash family values to allow for detecting redundant family setups
         Used for US24 validation.  Must have both spouses and a married date set to get a hash else we have incomplete data to detect a redundant family
         """
-        if family.get_husband_id() is None or family.get_wife_id() is None or family.get_married_date() is None:
+        if family.get_husband() is None or family.get_wife() is None or family.get_married_date() is None:
             return
-        fam_hash = self._people.individuals[family.get_husband_id()].get_name() + "|" + self._people.individuals[family.get_wife_id()].get_name() + "|" + family.get_married_date().isoformat()
+        fam_hash = family.get_husband().get_name() + "|" + family.get_wife().get_name() + "|" + family.get_married_date().isoformat()
         if fam_hash in fam_hashs:
             fam_hashs[fam_hash]["duplicate_families"].append(family.get_family_id())
         else:
@@ -350,7 +468,7 @@ class Families(object):
             mar_date = family.get_married_date()
             if family.get_divorced_date() is not None:
                 div_date = family.get_divorced_date()
-                if mar_date > div_date:
+                if not self._skip_check("US04", fam_id) and mar_date > div_date:
                     self._msgs.add_message("FAMILY",
                                            "US04",
                                            fam_id,
@@ -358,89 +476,81 @@ class Families(object):
                                            "Marriage date should occur before divorce date of a family")
             # Husband Dates
             # US02 HUSBAND
-            if family.get_husband_id() is not None and family.get_wife_id() is not None:
+            husband = family.get_husband()
+            wife = family.get_wife()
+            if husband is not None and wife is not None:
                 hus_id = family.get_husband_id()
                 wife_id = family.get_wife_id()
-                if self._people.individuals[family.get_husband_id()].get_birth_date() is not None and self._people.individuals[family.get_husband_id()].get_name() is not None:
-                    hus_bd = self._people.individuals[family.get_husband_id(
-                    )].get_birth_date()
-                    hus_name = self._people.individuals[family.get_husband_id(
-                    )].get_name()
-                    if mar_date < hus_bd:
+                if husband.get_birth_date() is not None and husband.get_name() is not None:
+                    hus_bd = husband.get_birth_date()
+                    hus_name = husband.get_name()
+                    if not self._skip_check("US02", hus_id) and mar_date < hus_bd:
                         self._msgs.add_message(People.CLASS_IDENTIFIER,
                                                "US02",
                                                hus_id,
                                                hus_name,
                                                "Birth date should occur before marriage of an individual")
                     # US10 HUSBAND
-                    hus_mar_age = int(
-                        (mar_date - hus_bd).days / self.DAYS_IN_YEAR)
-                    if hus_mar_age < 14:
+                    if not self._skip_check("US10", fam_id) and years_between(hus_bd, mar_date) < 14:
                         self._msgs.add_message("FAMILY",
                                                "US10",
                                                fam_id,
                                                "NA",
-                                               "marriage before age 14 for " + hus_id + " " + hus_name)
+                                               "marriage before age 14 for %s %s", args=(hus_id, hus_name))
                     # US05 HUSBAND
-                    if self._people.individuals[family.get_husband_id()].get_death_date() is not None:
-                        hus_dd = self._people.individuals[family.get_husband_id(
-                        )].get_death_date()
-                        if mar_date > hus_dd:
+                    if husband.get_death_date() is not None:
+                        hus_dd = husband.get_death_date()
+                        if not self._skip_check("US05", fam_id) and mar_date > hus_dd:
                             self._msgs.add_message("FAMILY",
                                                    "US05",
                                                    fam_id,
                                                    "NA",
-                                                   "marriage after death for " + hus_id + " " + hus_name)
+                                                   "marriage after death for %s %s", args=(hus_id, hus_name))
                         # US06 HUSBAND
                         if family.get_divorced_date() is not None:
                             div_date = family.get_divorced_date()
-                            if div_date > hus_dd:
+                            if not self._skip_check("US06", fam_id) and div_date > hus_dd:
                                 self._msgs.add_message("FAMILY",
                                                        "US06",
                                                        fam_id,
                                                        "NA",
-                                                       "divorce after death for " + hus_id + " " + hus_name)
+                                                       "divorce after death for %s %s", args=(hus_id, hus_name))
                 # Wife Dates
                 # US02 WIFE
-                if self._people.individuals[family.get_wife_id()].get_birth_date() is not None and self._people.individuals[family.get_wife_id()].get_name() is not None:
-                    wife_bd = self._people.individuals[family.get_wife_id(
-                    )].get_birth_date()
-                    wife_name = self._people.individuals[family.get_wife_id(
-                    )].get_name()
-                    if mar_date < wife_bd:
+                if wife.get_birth_date() is not None and wife.get_name() is not None:
+                    wife_bd = wife.get_birth_date()
+                    wife_name = wife.get_name()
+                    if not self._skip_check("US02", wife_id) and mar_date < wife_bd:
                         self._msgs.add_message(People.CLASS_IDENTIFIER,
                                                "US02",
                                                wife_id,
                                                wife_name,
                                                "Birth date should occur before marriage of an individual")
                     # US10 WIFE
-                    wif_mar_age = int(
-                        (mar_date - wife_bd).days / self.DAYS_IN_YEAR)
-                    if wif_mar_age < 14:
+                    if not self._skip_check("US10", fam_id) and years_between(wife_bd, mar_date) < 14:
                         self._msgs.add_message("FAMILY",
                                                "US10",
                                                fam_id,
                                                "NA",
-                                               "marriage before age 14 for " + wife_id + " " + wife_name)
+                                               "marriage before age 14 for %s %s", args=(wife_id, wife_name))
                     # US05 WIFE
-                    if self._people.individuals[family.get_wife_id()].get_death_date() is not None:
-                        wife_dd = self._people.individuals[family.get_wife_id(
-                        )].get_death_date()
-                        if mar_date > wife_dd:
+                    if wife.get_death_date() is not None:
+                        wife_dd = wife.get_death_date()
+                        if not self._skip_check("US05", fam_id) and mar_date > wife_dd:
                             self._msgs.add_message("FAMILY",
                                                    "US05",
                                                    fam_id,
                                                    "NA",
-                                                   "marriage after death for " + wife_id + " " + wife_name)
+                                                   "marriage after death for %s %s", args=(wife_id, wife_name))
                         # US06 WIFE
                         if family.get_divorced_date() is not None:
                             div_date = family.get_divorced_date()
-                            if div_date > wife_dd:
+                            if not self._skip_check("US06", fam_id) and div_date > wife_dd:
                                 self._msgs.add_message("FAMILY",
                                                        "US06",
                                                        fam_id,
                                                        "NA",
-                                                       "divorce after death for " + wife_id + " " + wife_name)
+                                                       "divorce after death for %s %s", args=(wife_id, wife_name))
 
     def _us01_validate_marr_div_dates(self, family):
         """US01 Validate that family marriage and divorce dates occurs before current date
@@ -468,14 +578,13 @@ class Families(object):
         """US09: validate death of parents before child birth
         """
         key = "US09"
-        msg = "parent death before child birth for "
-        children = family.get_children()
+        msg = "parent death before child birth for %s %s"
+        husb = family.get_husband()
+        wife = family.get_wife()
 
-        for child_id in children:
-            chil = self._people.individuals[child_id]
-            if family.get_husband_id() is not None:
+        for chil in family.get_child_people():
+            if husb is not None:
                 # check the husband died after conception of child
-                husb = self._people.individuals[family.get_husband_id()]
                 if husb.get_death_date() is not None:
                     hub9_date = husb.get_death_date()
                     # Calculate 9 Months Back
@@ -493,10 +602,9 @@ class Families(object):
                             key,
                             family.get_family_id(),
                             "NA",
-                            msg + husb.get_person_id() + " " + husb.get_name())
-            if family.get_wife_id() is not None:
+                            msg, args=(husb.get_person_id(), husb.get_name()))
+            if wife is not None:
                 # check the wife died before the child birth
-                wife = self._people.individuals[family.get_wife_id()]
                 if wife.get_death_date() is not None and chil.get_birth_date() > wife.get_death_date():
                     # error wife died before child birth
                     self._msgs.add_message(
@@ -504,18 +612,14 @@ class Families(object):
                         key,
                         family.get_family_id(),
                         "NA",
-                        msg + wife.get_person_id() + " " + wife.get_name())
+                        msg, args=(wife.get_person_id(), wife.get_name()))
 
-    def _us11_person_check_bigamy(self, person_id, marriage_start, marriage_end):
+    def _us11_person_check_bigamy(self, person, marriage_start, marriage_end):
         """Part of US11 check bigamy for person
         """
-        spouses_h = self._people.individuals[person_id].get_spouse_of_families(
-        )
-        if spouses_h is not None and len(spouses_h) > 1:
-            for item in spouses_h:
-                ft = self.families[item]
-                ft_hus = ft.get_husband_id()
-                ft_wif = ft.get_wife_id()
+        spouses_h = person.get_families_as_spouse()
+        if len(spouses_h) > 1:
+            for ft in spouses_h:
                 ft_som = ft.get_married_date()
                 if ft_som is None:
                     return True
@@ -523,8 +627,8 @@ class Families(object):
                     return True
                 ft_eom = ft.get_divorced_date()
                 if ft_eom is None:
-                    ft_eom = self._people.individuals[ft_hus].get_death_date()
-                    ft_w_d = self._people.individuals[ft_wif].get_death_date()
+                    ft_eom = self._death_date(ft.get_husband())
+                    ft_w_d = self._death_date(ft.get_wife())
                     if ft_w_d is not None:
                         if ft_eom is None or ft_w_d < ft_eom:
                             ft_eom = ft_w_d
@@ -538,10 +642,10 @@ class Families(object):
         """US11 No bigamy
         """
         key = "US11"
-        msg = "Bigamy for "
+        msg = "Bigamy for %s %s"
 
-        hus = family.get_husband_id()
-        wif = family.get_wife_id()
+        hus = family.get_husband()
+        wif = family.get_wife()
 
         if hus is None or wif is None:
             return
@@ -549,8 +653,8 @@ class Families(object):
         som = family.get_married_date()
         eom = family.get_divorced_date()
         if eom is None:
-            eom = self._people.individuals[hus].get_death_date()
-            w_d = self._people.individuals[wif].get_death_date()
+            eom = hus.get_death_date()
+            w_d = wif.get_death_date()
             if w_d is not None:
                 if eom is None or w_d < eom:
                     eom = w_d
@@ -567,7 +671,7 @@ class Families(object):
                 key,
                 family.get_family_id(),
                 "NA",
-                msg + self._people.individuals[family.get_husband_id()].get_person_id() + " " + self._people.individuals[family.get_husband_id()].get_name())
+                msg, args=(hus.get_person_id(), hus.get_name()))
 
         if wif_result is True:
             self._msgs.add_message(
@@ -575,7 +679,13 @@ class Families(object):
                 key,
                 family.get_family_id(),
                 "NA",
-                msg + self._people.individuals[family.get_wife_id()].get_person_id() + " " + self._people.individuals[family.get_wife_id()].get_name())
+                msg, args=(wif.get_person_id(), wif.get_name()))
+
+    @staticmethod
+    def _death_date(person):
+        """returns the death date of a resolved spouse, None when there is none
+        """
+        return None if person is None else person.get_death_date()
 
     def _us17_validate_no_marriage_to_decendants(self, family):
         """US17 No marriage to decendants
@@ -597,24 +707,16 @@ class Families(object):
         """
         if ignore_current_family is False:
             if family.get_wife_id() == person_id or family.get_husband_id() == person_id:
-                person = self._people.individuals[person_id]
+                person = self._people.individuals.get(person_id)
+                name = "NA" if person is None else person.get_name()
                 self._msgs.add_message(self.CLASS_IDENTIFIER,
                                        "US17",
                                        family.get_family_id(),
                                        "NA",
-                                       "No marriage to decendants. " + person_id + " " + person.get_name())
-
-        children = family.get_children()
-        if children is None:
-            return
+                                       "No marriage to decendants. %s %s", args=(person_id, name))
 
-        for child_id in family.get_children():
-            child = self._people.individuals[child_id]
-            fams = child.get_spouse_of_families()
-            if fams is None:
-                return
-            for fam_id in fams:
-                fam = self.families[fam_id]
+        for child in family.get_child_people():
+            for fam in child.get_families_as_spouse():
                 self._us17_check_family_for_decendant_marriage(
                     fam, person_id, False)
 
@@ -627,20 +729,14 @@ class Families(object):
             return
 
         children_first_names = dict()
-        people_ids = []
-        people_ids.extend(children)
-
-        for person_id in people_ids:
-            peep = self._people.individuals[person_id]
+        child_people = family.get_child_people()
 
-            name = self._first_name_regex.search(peep.get_name())
+        for peep in child_people:
             if peep.get_birth_date() is None:
                 return
-            if name is not None and peep.get_birth_date() is not None:
-                children_first_names[name.group(
-                    0), peep.get_birth_date()] = True
+            children_first_names[peep.get_given_name(), peep.get_birth_date()] = True
 
-        if len(children_first_names) < len(people_ids):
+        if len(children_first_names) < len(child_people):
             self._msgs.add_message(self.CLASS_IDENTIFIER,
                                    "US25",
                                    family.get_family_id(),
@@ -655,21 +751,17 @@ class Families(object):
             return
 
         male_last_names = dict()
-        people_ids = []
-        people_ids.extend(children)
+        people = list(family.get_child_people())
 
-        if family.get_husband_id() is not None:
-            people_ids.append(family.get_husband_id())
-
-        for person_id in people_ids:
-            peep = self._people.individuals[person_id]
+        if family.get_husband() is not None:
+            people.append(family.get_husband())
 
+        for peep in people:
             if peep.get_gender() != "M":
                 continue
 
-            result = self._last_name_regex.search(peep.get_name())
-            if result is not None:
-                male_last_names[result.group(1)] = True
+            if peep.get_surname() is not None:
+                male_last_names[peep.get_surname()] = True
 
         if len(male_last_names) > 1:
             self._msgs.add_message(self.CLASS_IDENTIFIER,
@@ -698,32 +790,28 @@ class Families(object):
         fam_id = family.get_family_id()
         husband_id = family.get_husband_id()
         wife_id = family.get_wife_id()
-        child_ids = family.get_children()
-        if husband_id is not None:
-            husband = self._people.individuals[husband_id]
+        husband = family.get_husband()
+        wife = family.get_wife()
+        # ids that point to no individual are reported as XREF
+        if husband is not None:
             if fam_id not in husband.get_spouse_of_families():
                 self._msgs.add_message(self.CLASS_IDENTIFIER, us_name, fam_id, "NA",
-                                       "corresponding spouse link missing for " + husband_id + " " + husband.get_name())
-        if wife_id is not None:
-            wife = self._people.individuals[wife_id]
+                                       "corresponding spouse link missing for %s %s", args=(husband_id, husband.get_name()))
+        if wife is not None:
             if fam_id not in wife.get_spouse_of_families():
                 self._msgs.add_message(self.CLASS_IDENTIFIER, us_name, fam_id, "NA",
-                                       "corresponding spouse link missing for " + wife_id + " " + wife.get_name())
-        if child_ids is not None:
-            for child_id in child_ids:
-                child = self._people.individuals[child_id]
-                if fam_id not in child.get_children_of_families():
-                    self._msgs.add_message(self.CLASS_IDENTIFIER, us_name, fam_id, "NA",
-                                           "corresponding child link missing for " + child_id + " " + child.get_name())
+                                       "corresponding spouse link missing for %s %s", args=(wife_id, wife.get_name()))
+        for child in family.get_child_people():
+            if fam_id not in child.get_children_of_families():
+                self._msgs.add_message(self.CLASS_IDENTIFIER, us_name, fam_id, "NA",
+                                       "corresponding child link missing for %s %s",
+                                       args=(child.get_person_id(), child.get_name()))
 
     def _us14_validate_less_than_5_multi_births(self, family):
         """US14 No more than 5 siblings born in a multiple birth in a family"""
-        children = family.get_children()
         childbdays = {}
 
-        for child_id in children:
-            child = self._people.individuals[child_id]
-
+        for child in family.get_child_people():
             if child.get_birth_date() is None:
                 continue
 
@@ -748,65 +836,54 @@ class Families(object):
             bool
         """
 
-        children = set(family.get_children())
+        husband = family.get_husband()
+        wife = family.get_wife()
+        # a child listed twice is checked once, in the order of the file
+        children = list(dict.fromkeys(family.get_child_people()))
+        as_of = self._current_time
 
         if children:
             for child in children:
-                # type: Person
-                child = self._people.individuals[child]
-                if family.get_husband_id() is not None:
-                    # type: Person
-                    husband = self._people.individuals[family.get_husband_id()]
-                    if husband.get_is_alive() and (husband.get_age() - child.get_age() >= 80):
+                if husband is not None:
+                    if husband.get_is_alive() and (husband.get_age(as_of) - child.get_age(as_of) >= 80):
                         self._msgs.add_message(self.CLASS_IDENTIFIER,
                                                "US12",
                                                family.get_family_id(),
                                                "NA",
-                                               "Father %s should be less than 80 years older than his child %s" %
-                                               (family.get_husband_id(), child.get_person_id()))
+                                               "Father %s should be less than 80 years older than his child %s",
+                                               args=(family.get_husband_id(), child.get_person_id()))
                         return False
-                if family.get_wife_id() is not None:
-                    # type: Person
-                    wife = self._people.individuals[family.get_wife_id()]
-
-                    if wife.get_is_alive() and (wife.get_age() - child.get_age() >= 60):
+                if wife is not None:
+                    if wife.get_is_alive() and (wife.get_age(as_of) - child.get_age(as_of) >= 60):
                         self._msgs.add_message(self.CLASS_IDENTIFIER,
                                                "US12",
                                                family.get_family_id(),
                                                "NA",
-                                               "Mother %s should be less than 60 years older than her child %s" %
-                                               (family.get_wife_id(), child.get_person_id()))
+                                               "Mother %s should be less than 60 years older than her child %s",
+                                               args=(family.get_wife_id(), child.get_person_id()))
                         return False
 
         return True
 
     def _us21_validate_correct_gender_roles(self, family):
         "US21 Validate that the husband and wife roles in family are assigned the correct gender"
-        husband_ids = []
-        wife_ids = []
-        if family.get_husband_id() is not None:
-            husband_ids.append(family.get_husband_id())
-        for person_id in husband_ids:
-            hus_spouse = self._people.individuals[person_id]
-
+        hus_spouse = family.get_husband()
+        wif_spouse = family.get_wife()
+        if hus_spouse is not None:
             if hus_spouse.get_gender() != "M":
                 self._msgs.add_message(self.CLASS_IDENTIFIER,
                                        "US21",
                                        family.get_family_id(),
                                        "NA",
-                                       "Father %s should be a Male" %
-                                       (family.get_husband_id()))
-        if family.get_wife_id() is not None:
-            wife_ids.append(family.get_wife_id())
-        for person_id in wife_ids:
-            wif_spouse = self._people.individuals[person_id]
-
+                                       "Father %s should be a Male",
+                                       args=(family.get_husband_id(),))
+        if wif_spouse is not None:
             if wif_spouse.get_gender() != "F":
                 self._msgs.add_message(self.CLASS_IDENTIFIER,
                                        "US21",
                                        family.get_family_id(),
                                        "NA",
-                                       "Mother %s should be a Female" %
-                                       (family.get_wife_id()))
+                                       "Mother %s should be a Female",
+                                       args=(family.get_wife_id(),))
                 return False
             return True
@@ -20,6 +20,23 @@ class Family(object):
         self._wife_id = None
         self._married_date = None
         self._divorced_date = None
+        self._source_span = None
+        # lines of the record in the grammar that aren't stored in a field, None until the first one
+        self._facts = None
+        # Person objects the ids point to, set by Families.resolve_references
+        self._husband = None
+        self._wife = None
+        self._child_people = []
+
+    def __getstate__(self):
+        """pickles without the resolved references, which would pickle the whole
+        tree recursively from any one record
+        """
+        state = self.__dict__.copy()
+        state["_husband"] = None
+        state["_wife"] = None
+        state["_child_people"] = []
+        return state
 
     def get_family_id(self):
         """returns the family id
@@ -42,6 +59,39 @@ class Family(object):
         """
         self._children.append(child_id)
 
+    def get_husband(self):
+        """returns the husband resolved from husband_id
+        Returns:
+            Person or None when there is no husband or the id points to no individual
+        """
+        return self._husband
+
+    def get_wife(self):
+        """returns the wife resolved from wife_id
+        Returns:
+            Person or None when there is no wife or the id points to no individual
+        """
+        return self._wife
+
+    def get_child_people(self):
+        """returns the children resolved from the child ids, ids that point to no
+        individual are left out
+        Returns:
+            Person[]
+        """
+        return self._child_people
+
+    def set_references(self, husband, wife, child_people):
+        """sets the Person objects the husband, wife and child ids point to
+        Args:
+            husband (Person): husband or None
+            wife (Person): wife or None
+            child_people (Person[]): children
+        """
+        self._husband = husband
+        self._wife = wife
+        self._child_people = child_people
+
     def get_husband_id(self):
         """returns husband_id
         Returns:
@@ -89,7 +139,58 @@ class Family(object):
         Returns:
             datetime
         """
+        self.set_date_value(datetime.strptime(date_string, '%d %b %Y'), date_type)
+
+    def set_date_value(self, date, date_type):
+        """sets an already parsed date
+        Args:
+            date (datetime): date to set
+            date_type (string): married, divorced
+        """
         if date_type == "married":
-            self._married_date = datetime.strptime(date_string, '%d %b %Y')
+            self._married_date = date
         if date_type == "divorced":
-            self._divorced_date = datetime.strptime(date_string, '%d %b %Y')
+            self._divorced_date = date
+
+    def get_source_span(self):
+        """returns where the family record is in the gedcom file
+        Returns:
+            (int, int) byte offsets of the start of the record and just after its last line, or None
+        """
+        return self._source_span
+
+    def set_source_span(self, start, end):
+        """sets where the family record is in the gedcom file
+        Args:
+            start (int): byte offset of the record's first line
+            end (int): byte offset just after the record's last line
+        """
+        self._source_span = (start, end)
+
+    def get_facts(self):
+        """returns the lines of the family record that are in the grammar but not stored
+        in a field, e.g. ENGA, MARB or NOTE, in file order
+        Returns:
+            list of (level, tag, args) tuples
+        """
+        return [] if self._facts is None else self._facts
+
+    def add_fact(self, level, tag, args):
+        """keeps a line of the family record that isn't stored in a field
+        Args:
+            level (int): level of the line
+            tag (string): tag of the line
+            args (string): value of the line
+        """
+        if self._facts is None:
+            self._facts = []
+        self._facts.append((level, tag, args))
+
+    def set_last_fact(self, level, tag, args):
+        """replaces the last kept line, e.g. once its continuation lines are joined
+        Args:
+            level (int): level of the line
+            tag (string): tag of the line
+            args (string): value of the line
+        """
+        self._facts[-1] = (level, tag, args)
@@ -1,50 +1,343 @@
 """GEDCOM project program for SSW-555
+
+Usage:
+    python3 gedcom.py [--validate-only] [--cache] [--recover] [--show-source] [--as-of YYYY-MM-DD] [--messages FILE] [--summary N]
+           [--baseline FILE] [--write-baseline FILE] [--skip-baselined-rules] [--max-errors N] [--fail-fast=USxx,...]
+           path-to-gedcom-file
+    python3 gedcom.py batch [--workers N] [--recover] [--as-of YYYY-MM-DD] directory-or-glob-or-file ...
+    python3 gedcom.py daemon [--port N] path-to-gedcom-file ...
+
+--messages writes the validation messages to a .jsonl or .sqlite file as they
+are found instead of keeping them in memory.  --summary N only counts the
+messages of every user story and keeps their first N as examples.
+--baseline leaves out the known findings listed in a file written by
+--write-baseline on an earlier run, so only new findings are reported.
+--max-errors N stops parsing and validation at the Nth message, --fail-fast at
+the first message of one of the listed user stories (PARSE for the parse
+errors of --recover).  The messages found until then are printed without the
+reports and the program exits with status 3.
+
+Only the modules needed to parse and validate are imported at startup.
+The report tables (and prettytable) are loaded when they are printed.
 """
+import os
 import sys
+from datetime import datetime
 from tags import Tags, TagsError
+from extra_tags import ExtraTags
 from families import Families
+from message_sinks import MemorySink, SummarySink, open_sink
 from people import People
-from validation_messages import ValidationMessages
+from reader import SNIFF_SIZE, GedcomReader, open_binary, order_diacritics, sniff_encoding
+from record_builder import RecordBuilder
+from validation_messages import ValidationMessages, ValidationStopped
 
+USAGE = "Usage: " + sys.argv[0] + " [--validate-only] [--cache] [--recover] [--show-source] [--as-of YYYY-MM-DD] [--messages FILE] [--summary N] [--baseline FILE] [--write-baseline FILE] [--skip-baselined-rules] [--max-errors N] [--fail-fast=USxx,...] path-to-gedom-file"
+# exit status of a run stopped by --max-errors or --fail-fast
+EXIT_STOPPED = 3
 
-def run():
-    """main function
+
+def parse_as_of(value):
+    """parse the date of an --as-of option
+
+    Args:
+        value (string): date as YYYY-MM-DD
+    Returns:
+        datetime, None when the value isn't a date
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def parse_args(argv):
+    """parse the command line arguments.  Kept to plain argv handling as
+    argparse roughly doubles the interpreter startup time
+
+    Args:
+        argv (string[]): arguments without the program name
+    Returns:
+        dict
+    """
+    options = {"filename": None, "validate_only": False, "cache": False, "recover": False,
+               "show_source": False, "as_of": None, "messages": None,
+               "summary": None, "baseline": None, "write_baseline": None, "skip_baselined_rules": False,
+               "max_errors": None, "fail_fast": None}
+    args = iter(argv)
+    for arg in args:
+        if arg == "--validate-only":
+            options["validate_only"] = True
+        elif arg == "--cache":
+            options["cache"] = True
+        elif arg == "--recover":
+            options["recover"] = True
+        elif arg == "--show-source":
+            options["show_source"] = True
+        elif arg == "--as-of":
+            options["as_of"] = parse_as_of(next(args, ""))
+            if options["as_of"] is None:
+                sys.exit(USAGE)
+        elif arg == "--messages":
+            options["messages"] = next(args, "")
+            if not options["messages"].lower().endswith((".jsonl", ".sqlite", ".db")):
+                sys.exit(USAGE)
+        elif arg in ("--baseline", "--write-baseline"):
+            options[arg[2:].replace("-", "_")] = next(args, "")
+            if not options[arg[2:].replace("-", "_")]:
+                sys.exit(USAGE)
+        elif arg == "--skip-baselined-rules":
+            options["skip_baselined_rules"] = True
+        elif arg == "--summary":
+            examples = next(args, "")
+            if not examples.isdigit():
+                sys.exit(USAGE)
+            options["summary"] = int(examples)
+        elif arg == "--max-errors":
+            max_errors = next(args, "")
+            if not max_errors.isdigit() or int(max_errors) < 1:
+                sys.exit(USAGE)
+            options["max_errors"] = int(max_errors)
+        elif arg == "--fail-fast" or arg.startswith("--fail-fast="):
+            stories = arg.partition("=")[2] if "=" in arg else next(args, "")
+            options["fail_fast"] = [story.strip().upper() for story in stories.split(",") if story.strip()]
+            if not options["fail_fast"]:
+                sys.exit(USAGE)
+        elif arg.startswith("--") or options["filename"] is not None:
+            sys.exit(USAGE)
+        else:
+            options["filename"] = arg
+
+    if options["filename"] is None or (options["messages"] is not None and options["summary"] is not None):
+        sys.exit(USAGE)
+    if options["skip_baselined_rules"] and options["baseline"] is None:
+        sys.exit(USAGE)
+    return options
+
+
+def parse_file(file_data, validation_msgs, recover=False, extras=None):
+    """parse the lines of a gedcom file into people and families
+
+    Args:
+        file_data (iterable): lines of the gedcom file.  A GedcomReader also gives
+            the byte size of its lines so spans are exact in any encoding
+        validation_msgs (ValidationMessages): messages found while parsing
+        recover (bool): record syntax errors and invalid dates in validation_msgs
+            and continue with the next line instead of raising
+        extras (ExtraTags): keeps the unrecognized lines of individuals and families,
+            available from People.get_extra_tags().  None drops them
+    Returns:
+        (People, Families)
+    Raises:
+        TagsError: when a line can't be parsed or decoded and recover is off
+        ValueError: when a date can't be parsed and recover is off
     """
-    file_data = None
-    filename = ""
-    validation_msgs = ValidationMessages()
-    tags = Tags()
+    tags = Tags(getattr(file_data, "byte_length", None), getattr(file_data, "start_offset", 0))
     peeps = People(validation_msgs)
     fam = Families(peeps, validation_msgs)
     peeps.set_families(fam)
-
-    if len(sys.argv) < 2:
-        sys.exit("Usage: " + sys.argv[0] + " path-to-gedom-file")
-    filename = sys.argv[1]
+    builder = RecordBuilder()
+    peeps.register_handlers(builder)
+    fam.register_handlers(builder)
+    builder.extras = extras
+    peeps.set_extra_tags(extras)
+    validation_msgs.set_span_lookup(peeps.find_source_span)
+    # individual or family of the open level 0 record and the offset it starts at
+    record = None
+    record_start = 0
 
     try:
-        file_data = open(filename)
-    except IOError:
-        sys.exit("ERROR: file " + sys.argv[1] + "was not found!")
+        for line in file_data:
+            try:
+                data = tags.processline(line)
+                if data["level"] == 0 and record is not None:
+                    record.set_source_span(record_start, tags.offset)
+                builder.process_line_data(data)
+                if data["level"] == 0:
+                    record = builder.record
+                    record_start = tags.offset
+
+            except TagsError as err:
+                if not recover:
+                    raise
+                validation_msgs.add_parse_error(err.line, err.offset, tags.next_offset, err.message, err.text)
+            except ValueError:
+                if not recover:
+                    raise
+                validation_msgs.add_parse_error(tags.line_number, tags.offset, tags.next_offset, "Invalid date",
+                                                line.rstrip())
+    except UnicodeDecodeError as err:
+        # bytes the decoder can't step over (e.g. a UTF-16 file cut in half a character),
+        # the lines after them can't be read.  Decoding goes by blocks, the bad bytes are at
+        # or after the next line
+        error = TagsError("Invalid %s bytes at or after line" % err.encoding, tags.line_number + 1,
+                          tags.next_offset, "")
+        if not recover:
+            raise error
+        validation_msgs.add_parse_error(error.line, error.offset, error.offset, error.message, error.text)
+
+    builder.finish()
+    if record is not None:
+        record.set_source_span(record_start, tags.next_offset)
+
+    return peeps, fam
+
+
+def read_source(filename, span):
+    """read the raw lines of a record straight from the file by seeking to its span
+
+    Args:
+        filename (string): path of the gedcom file
+        span ((int, int)): start and end byte offsets
+    Returns:
+        string
+    """
+    return read_sources(filename, [span])[span]
+
+
+def read_sources(filename, spans):
+    """read the raw lines of many records with the file opened once.  The spans
+    are read in file order so compressed files are decompressed once, front to back
+
+    Args:
+        filename (string): path of the gedcom file
+        spans (iterable): (start, end) byte offsets of the records
+    Returns:
+        dict (start, end): string
+    """
+    texts = {}
+    with open_binary(filename) as source:
+        encoding = sniff_encoding(source.peek(SNIFF_SIZE)[:SNIFF_SIZE])[0]
+        for start, end in sorted(set(spans)):
+            # compressed files seek by decompressing up to the start
+            source.seek(start)
+            text = source.read(end - start).decode(encoding, "replace")
+            texts[(start, end)] = order_diacritics(text) if encoding == "ansel" else text
+    return texts
 
-    for line in file_data:
-        try:
-            data = tags.processline(line)
-            if data["valid"] == "Y":
-                fam.process_line_data(data)
-                peeps.process_line_data(data)
 
-        except TagsError as err:
-            sys.exit("ERROR: ", err)
+def print_sources(filename, validation_msgs):
+    """print the raw source record of every validation message that has a span.
+    The records are read first, in one pass over the file
+    """
+    sources = read_sources(filename, (msg["span"] for msg in validation_msgs.iter_messages() if "span" in msg))
+    for msg in validation_msgs.iter_messages():
+        if "span" not in msg:
+            continue
+        print("%s %s %s (bytes %i-%i)" % (msg["user_story"], msg["user_id"], msg["message"],
+                                          msg["span"][0], msg["span"][1]))
+        print(sources[msg["span"]].rstrip("\r\n"))
+        print("")
+
+
+def print_messages(filename, validation_msgs, validate_only=False, show_source=False):
+    """print the validation messages, as lines for validation only runs or as a table
 
-    fam.validate()
-    peeps.validate()
+    Args:
+        filename (string): path of the gedcom file, for the sources
+        validation_msgs (ValidationMessages): messages printed
+        validate_only (bool): print tab separated lines instead of tables
+        show_source (bool): also print the source record of every message
+    """
+    if validate_only:
+        validation_msgs.print_lines()
+        if show_source:
+            print("")
+            print_sources(filename, validation_msgs)
+        return
 
-    if validation_msgs.get_messages():
+    if validation_msgs.get_count():
         print("Validation Messages")
         validation_msgs.print_all()
         print("")
+        if show_source:
+            print("Validation Sources")
+            print_sources(filename, validation_msgs)
+
+
+def print_stopped(filename, stopped, validate_only=False, show_source=False):
+    """print the messages found until a run was stopped by its limits and exit
+    with EXIT_STOPPED.  The reports aren't printed as validation didn't finish
+
+    Args:
+        filename (string): path of the gedcom file
+        stopped (ValidationStopped): the limit that was reached
+        validate_only (bool): see print_messages
+        show_source (bool): see print_messages
+    """
+    print_messages(filename, stopped.messages, validate_only, show_source)
+    stopped.messages.close()
+    sys.stderr.write("Validation stopped (%s), %i messages reported so far\n"
+                     % (stopped, stopped.messages.get_count()))
+    sys.exit(EXIT_STOPPED)
+
+
+def load_file(filename, use_cache=False, recover=False, keep_extras=False, sink=None, baseline=None,
+              skip_rules=False, max_errors=None, fail_fast=None, as_of=None):
+    """parse a gedcom file, optionally going through the sidecar snapshot cache
+    so unchanged files are loaded without re-parsing
+
+    Args:
+        filename (string): path of the gedcom file, which may be compressed,
+            or archive.zip!member.ged for a file in a zip archive
+        use_cache (bool): read and write the snapshot next to the file.  Not
+            used when recovering as snapshots are only made of clean parses
+        recover (bool): collect parse errors instead of stopping at the first one
+        keep_extras (bool): keep the unrecognized lines of individuals and families
+            in an ExtraTags store.  The cache isn't used either
+        sink (SummarySink, JsonlSink or SqliteSink): where the messages go, in memory when None
+        baseline (Baseline): known findings left out of the messages, see ValidationMessages.set_baseline
+        skip_rules (bool): skip the rules with known findings for an individual or family
+        max_errors (int): stop once there are this many messages, see ValidationMessages.set_limits
+        fail_fast (iterable): user stories to stop at the first message of
+        as_of (datetime): date ages and the checks against the current time are taken at,
+            None for the time of this load
+    Returns:
+        (ValidationMessages, People, Families) parsed but not yet validated, the limits
+        are kept for validation
+    Raises:
+        IOError: when the file can't be read
+        TagsError: when a line can't be parsed and recover is off
+        ValidationStopped: when the parse errors reach a limit
+    """
+    limited = max_errors is not None or bool(fail_fast)
+    # zip members (archive.zip!member.ged) have no file of their own to stat for the cache
+    use_cache = use_cache and not recover and not keep_extras and os.path.isfile(filename)
+    if use_cache:
+        # imported here so runs without the cache don't load pickle and hashlib
+        import snapshot
+        cached = snapshot.load_snapshot(filename)
+        if cached is not None:
+            if sink is not None or baseline is not None or limited:
+                cached[0].set_baseline(baseline, skip_rules)
+                cached[0].set_limits(max_errors, fail_fast)
+                cached[0].set_sink(MemorySink() if sink is None else sink)
+            cached[1].set_as_of(as_of)
+            return cached
+        source_stat = os.stat(filename)
+
+    # snapshots are written with all the messages in memory, they move to the sink afterwards
+    validation_msgs = ValidationMessages(None if use_cache else sink)
+    if not use_cache:
+        validation_msgs.set_baseline(baseline, skip_rules)
+        validation_msgs.set_limits(max_errors, fail_fast)
+    with GedcomReader.open(filename) as file_data:
+        peeps, fam = parse_file(file_data, validation_msgs, recover, ExtraTags() if keep_extras else None)
+
+    if use_cache:
+        snapshot.save_snapshot(filename, source_stat, validation_msgs, peeps, fam)
+        if sink is not None or baseline is not None or limited:
+            validation_msgs.set_baseline(baseline, skip_rules)
+            validation_msgs.set_limits(max_errors, fail_fast)
+            validation_msgs.set_sink(MemorySink() if sink is None else sink)
 
+    peeps.set_as_of(as_of)
+    return validation_msgs, peeps, fam
+
+
+def print_reports(peeps, fam):
+    """print the individuals and families report tables
+    """
     print("Individuals")
     peeps.print_all()
     peeps.us29_print_deceased()
@@ -64,4 +357,66 @@ def run():
     print("")
 
 
-run()
+def run(argv=None):
+    """main function
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv and argv[0] == "batch":
+        import batch
+        sys.exit(batch.run(argv[1:]))
+    if argv and argv[0] == "daemon":
+        import daemon
+        return daemon.run(argv[1:])
+    options = parse_args(argv)
+    filename = options["filename"]
+    sink = None
+    if options["messages"] is not None:
+        sink = open_sink(options["messages"])
+    elif options["summary"] is not None:
+        sink = SummarySink(options["summary"])
+    known = None
+    if options["baseline"] is not None or options["write_baseline"] is not None:
+        # imported here so runs without a baseline don't load hashlib
+        from baseline import Baseline
+        record = options["write_baseline"] is not None
+        try:
+            known = Baseline(record=record) if options["baseline"] is None else Baseline.load(options["baseline"], record)
+        except IOError:
+            sys.exit("ERROR: baseline file " + options["baseline"] + " was not found!")
+        except ValueError as err:
+            sys.exit("ERROR: invalid baseline file " + str(err))
+
+    try:
+        validation_msgs, peeps, fam = load_file(filename, options["cache"], options["recover"],
+                                                sink=sink, baseline=known,
+                                                skip_rules=options["skip_baselined_rules"],
+                                                max_errors=options["max_errors"], fail_fast=options["fail_fast"],
+                                                as_of=options["as_of"])
+    except IOError:
+        sys.exit("ERROR: file " + filename + " was not found!")
+    except TagsError as err:
+        sys.exit(str(err))
+    except ValidationStopped as stopped:
+        print_stopped(filename, stopped, options["validate_only"], options["show_source"])
+
+    try:
+        fam.validate()
+        peeps.validate()
+    except ValidationStopped as stopped:
+        print_stopped(filename, stopped, options["validate_only"], options["show_source"])
+    if options["write_baseline"] is not None:
+        known.save(options["write_baseline"])
+    if options["baseline"] is not None:
+        sys.stderr.write("%i known findings left out by the baseline\n" % known.get_suppressed_count())
+
+    print_messages(filename, validation_msgs, options["validate_only"], options["show_source"])
+    validation_msgs.close()
+    if options["validate_only"]:
+        return
+
+    print_reports(peeps, fam)
+
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,171 @@
+"""Grammar
+Compiled GEDCOM 5.5.1 lineage-linked grammar used to classify lines by their context
+
+STRUCTURES describes which tags may appear under each structure of the standard,
+mapping every tag to the structure of its own sub lines (None when it has none).
+Structures are compiled once at import into CONTEXTS, a dict keyed by
+(context of the parent line, tag) whose value is the context of the line, so a
+line is classified with a single dict lookup.  Lines not in the grammar (wrong
+parent, wrong level, user defined _TAGS) have no context.
+"""
+
+ROOT = 0
+
+# pieces shared by many structures
+_TEXT = {"CONT": None, "CONC": None}
+_CHANGE_DATE = {"DATE": {"TIME": None}, "NOTE": "NOTE_STRUCTURE"}
+_ADDRESS = {
+    "ADDR": {"CONT": None, "ADR1": None, "ADR2": None, "ADR3": None, "CITY": None,
+             "STAE": None, "POST": None, "CTRY": None},
+    "PHON": None, "EMAIL": None, "FAX": None, "WWW": None,
+}
+_EVENT_DETAIL = dict(_ADDRESS, **{
+    "TYPE": None, "DATE": None, "PLAC": "PLACE_STRUCTURE", "AGNC": None, "RELI": None,
+    "CAUS": None, "RESN": None, "NOTE": "NOTE_STRUCTURE", "SOUR": "SOURCE_CITATION",
+    "OBJE": "MULTIMEDIA_LINK",
+})
+_LDS_ORDINANCE = {"DATE": None, "TEMP": None, "PLAC": None, "STAT": {"DATE": None},
+                  "NOTE": "NOTE_STRUCTURE", "SOUR": "SOURCE_CITATION"}
+_RECORD_COMMON = {"REFN": {"TYPE": None}, "RIN": None, "CHAN": _CHANGE_DATE}
+
+STRUCTURES = {
+    "ROOT": {
+        "HEAD": "HEADER", "FAM": "FAM_RECORD", "INDI": "INDIVIDUAL_RECORD",
+        "OBJE": "MULTIMEDIA_RECORD", "NOTE": "NOTE_RECORD", "REPO": "REPOSITORY_RECORD",
+        "SOUR": "SOURCE_RECORD", "SUBN": "SUBMISSION_RECORD", "SUBM": "SUBMITTER_RECORD",
+        "TRLR": None,
+    },
+    "HEADER": {
+        "SOUR": {"VERS": None, "NAME": None,
+                 "CORP": _ADDRESS,
+                 "DATA": {"DATE": None, "COPR": _TEXT}},
+        "DEST": None, "DATE": {"TIME": None}, "SUBM": None, "SUBN": None, "FILE": None,
+        "COPR": _TEXT, "GEDC": {"VERS": None, "FORM": None}, "CHAR": {"VERS": None},
+        "LANG": None, "PLAC": {"FORM": None}, "NOTE": _TEXT,
+    },
+    "NOTE_STRUCTURE": _TEXT,
+    "SOURCE_CITATION": dict(_TEXT, **{
+        "PAGE": None, "EVEN": {"ROLE": None},
+        "DATA": {"DATE": None, "TEXT": _TEXT},
+        "QUAY": None, "TEXT": _TEXT, "OBJE": "MULTIMEDIA_LINK", "NOTE": "NOTE_STRUCTURE",
+    }),
+    "MULTIMEDIA_LINK": {"FILE": {"FORM": {"MEDI": None}}, "FORM": {"MEDI": None}, "TITL": None},
+    "PLACE_STRUCTURE": {"FORM": None, "FONE": {"TYPE": None}, "ROMN": {"TYPE": None},
+                        "MAP": {"LATI": None, "LONG": None}, "NOTE": "NOTE_STRUCTURE"},
+    "INDIVIDUAL_EVENT_DETAIL": dict(_EVENT_DETAIL, AGE=None),
+    "FAMILY_EVENT_DETAIL": dict(_EVENT_DETAIL, HUSB={"AGE": None}, WIFE={"AGE": None}),
+    "BIRTH_EVENT_DETAIL": dict(_EVENT_DETAIL, AGE=None, FAMC=None),
+    "ADOPTION_EVENT_DETAIL": dict(_EVENT_DETAIL, AGE=None, FAMC={"ADOP": None}),
+    "PERSONAL_NAME_STRUCTURE": {
+        "TYPE": None, "NPFX": None, "GIVN": None, "NICK": None, "SPFX": None, "SURN": None,
+        "NSFX": None, "NOTE": "NOTE_STRUCTURE", "SOUR": "SOURCE_CITATION",
+        "FONE": "NAME_VARIATION", "ROMN": "NAME_VARIATION",
+    },
+    "NAME_VARIATION": {
+        "TYPE": None, "NPFX": None, "GIVN": None, "NICK": None, "SPFX": None, "SURN": None,
+        "NSFX": None, "NOTE": "NOTE_STRUCTURE", "SOUR": "SOURCE_CITATION",
+    },
+    "INDIVIDUAL_RECORD": dict(_RECORD_COMMON, **{
+        "RESN": None, "NAME": "PERSONAL_NAME_STRUCTURE", "SEX": None,
+        # individual events
+        "BIRT": "BIRTH_EVENT_DETAIL", "CHR": "BIRTH_EVENT_DETAIL", "ADOP": "ADOPTION_EVENT_DETAIL",
+        "DEAT": "INDIVIDUAL_EVENT_DETAIL", "BURI": "INDIVIDUAL_EVENT_DETAIL",
+        "CREM": "INDIVIDUAL_EVENT_DETAIL", "BAPM": "INDIVIDUAL_EVENT_DETAIL",
+        "BARM": "INDIVIDUAL_EVENT_DETAIL", "BASM": "INDIVIDUAL_EVENT_DETAIL",
+        "BLES": "INDIVIDUAL_EVENT_DETAIL", "CHRA": "INDIVIDUAL_EVENT_DETAIL",
+        "CONF": "INDIVIDUAL_EVENT_DETAIL", "FCOM": "INDIVIDUAL_EVENT_DETAIL",
+        "ORDN": "INDIVIDUAL_EVENT_DETAIL", "NATU": "INDIVIDUAL_EVENT_DETAIL",
+        "EMIG": "INDIVIDUAL_EVENT_DETAIL", "IMMI": "INDIVIDUAL_EVENT_DETAIL",
+        "CENS": "INDIVIDUAL_EVENT_DETAIL", "PROB": "INDIVIDUAL_EVENT_DETAIL",
+        "WILL": "INDIVIDUAL_EVENT_DETAIL", "GRAD": "INDIVIDUAL_EVENT_DETAIL",
+        "RETI": "INDIVIDUAL_EVENT_DETAIL", "EVEN": "INDIVIDUAL_EVENT_DETAIL",
+        # individual attributes
+        "CAST": "INDIVIDUAL_EVENT_DETAIL", "DSCR": dict(_EVENT_DETAIL, AGE=None, **_TEXT),
+        "EDUC": "INDIVIDUAL_EVENT_DETAIL", "IDNO": "INDIVIDUAL_EVENT_DETAIL",
+        "NATI": "INDIVIDUAL_EVENT_DETAIL", "NCHI": "INDIVIDUAL_EVENT_DETAIL",
+        "NMR": "INDIVIDUAL_EVENT_DETAIL", "OCCU": "INDIVIDUAL_EVENT_DETAIL",
+        "PROP": "INDIVIDUAL_EVENT_DETAIL", "RELI": "INDIVIDUAL_EVENT_DETAIL",
+        "RESI": "INDIVIDUAL_EVENT_DETAIL", "SSN": "INDIVIDUAL_EVENT_DETAIL",
+        "TITL": "INDIVIDUAL_EVENT_DETAIL", "FACT": "INDIVIDUAL_EVENT_DETAIL",
+        # LDS individual ordinances
+        "BAPL": _LDS_ORDINANCE, "CONL": _LDS_ORDINANCE, "ENDL": _LDS_ORDINANCE,
+        "SLGC": dict(_LDS_ORDINANCE, FAMC=None),
+        "FAMC": {"PEDI": None, "STAT": None, "NOTE": "NOTE_STRUCTURE"},
+        "FAMS": {"NOTE": "NOTE_STRUCTURE"},
+        "SUBM": None, "ASSO": {"RELA": None, "SOUR": "SOURCE_CITATION", "NOTE": "NOTE_STRUCTURE"},
+        "ALIA": None, "ANCI": None, "DESI": None, "RFN": None, "AFN": None,
+        "NOTE": "NOTE_STRUCTURE", "SOUR": "SOURCE_CITATION", "OBJE": "MULTIMEDIA_LINK",
+    }),
+    "FAM_RECORD": dict(_RECORD_COMMON, **{
+        "RESN": None,
+        "ANUL": "FAMILY_EVENT_DETAIL", "CENS": "FAMILY_EVENT_DETAIL", "DIV": "FAMILY_EVENT_DETAIL",
+        "DIVF": "FAMILY_EVENT_DETAIL", "ENGA": "FAMILY_EVENT_DETAIL", "MARB": "FAMILY_EVENT_DETAIL",
+        "MARC": "FAMILY_EVENT_DETAIL", "MARR": "FAMILY_EVENT_DETAIL", "MARL": "FAMILY_EVENT_DETAIL",
+        "MARS": "FAMILY_EVENT_DETAIL", "RESI": "FAMILY_EVENT_DETAIL", "EVEN": "FAMILY_EVENT_DETAIL",
+        "HUSB": None, "WIFE": None, "CHIL": None, "NCHI": None, "SUBM": None,
+        "SLGS": _LDS_ORDINANCE,
+        "NOTE": "NOTE_STRUCTURE", "SOUR": "SOURCE_CITATION", "OBJE": "MULTIMEDIA_LINK",
+    }),
+    "MULTIMEDIA_RECORD": dict(_RECORD_COMMON, **{
+        "FILE": {"FORM": {"TYPE": None}, "TITL": None},
+        "NOTE": "NOTE_STRUCTURE", "SOUR": "SOURCE_CITATION",
+    }),
+    "NOTE_RECORD": dict(_RECORD_COMMON, SOUR="SOURCE_CITATION", **_TEXT),
+    "REPOSITORY_RECORD": dict(_RECORD_COMMON, NAME=None, NOTE="NOTE_STRUCTURE", **_ADDRESS),
+    "SOURCE_RECORD": dict(_RECORD_COMMON, **{
+        "DATA": {"EVEN": {"DATE": None, "PLAC": None}, "AGNC": None, "NOTE": "NOTE_STRUCTURE"},
+        "AUTH": _TEXT, "TITL": _TEXT, "ABBR": None, "PUBL": _TEXT, "TEXT": _TEXT,
+        "REPO": {"NOTE": "NOTE_STRUCTURE", "CALN": {"MEDI": None}},
+        "NOTE": "NOTE_STRUCTURE", "OBJE": "MULTIMEDIA_LINK",
+    }),
+    "SUBMISSION_RECORD": {"SUBM": None, "FAMF": None, "TEMP": None, "ANCE": None, "DESC": None,
+                          "ORDI": None, "RIN": None, "NOTE": "NOTE_STRUCTURE", "CHAN": _CHANGE_DATE},
+    "SUBMITTER_RECORD": dict(_RECORD_COMMON, NAME=None, OBJE="MULTIMEDIA_LINK", LANG=None, RFN=None,
+                             NOTE="NOTE_STRUCTURE", **_ADDRESS),
+}
+
+
+def compile_grammar(structures):
+    """compile the structures into the (parent context, tag): context lookup.
+    Every named or inline structure gets one context shared by all the tags using
+    it and tags without sub lines all share one leaf context
+
+    Args:
+        structures (dict): structure name: {tag: structure name, inline dict or None}
+    Returns:
+        dict (int, string): int with the root context being ROOT
+    """
+    contexts = {}
+    named = {"ROOT": ROOT}
+    inline = {}
+    leaf = [None]
+    pending = [(ROOT, structures["ROOT"])]
+    next_id = [ROOT + 1]
+
+    def new_context():
+        next_id[0] += 1
+        return next_id[0] - 1
+
+    def context_of(child):
+        if child is None:
+            if leaf[0] is None:
+                leaf[0] = new_context()
+            return leaf[0]
+        if isinstance(child, str):
+            if child not in named:
+                named[child] = new_context()
+                pending.append((named[child], structures[child]))
+            return named[child]
+        if id(child) not in inline:
+            inline[id(child)] = new_context()
+            pending.append((inline[id(child)], child))
+        return inline[id(child)]
+
+    while pending:
+        parent, structure = pending.pop()
+        for tag, child in structure.items():
+            contexts[(parent, tag)] = context_of(child)
+    return contexts
+
+
+CONTEXTS = compile_grammar(STRUCTURES)
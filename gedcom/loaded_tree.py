@@ -0,0 +1,55 @@
+"""LoadedTree
+A parsed and validated gedcom file kept in memory by long running processes
+"""
+import os
+import time
+import gedcom
+
+
+def tree_name(filename):
+    """returns the name of the tree of a file: the file name without directory and extension
+
+    Args:
+        filename (string): path of the gedcom file
+    Returns:
+        string
+    """
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+class LoadedTree(object):
+    """LoadedTree
+    A parsed and validated gedcom file.  Not modified after it is built
+
+    Args:
+        filename (string): path of the gedcom file
+        use_cache (bool): go through the sidecar snapshot cache when parsing
+        as_of (datetime): date ages and the checks against the current time are taken at,
+            None for the time the tree is loaded
+    Attributes:
+        name (string): file name without directory and extension
+        messages (ValidationMessages): validation results
+        people (People): individuals
+        families (Families): families
+        loaded_at (float): time the tree finished loading
+    """
+
+    def __init__(self, filename, use_cache=False, as_of=None):
+        self.filename = filename
+        self.name = tree_name(filename)
+        self.messages, self.people, self.families = gedcom.load_file(filename, use_cache, as_of=as_of)
+        self.families.validate()
+        self.people.validate()
+        self.loaded_at = time.time()
+
+    def summary(self):
+        """returns the tree counts as a dict
+        """
+        return {
+            "name": self.name,
+            "file": self.filename,
+            "people": len(self.people.individuals),
+            "families": len(self.families.families),
+            "messages": self.messages.get_count(),
+            "loaded_at": self.loaded_at
+        }
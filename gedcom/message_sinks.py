@@ -0,0 +1,274 @@
+"""Message sinks
+Where ValidationMessages stores its messages
+
+A message is stored as a record tuple:
+    (error_id, user_story, user_id, name, template, args, span)
+The text of the message is template % args, formatted only when the message
+is read (see render).  args is None for messages given as plain text, span is
+None when the source of the record isn't known.
+
+MemorySink keeps the records in a list, the default.  JsonlSink and SqliteSink
+write them to a file as they are added and read them back from the file without
+keeping anything per message in memory.  SummarySink only counts the messages
+of each error type and user story and keeps their first few records as examples.
+"""
+import os
+from operator import itemgetter
+
+# rows written to sqlite per executemany
+SQLITE_BATCH = 10000
+
+
+def render(record):
+    """returns the message dict of a record tuple, with a "span" entry when the span is known
+    """
+    error_id, user_story, user_id, name, template, args, span = record
+    msg = {
+        "error_id": error_id,
+        "user_story": user_story,
+        "user_id": user_id,
+        "name": name,
+        "message": template if args is None else template % args
+    }
+    if span is not None:
+        msg["span"] = span
+    return msg
+
+
+def open_sink(filename):
+    """open the file sink for a file name by its extension
+
+    Args:
+        filename (string): .jsonl for JsonlSink, .sqlite or .db for SqliteSink
+    Returns:
+        JsonlSink or SqliteSink, None for other extensions
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".jsonl":
+        return JsonlSink(filename)
+    if extension in (".sqlite", ".db"):
+        return SqliteSink(filename)
+    return None
+
+
+class MemorySink(object):
+    """MemorySink
+    Keeps the record tuples in memory, the messages are formatted when they are read
+    """
+
+    def __init__(self):
+        self._records = []
+
+    def add(self, record):
+        """store a record tuple
+        """
+        self._records.append(record)
+
+    def records(self, by_story=False):
+        """returns the record tuples in the order they were added
+
+        Args:
+            by_story (bool): order by user story, keeping the order they were added within a story
+        Returns:
+            iterable of record tuples
+        """
+        if by_story:
+            return sorted(self._records, key=itemgetter(1))
+        return iter(self._records)
+
+    def close(self):
+        """nothing to close for records in memory
+        """
+
+
+class SummarySink(object):
+    """SummarySink
+    Counts the messages of every (error type, user story) and keeps the first
+    records of each as examples, so the memory used only depends on the number
+    of user stories
+
+    Args:
+        examples (int): records kept for every error type and user story
+    """
+
+    def __init__(self, examples=5):
+        self._examples = examples
+        # (user story, error id): number of messages
+        self._counts = {}
+        # the examples in the order they were added
+        self._records = []
+
+    def add(self, record):
+        """count a record tuple, kept when its user story doesn't have all its examples yet
+        """
+        key = (record[1], record[0])
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        if count < self._examples:
+            self._records.append(record)
+
+    def records(self, by_story=False):
+        """returns the examples, see MemorySink.records
+        """
+        if by_story:
+            return sorted(self._records, key=itemgetter(1))
+        return iter(self._records)
+
+    def get_summary(self):
+        """returns the message counts ordered by user story and error type
+        Returns:
+            (string, string, int)[] user story, error id and number of messages
+        """
+        return [(story, error_id, count) for (story, error_id), count in sorted(self._counts.items())]
+
+    def close(self):
+        """nothing to close for the summary
+        """
+
+
+class JsonlSink(object):
+    """JsonlSink
+    Writes every record as a line of JSON as it is added, the template and its
+    arguments apart like SqliteSink.  Reading the records back streams the file.
+    Read by user story the lines are first copied to a temporary file per user
+    story, so memory only grows with the number of user stories
+
+    Args:
+        filename (string): file written, replaced when it exists
+    """
+
+    def __init__(self, filename):
+        # imported here so runs keeping the messages in memory don't load json
+        import json
+        self._json = json
+        self._filename = filename
+        self._file = open(filename, "wb")
+
+    def add(self, record):
+        """write a record tuple as a line of JSON
+        """
+        error_id, user_story, user_id, name, template, args, span = record
+        line = self._json.dumps({"error_id": error_id, "user_story": user_story, "user_id": user_id,
+                                 "name": name, "template": template, "args": args, "span": span},
+                                ensure_ascii=False).encode("utf-8") + b"\n"
+        self._file.write(line)
+
+    def records(self, by_story=False):
+        """returns the record tuples read back from the file
+
+        Args:
+            by_story (bool): order by user story, the file is split by user story first
+        Returns:
+            iterable of record tuples
+        """
+        self._file.flush()
+        if by_story:
+            return self._read_by_story()
+        return self._read()
+
+    def _record(self, line):
+        """returns the record tuple of a line
+        """
+        msg = self._json.loads(line)
+        args = msg["args"]
+        span = msg["span"]
+        return (msg["error_id"], msg["user_story"], msg["user_id"], msg["name"], msg["template"],
+                None if args is None else tuple(args), None if span is None else tuple(span))
+
+    def _read(self):
+        """yields the records in the order they were added
+        """
+        with open(self._filename, "rb") as lines:
+            for line in lines:
+                yield self._record(line)
+
+    def _read_by_story(self):
+        """yields the records of every user story in turn, from temporary files
+        the lines of each user story are copied to in one pass over the file
+        """
+        # imported here, tempfile loads re
+        import tempfile
+        stories = {}
+        try:
+            with open(self._filename, "rb") as lines:
+                for line in lines:
+                    story = self._json.loads(line)["user_story"]
+                    story_file = stories.get(story)
+                    if story_file is None:
+                        story_file = stories[story] = tempfile.TemporaryFile()
+                    story_file.write(line)
+            for story in sorted(stories):
+                story_file = stories[story]
+                story_file.seek(0)
+                for line in story_file:
+                    yield self._record(line)
+        finally:
+            for story_file in stories.values():
+                story_file.close()
+
+    def close(self):
+        """close the file, the records can't be read afterwards
+        """
+        self._file.close()
+
+
+class SqliteSink(object):
+    """SqliteSink
+    Inserts the record tuples into a messages table in batches.  Templates and
+    arguments are stored apart, the messages are formatted when they are read
+
+    Args:
+        filename (string): database file, an existing messages table is replaced
+    """
+
+    def __init__(self, filename):
+        # imported here so runs keeping the messages in memory don't load sqlite3
+        import json
+        import sqlite3
+        self._json = json
+        self._db = sqlite3.connect(filename)
+        self._db.execute("DROP TABLE IF EXISTS messages")
+        self._db.execute("CREATE TABLE messages (id INTEGER PRIMARY KEY, error_id TEXT, user_story TEXT, "
+                         "user_id TEXT, name TEXT, template TEXT, args TEXT, span_start INTEGER, span_end INTEGER)")
+        self._pending = []
+
+    def add(self, record):
+        """queue a record tuple, inserted with the next batch
+        """
+        error_id, user_story, user_id, name, template, args, span = record
+        self._pending.append((error_id, user_story, user_id, name, template,
+                              None if args is None else self._json.dumps(args),
+                              None if span is None else span[0], None if span is None else span[1]))
+        if len(self._pending) >= SQLITE_BATCH:
+            self._flush()
+
+    def _flush(self):
+        """insert the queued rows
+        """
+        self._db.executemany("INSERT INTO messages (error_id, user_story, user_id, name, template, args, "
+                             "span_start, span_end) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._pending)
+        self._db.commit()
+        self._pending = []
+
+    def records(self, by_story=False):
+        """returns the record tuples read back from the database
+
+        Args:
+            by_story (bool): order by user story, then by the order they were added
+        Returns:
+            iterable of record tuples
+        """
+        self._flush()
+        order = "user_story, id" if by_story else "id"
+        cursor = self._db.execute("SELECT error_id, user_story, user_id, name, template, args, span_start, span_end "
+                                  "FROM messages ORDER BY " + order)
+        return ((error_id, user_story, user_id, name, template,
+                 None if args is None else tuple(self._json.loads(args)),
+                 None if start is None else (start, end))
+                for error_id, user_story, user_id, name, template, args, start, end in cursor)
+
+    def close(self):
+        """insert the queued rows and close the database
+        """
+        self._flush()
+        self._db.close()
@@ -3,9 +3,11 @@ Parses person tags from the gedcom data passed to it line by line as they appear
 """
 from datetime import datetime
 from datetime import timedelta
+from sys import intern
 from person import Person
-from prettytable import PrettyTable
 from family import Family
+from record_builder import RecordBuilder
+from record_index import RecordIndex, ordered_ids
 
 
 class People(object):
@@ -13,26 +15,102 @@ class People(object):
     Contains logic for processing person (INDI) tags
 
     Attributes:
-        individuals: :list:Person list of Person
+        individuals: :list:Person list of Person, a RecordIndex keyed by person id
     """
     CLASS_IDENTIFIER = "INDIVIDUAL"
+    # user stories reported by a rule: rule run on every individual by validate
+    RULES = (
+        (("US03",), "_us03_is_valid_birth_date"),
+        (("US07",), "_us07_is_valid_age"),
+        (("US01",), "_us01_is_valid_birth_current_dates"),
+        (("US01",), "_us01_is_valid_death_current_dates"),
+        (("US18",), "_us18_is_valid_sibling"),
+        (("US26",), "_us26_validate_corresponding_entries"),
+    )
 
     def __init__(self, validation_messages):
-        self.individuals = {}
+        self.individuals = RecordIndex()
         self._curr_person = None
-        self._current_level_1 = None
-        self._current_time = datetime.now()
-        self._days_in_year = 365.2425
+        # builder used when lines are passed to process_line_data directly
+        self._builder = None
         self._msgs = validation_messages
         self._families = None
+        self._extra_tags = None
+        # see set_as_of
+        self._as_of = datetime.now()
 
     def set_families(self, families):
         """sets the Families class that should be used
         """
         self._families = families
 
+    def set_extra_tags(self, extra_tags):
+        """sets the store of the unrecognized lines kept while parsing
+        """
+        self._extra_tags = extra_tags
+
+    def get_extra_tags(self):
+        """returns the store of the unrecognized lines kept while parsing
+        Returns:
+            ExtraTags or None when they weren't kept
+        """
+        return self._extra_tags
+
+    def find_source_span(self, record_id):
+        """returns the source span of an individual or family by id
+        Args:
+            record_id (string): id of the individual or family
+        Returns:
+            (int, int) or None
+        """
+        record = self.individuals.get(record_id)
+        if record is None and self._families is not None:
+            record = self._families.families.get(record_id)
+        return None if record is None else record.get_source_span()
+
+    def set_as_of(self, as_of=None):
+        """set the date of the tree: ages and the checks against the current time
+        of its people and families are taken at it.  Set by gedcom.load_file for
+        every load, the time People was created until then
+
+        Args:
+            as_of (datetime): reference date, None for the current time
+        """
+        self._as_of = datetime.now() if as_of is None else as_of
+
+    def get_as_of(self):
+        """returns the date of the tree, see set_as_of
+        Returns:
+            datetime
+        """
+        return self._as_of
+
+    @property
+    def _current_time(self):
+        """date of the tree the checks against the current time use, see set_as_of
+        """
+        return self._as_of
+
+    def register_handlers(self, builder):
+        """register the INDI record handlers with a record builder
+
+        Args:
+            builder (RecordBuilder): builder driven with the lines of the file
+        """
+        builder.register(None, "INDI", self._start_person)
+        builder.register("INDI", "NAME", self._set_name)
+        # also kept as facts so they are written back
+        builder.register("NAME", "GIVN", self._set_given_name, keep=True)
+        builder.register("NAME", "SURN", self._set_surname, keep=True)
+        builder.register("INDI", "SEX", self._set_gender)
+        builder.register("INDI", "FAMC", self._add_children_of_family)
+        builder.register("INDI", "FAMS", self._add_spouse_of_family)
+        builder.register("BIRT", "DATE", self._set_birth_date)
+        builder.register("DEAT", "DATE", self._set_death_date)
+
     def process_line_data(self, data):
-        """line data is a dict of the format:
+        """process a single line through a record builder with only the person handlers.
+        line data is a dict of the format:
         {
             "level": int,
             "tag": string,
@@ -43,54 +121,52 @@ class People(object):
         if data["valid"] == "N":
             raise ValueError
 
-        if data["level"] < 2:
-            self._current_level_1 = None
-
-        if data["tag"] == "INDI":
-            self._curr_person = Person(data["args"])
-            # US22
-            if data["args"] in self.individuals:
-                self._msgs.add_message(self.CLASS_IDENTIFIER, "US22", data["args"],
-                                       "NA", "Not unique individual ID " + data["args"] + " ")
-            self.individuals.setdefault(data["args"], self._curr_person)
+        if self._builder is None:
+            self._builder = RecordBuilder()
+            self.register_handlers(self._builder)
+        self._builder.process_line_data(data)
 
-        if data["tag"] == "SEX":
-            self._curr_person.set_gender(data["args"])
-            self._current_level_1 = "SEX"
+    def _start_person(self, data):
+        # xrefs are interned so a record id and all links to it share one string
+        self._curr_person = Person(intern(data["args"]))
+        # US22
+        if data["args"] in self.individuals:
+            self._msgs.add_message(self.CLASS_IDENTIFIER, "US22", data["args"],
+                                   "NA", "Not unique individual ID %s ", args=(data["args"],))
+        self.individuals.setdefault(self._curr_person.get_person_id(), self._curr_person)
+        return self._curr_person
 
-        if data["tag"] == "BIRT":
-            self._current_level_1 = "BIRT"
+    def _set_name(self, data):
+        self._curr_person.set_name(data["args"])
 
-        if data["tag"] == "DEAT":
-            self._current_level_1 = "DEAT"
+    def _set_given_name(self, data):
+        self._curr_person.set_given_name(data["args"])
 
-        if data["tag"] == "FAMC":
-            self._curr_person.add_children_of_family(data["args"])
-            self._current_level_1 = "FAMC"
+    def _set_surname(self, data):
+        self._curr_person.set_surname(data["args"])
 
-        if data["tag"] == "FAMS":
-            self._curr_person.add_spouse_of_family(data["args"])
-            self._current_level_1 = "FAMS"
+    def _set_gender(self, data):
+        self._curr_person.set_gender(data["args"])
 
-        if data["tag"] == "DEAT":
-            self._current_level_1 = "DEAT"
+    def _add_children_of_family(self, data):
+        self._curr_person.add_children_of_family(intern(data["args"]))
 
-        if data["tag"] == "NAME":
-            self._curr_person.set_name(data["args"])
-            self._current_level_1 = "NAME"
+    def _add_spouse_of_family(self, data):
+        self._curr_person.add_spouse_of_family(intern(data["args"]))
 
-        if data["tag"] == "DATE":
-            if self._current_level_1 == "BIRT":
-                self._curr_person.set_date(data["args"], "birth")
+    def _set_birth_date(self, data):
+        self._curr_person.set_date(data["args"], "birth")
 
-            if self._current_level_1 == "DEAT":
-                self._curr_person.set_date(data["args"], "death")
+    def _set_death_date(self, data):
+        self._curr_person.set_date(data["args"], "death")
 
     def print_all(self):
         """print all individuals information
         """
-        people_keys = sorted(self.individuals.keys())
+        people_keys = ordered_ids(self.individuals)
 
+        # loaded lazily so validation only runs never import prettytable
+        from prettytable import PrettyTable
         p_table = PrettyTable(["ID", "Name", "Gender", "Birthday",
                                "Age", "Alive", "Death", "Child", "Spouse"])
         for idx in people_keys:
@@ -107,7 +183,7 @@ class People(object):
                 person.get_name(),
                 person.get_gender(),
                 birth_date,
-                person.get_age(),
+                person.get_age(self._current_time),
                 person.get_is_alive(),
                 death_date,
                 person.get_children_of_families(),
@@ -119,6 +195,7 @@ class People(object):
         Prints all deceased individuals
         """
         people = self.individuals
+        from prettytable import PrettyTable
         table = PrettyTable(["ID", "Name", "Alive"])
 
         for person_id in people:
@@ -135,12 +212,13 @@ class People(object):
         Prints birthdays within the next 30 days
         """
         people = self.individuals
+        from prettytable import PrettyTable
         table = PrettyTable(["ID", "Name", "Birthday"])
 
         for person_id in people:
             # type: Person
             individual = self.individuals[person_id]
-            today = datetime.today()
+            today = self._current_time
             individual_birthday = individual.get_birth_date()
             if individual_birthday is not None and individual.get_is_alive():
                 individual_current_birthday = datetime(today.year, individual_birthday.month, individual_birthday.day)
@@ -156,15 +234,17 @@ class People(object):
         and never been married
         """
         people = self.individuals
+        from prettytable import PrettyTable
         table = PrettyTable(["ID", "Name", "Alive", "Age", "Spouses"])
 
         for person_id in people:
             # type: Person
             individual = self.individuals[person_id]
-            if individual.get_age() is not None:
-                if individual.get_is_alive() and individual.get_age() > 30 and not individual.get_spouse_of_families():
+            age = individual.get_age(self._current_time)
+            if age is not None:
+                if individual.get_is_alive() and age > 30 and not individual.get_spouse_of_families():
                     table.add_row([individual.get_person_id(), individual.get_name(), individual.get_is_alive(),
-                                   individual.get_age(), individual.get_spouse_of_families()])
+                                   age, individual.get_spouse_of_families()])
 
         print("Single Individuals")
         print(table)
@@ -173,6 +253,7 @@ class People(object):
         """" US35 Print births in the last 30 days in pretty table
         """
         people = self.individuals
+        from prettytable import PrettyTable
         table = PrettyTable(["ID", "Name", "Birthdate"])
 
         for person_id in people:
@@ -191,6 +272,7 @@ class People(object):
         """" US36 Print deaths in the last 30 days in pretty table
         """
         people = self.individuals
+        from prettytable import PrettyTable
         table = PrettyTable(["ID", "Name", "Deathdate"])
 
         for person_id in people:
@@ -224,8 +306,8 @@ class People(object):
         Args:
             person: Person
         """
-        if person.get_age() is not None:
-            if person.get_age() > 149:
+        if person.get_age(self._current_time) is not None:
+            if person.get_age(self._current_time) > 149:
                 self._msgs.add_message(self.CLASS_IDENTIFIER,
                                        "US07",
                                        person.get_person_id(),
@@ -274,16 +356,20 @@ class People(object):
     def validate(self):
         """run through all validation rules around people
         """
+        if self._families is not None:
+            # dangling family ids are reported as XREF by Families.validate
+            self._families.ensure_references(families=False)
         # ensure the order of results doesn't change between runs
-        ind_keys = sorted(self.individuals.keys())
+        ind_keys = ordered_ids(self.individuals)
+        rules = [(stories, getattr(self, name)) for stories, name in self.RULES]
+        # rules with known findings for a person can be skipped, see ValidationMessages.skip_rule
+        skipping = self._msgs.get_skip_rules()
         for idx in ind_keys:
             person = self.individuals[idx]
-            self._us03_is_valid_birth_date(person)
-            self._us07_is_valid_age(person)
-            self._us01_is_valid_birth_current_dates(person)
-            self._us01_is_valid_death_current_dates(person)
-            self._us18_is_valid_sibling(person)
-            self._us26_validate_corresponding_entries(person)
+            for stories, rule in rules:
+                if skipping and self._msgs.skip_rule(stories, idx):
+                    continue
+                rule(person)
 
     def _us26_validate_corresponding_entries(self, person):
         """US26: check that the person's family links exist in the family record
@@ -291,18 +377,12 @@ class People(object):
         us_num = "US26"
         peep_id = person.get_person_id()
         name = person.get_name()
-        for fam_id in person.get_spouse_of_families():
-            fam = None
-            if fam_id in self._families.families:
-                fam = self._families.families[fam_id]
-            if fam is None or fam.get_husband_id() != peep_id and fam.get_wife_id() != peep_id:
+        for fam in person.get_families_as_spouse():
+            if fam.get_husband_id() != peep_id and fam.get_wife_id() != peep_id:
                 self._msgs.add_message(self.CLASS_IDENTIFIER, us_num, peep_id,
-                                       name, "corresponding spouse link missing in family " + fam_id)
+                                       name, "corresponding spouse link missing in family %s", args=(fam.get_family_id(),))
 
-        for fam_id in person.get_children_of_families():
-            fam = None
-            if fam_id in self._families.families:
-                fam = self._families.families[fam_id]
-            if fam is None or peep_id not in fam.get_children():
+        for fam in person.get_families_as_child():
+            if peep_id not in fam.get_children():
                 self._msgs.add_message(self.CLASS_IDENTIFIER, us_num, peep_id,
-                                       name, "corresponding child link missing in family " + fam_id)
+                                       name, "corresponding child link missing in family %s", args=(fam.get_family_id(),))
@@ -2,6 +2,38 @@
 Single person object in GEDCOM with helper methods
 """
 from datetime import datetime
+from sys import intern
+
+
+def split_name(name):
+    """split a gedcom name of the form Given /Surname/ Suffix into its interned parts
+
+    Args:
+        name (string): NAME value
+    Returns:
+        (string, string, string) given name, surname (None when the name has
+        no /Surname/ part) and suffix
+    """
+    pieces = name.split("/")
+    if len(pieces) == 1:
+        return intern(name.strip()), None, ""
+    if len(pieces) == 2:
+        # no closing slash, the surname runs to the end
+        return intern(pieces[0].strip()), intern(pieces[1].strip()), ""
+    return intern(pieces[0].strip()), intern("/".join(pieces[1:-1]).strip()), intern(pieces[-1].strip())
+
+
+def years_between(start, end):
+    """returns the whole calendar years from start to end, a year is complete
+    on its anniversary (March 1st for February 29th outside leap years)
+
+    Args:
+        start (datetime): first date
+        end (datetime): last date
+    Returns:
+        int
+    """
+    return end.year - start.year - ((end.month, end.day) < (start.month, start.day))
 
 
 class Person(object):
@@ -12,18 +44,38 @@ class Person(object):
         person_id (string): id of person
     """
     CLASS_IDENTIFIER = "INDIVIDUAL"
-    DAYS_IN_YEAR = 365.2425
-    CURRENT_TIME = datetime.now()
 
     def __init__(self, person_id):
         self._person_id = person_id
         self._name = ""
+        # parts of the name, split once when it is set.  GIVN and SURN lines replace them
+        self._given_name = ""
+        self._surname = None
+        self._name_suffix = ""
         self._gender = ""
         self._is_alive = True  # Automatically set by having death date
         self._birth_date = None
         self._death_date = None
         self._child_of_families = []
         self._spouse_of_families = []
+        self._source_span = None
+        # lines of the record in the grammar that aren't stored in a field, None until the first one
+        self._facts = None
+        # Family objects the family ids point to, set by Families.resolve_references
+        self._child_of_family_refs = []
+        self._spouse_of_family_refs = []
+        # (as of date, age) of the last get_age call
+        self._age_cache = None
+
+    def __getstate__(self):
+        """pickles without the resolved references, which would pickle the whole
+        tree recursively from any one record, and without the cached age
+        """
+        state = self.__dict__.copy()
+        state["_child_of_family_refs"] = []
+        state["_spouse_of_family_refs"] = []
+        state["_age_cache"] = None
+        return state
 
     def get_person_id(self):
         """returns the person id
@@ -40,11 +92,58 @@ class Person(object):
         return self._name
 
     def set_name(self, name):
-        """sets name
+        """sets name and its given name, surname and suffix parts
         Args:
             name (string): name
         """
         self._name = name
+        self._given_name, self._surname, self._name_suffix = split_name(name)
+
+    def get_given_name(self):
+        """returns the given name(s)
+        Returns:
+            string
+        """
+        return self._given_name
+
+    def set_given_name(self, given_name):
+        """sets the given name, e.g. from a GIVN line
+        Args:
+            given_name (string): given name(s)
+        """
+        self._given_name = intern(given_name)
+
+    def get_surname(self):
+        """returns the surname
+        Returns:
+            string or None when the name has no surname
+        """
+        return self._surname
+
+    def set_surname(self, surname):
+        """sets the surname, e.g. from a SURN line
+        Args:
+            surname (string): surname
+        """
+        self._surname = intern(surname)
+
+    def get_name_suffix(self):
+        """returns the name suffix, e.g. Jr.
+        Returns:
+            string
+        """
+        return self._name_suffix
+
+    def set_name_parts(self, given_name, surname, suffix):
+        """sets all parts of the name at once, e.g. when loading a stored person
+        Args:
+            given_name (string): given name(s)
+            surname (string): surname, None for no surname
+            suffix (string): name suffix
+        """
+        self._given_name = intern(given_name)
+        self._surname = None if surname is None else intern(surname)
+        self._name_suffix = intern(suffix)
 
     def get_gender(self):
         """returns gender
@@ -88,11 +187,20 @@ class Person(object):
             date_string (string): string of the datetime to parse in the format '%d %b %Y'
             date_type (string): birth, death
         """
+        self.set_date_value(datetime.strptime(date_string, '%d %b %Y'), date_type)
+
+    def set_date_value(self, date, date_type):
+        """sets an already parsed date and also sets whether the person is alive
+        Args:
+            date (datetime): date to set
+            date_type (string): birth, death
+        """
         if date_type == "birth":
-            self._birth_date = datetime.strptime(date_string, '%d %b %Y')
+            self._birth_date = date
         if date_type == "death":
-            self._death_date = datetime.strptime(date_string, '%d %b %Y')
-            self._is_alive = False
+            self._death_date = date
+            self._is_alive = date is None
+        self._age_cache = None
 
     def get_children_of_families(self):
         """returns family ids person is a child of
@@ -136,12 +244,44 @@ class Person(object):
         """
         self._spouse_of_families.remove(family_id)
 
-    def get_age(self):
-        """returns person's age
+    def get_families_as_child(self):
+        """returns the families the person is a child of, resolved from their ids.
+        Ids that point to no family are left out
+        Returns:
+            Family[]
+        """
+        return self._child_of_family_refs
+
+    def get_families_as_spouse(self):
+        """returns the families the person is a spouse of, resolved from their ids.
+        Ids that point to no family are left out
+        Returns:
+            Family[]
+        """
+        return self._spouse_of_family_refs
+
+    def set_family_references(self, child_of, spouse_of):
+        """sets the Family objects the family ids point to
+        Args:
+            child_of (Family[]): families the person is a child of
+            spouse_of (Family[]): families the person is a spouse of
+        """
+        self._child_of_family_refs = child_of
+        self._spouse_of_family_refs = spouse_of
+
+    def get_age(self, as_of=None):
+        """returns person's age at the date of the tree, computed once per date
+        Args:
+            as_of (datetime): date of the tree, see People.get_as_of.  None for the current time
         Returns:
             int
         """
-        return self._generate_age(self.CURRENT_TIME)
+        if as_of is None:
+            as_of = datetime.now()
+        cache = self._age_cache
+        if cache is None or cache[0] != as_of:
+            cache = self._age_cache = (as_of, self._generate_age(as_of))
+        return cache[1]
 
     def get_age_at_date(self, curr_date):
         """returns person's age at a specific date
@@ -153,7 +293,8 @@ class Person(object):
         return self._generate_age(curr_date)
 
     def _generate_age(self, curr_date):
-        """generates age of the person based on their birth and death dates
+        """generates age of the person based on their birth and death dates,
+        in whole calendar years
         """
         if self._birth_date is None:
             return None
@@ -161,5 +302,47 @@ class Person(object):
         if self._death_date is not None and curr_date > self._death_date:
             curr_date = self._death_date
 
-        return int(
-            (curr_date - self._birth_date).days / self.DAYS_IN_YEAR)
+        return years_between(self._birth_date, curr_date)
+
+    def get_source_span(self):
+        """returns where the person record is in the gedcom file
+        Returns:
+            (int, int) byte offsets of the start of the record and just after its last line, or None
+        """
+        return self._source_span
+
+    def set_source_span(self, start, end):
+        """sets where the person record is in the gedcom file
+        Args:
+            start (int): byte offset of the record's first line
+            end (int): byte offset just after the record's last line
+        """
+        self._source_span = (start, end)
+
+    def get_facts(self):
+        """returns the lines of the person record that are in the grammar but not stored
+        in a field, e.g. BAPM, BURI or PLAC, in file order
+        Returns:
+            list of (level, tag, args) tuples
+        """
+        return [] if self._facts is None else self._facts
+
+    def add_fact(self, level, tag, args):
+        """keeps a line of the person record that isn't stored in a field
+        Args:
+            level (int): level of the line
+            tag (string): tag of the line
+            args (string): value of the line
+        """
+        if self._facts is None:
+            self._facts = []
+        self._facts.append((level, tag, args))
+
+    def set_last_fact(self, level, tag, args):
+        """replaces the last kept line, e.g. once its continuation lines are joined
+        Args:
+            level (int): level of the line
+            tag (string): tag of the line
+            args (string): value of the line
+        """
+        self._facts[-1] = (level, tag, args)
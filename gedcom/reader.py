@@ -0,0 +1,350 @@
+"""Reader
+Opens gedcom files in binary and decodes them with the encoding they declare
+
+The encoding is taken from a byte order mark when there is one, otherwise from
+the 1 CHAR line of the HEAD record, read from the first buffered block of the
+file before anything is decoded.  UTF-8 (the default when there is no CHAR
+line), UTF-16, ANSEL, ASCII and ANSI (windows-1252) are supported.  ANSEL is
+decoded with a charmap table registered as the "ansel" codec.
+
+Lines keep their CRLF, CR or LF endings untranslated so the byte size of every
+decoded line, and with it the byte offsets of the parser, is exact.  Bytes that
+aren't valid in the encoding are decoded to lone surrogates which encode back
+to the same bytes, Tags reports the lines that have them.
+
+gzip, bz2, xz and zip compressed files are found by their magic bytes and
+decompressed while they are read, with a large buffer in front of the
+decompressor.  Byte offsets are then offsets in the decompressed file.  A zip
+archive can hold several gedcom files, a member is named archive.zip!member.ged.
+"""
+import codecs
+import io
+import os
+
+# first bytes of the file read to find the encoding
+SNIFF_SIZE = 1 << 16
+BUFFER_SIZE = 1 << 16
+# read size of the decompressed stream
+COMPRESSED_BUFFER_SIZE = 1 << 20
+
+# magic bytes: compression
+COMPRESSIONS = ((b"\x1f\x8b", "gzip"), (b"BZh", "bz2"), (b"\xfd7zXZ\x00", "xz"), (b"PK\x03\x04", "zip"))
+MEMBER_SEPARATOR = "!"
+GEDCOM_EXTENSION = ".ged"
+
+BOMS = ((codecs.BOM_UTF8, "utf-8"), (codecs.BOM_UTF16_LE, "utf-16-le"), (codecs.BOM_UTF16_BE, "utf-16-be"))
+# value of the 1 CHAR line: python codec
+CHARSETS = {
+    "UTF-8": "utf-8",
+    "UTF8": "utf-8",
+    "UNICODE": "utf-16-le",
+    "UTF-16": "utf-16-le",
+    "ANSEL": "ansel",
+    "ASCII": "ascii",
+    "ANSI": "cp1252",
+}
+# codecs with one byte per decoded character
+SINGLE_BYTE = ("ansel", "ascii", "cp1252")
+
+CHAR_LINE = b"1 CHAR "
+HEAD_END = b"0 "
+
+# ANSEL (ANSI/NISO Z39.47) bytes above 0x7f with the GEDCOM additions
+ANSEL_CHARS = {
+    0x8D: "\u200d", 0x8E: "\u200c",
+    0xA1: "\u0141", 0xA2: "\u00d8", 0xA3: "\u0110", 0xA4: "\u00de", 0xA5: "\u00c6", 0xA6: "\u0152",
+    0xA7: "\u02b9", 0xA8: "\u00b7", 0xA9: "\u266d", 0xAA: "\u00ae", 0xAB: "\u00b1", 0xAC: "\u01a0",
+    0xAD: "\u01af", 0xAE: "\u02bc", 0xB0: "\u02bb", 0xB1: "\u0142", 0xB2: "\u00f8", 0xB3: "\u0111",
+    0xB4: "\u00fe", 0xB5: "\u00e6", 0xB6: "\u0153", 0xB7: "\u02ba", 0xB8: "\u0131", 0xB9: "\u00a3",
+    0xBA: "\u00f0", 0xBC: "\u01a1", 0xBD: "\u01b0", 0xBE: "\u25a1", 0xBF: "\u25a0",
+    0xC0: "\u00b0", 0xC1: "\u2113", 0xC2: "\u2117", 0xC3: "\u00a9", 0xC4: "\u266f", 0xC5: "\u00bf",
+    0xC6: "\u00a1", 0xC7: "\u00df", 0xC8: "\u20ac", 0xCF: "\u00df",
+    # combining diacritics, written before the character they modify
+    0xE0: "\u0309", 0xE1: "\u0300", 0xE2: "\u0301", 0xE3: "\u0302", 0xE4: "\u0303", 0xE5: "\u0304",
+    0xE6: "\u0306", 0xE7: "\u0307", 0xE8: "\u0308", 0xE9: "\u030c", 0xEA: "\u030a", 0xEB: "\ufe20",
+    0xEC: "\ufe21", 0xED: "\u0315", 0xEE: "\u030b", 0xEF: "\u0310", 0xF0: "\u0327", 0xF1: "\u0328",
+    0xF2: "\u0323", 0xF3: "\u0324", 0xF4: "\u0325", 0xF5: "\u0333", 0xF6: "\u0332", 0xF7: "\u0326",
+    0xF8: "\u031c", 0xF9: "\u032e", 0xFA: "\ufe22", 0xFB: "\ufe23", 0xFE: "\u0313",
+}
+# byte: character for all 256 bytes, undefined bytes decode to U+FFFD
+ANSEL_TABLE = "".join(chr(byte) if byte < 0x80 else ANSEL_CHARS.get(byte, "\ufffd") for byte in range(256))
+ANSEL_ENCODING_TABLE = codecs.charmap_build(ANSEL_TABLE.replace("\ufffd", "\ufffe"))
+# ANSEL diacritics precede their base character, unicode ones follow it
+DIACRITICS = "([\u0300-\u0333\ufe20-\ufe23]+)([^\u0300-\u0333\ufe20-\ufe23])"
+# DIACRITICS compiled by the first ANSEL line with a diacritic, re isn't imported before
+_diacritics = None
+
+
+def ansel_decode(data, errors="strict"):
+    """decode ANSEL bytes.  Every byte is one character so the diacritics
+    stay in front of their base character, see order_diacritics
+    """
+    return codecs.charmap_decode(data, errors, ANSEL_TABLE)
+
+
+def ansel_encode(text, errors="strict"):
+    """encode text as ANSEL bytes
+    """
+    return codecs.charmap_encode(text, errors, ANSEL_ENCODING_TABLE)
+
+
+class AnselIncrementalDecoder(codecs.IncrementalDecoder):
+    """decoder used by the text stream of ANSEL files
+    """
+
+    def decode(self, data, final=False):
+        return codecs.charmap_decode(data, self.errors, ANSEL_TABLE)[0]
+
+
+class AnselIncrementalEncoder(codecs.IncrementalEncoder):
+    """encoder of the ansel codec
+    """
+
+    def encode(self, text, final=False):
+        return codecs.charmap_encode(text, self.errors, ANSEL_ENCODING_TABLE)[0]
+
+
+def _find_codec(name):
+    """codec search function registering ansel
+    """
+    if name != "ansel":
+        return None
+    return codecs.CodecInfo(name="ansel", encode=ansel_encode, decode=ansel_decode,
+                            incrementalencoder=AnselIncrementalEncoder,
+                            incrementaldecoder=AnselIncrementalDecoder)
+
+
+codecs.register(_find_codec)
+
+
+def _encodes_to_ascii(line):
+    """returns True when a string only has ASCII characters
+    """
+    try:
+        line.encode("ascii")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+# str.isascii is a flag check but only there from python 3.7
+is_ascii = getattr(str, "isascii", _encodes_to_ascii)
+
+
+def order_diacritics(line):
+    """move the ANSEL diacritics of a decoded line behind their base character,
+    where unicode expects them.  The length of the line doesn't change, the
+    characters are left decomposed (not NFC normalized) to keep it that way
+    """
+    global _diacritics
+    if is_ascii(line):
+        return line
+    if _diacritics is None:
+        import re
+        _diacritics = re.compile(DIACRITICS)
+    return _diacritics.sub(r"\2\1", line)
+
+
+def utf16_length(line):
+    """returns the number of bytes of a line in UTF-16
+    """
+    return len(line.encode("utf-16-le", "surrogatepass"))
+
+
+def _find_line(head, start, begin, end):
+    """returns the offset of the line break in front of the first line beginning
+    with start between begin and end, -1 when there is none
+    """
+    found = -1
+    for line_break in (b"\n", b"\r"):
+        offset = head.find(line_break + start, begin, end)
+        if offset != -1 and (found == -1 or offset < found):
+            found = offset
+    return found
+
+
+def sniff_encoding(head):
+    """find the encoding of a gedcom file from its first bytes
+
+    Args:
+        head (bytes): start of the file
+    Returns:
+        (string, int) python codec name and length of the byte order mark
+    """
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            return encoding, len(bom)
+    # UTF-16 without a byte order mark, the file starts with the "0" of 0 HEAD
+    if head.startswith(b"0\x00"):
+        return "utf-16-le", 0
+    if head.startswith(b"\x000"):
+        return "utf-16-be", 0
+    # the CHAR line is looked for in the HEAD record only, with plain byte searches
+    # as the regular expression module costs more to import than the rest of the reader
+    end = _find_line(head, HEAD_END, 0, len(head))
+    end = len(head) if end == -1 else end + 1
+    char = _find_line(head, CHAR_LINE, 0, end)
+    while char != -1:
+        start = char + 1 + len(CHAR_LINE)
+        stop = end
+        for line_break in (b"\n", b"\r"):
+            offset = head.find(line_break, start, stop)
+            if offset != -1:
+                stop = offset
+        if stop > start:
+            return CHARSETS.get(head[start:stop].strip().upper().decode("ascii", "replace"), "utf-8"), 0
+        # a CHAR line without a value
+        char = _find_line(head, CHAR_LINE, start, end)
+    return "utf-8", 0
+
+
+def sniff_compression(head):
+    """returns the compression of a file from its first bytes, None when it isn't compressed
+    """
+    for magic, compression in COMPRESSIONS:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def split_member(filename):
+    """split archive.zip!member.ged into the archive path and the member name.
+    Existing files and names without the separator have no member (None)
+    """
+    if MEMBER_SEPARATOR not in filename or os.path.exists(filename):
+        return filename, None
+    archive, member = filename.rsplit(MEMBER_SEPARATOR, 1)
+    return archive, member
+
+
+def _gedcom_members(archive):
+    """returns the names of the gedcom files in an open zip archive
+    """
+    return [info.filename for info in archive.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(GEDCOM_EXTENSION)]
+
+
+def _compression(path):
+    """returns the compression of the file at path, None when it isn't compressed
+    """
+    with open(path, "rb") as raw:
+        return sniff_compression(raw.read(8))
+
+
+def expand_members(filename):
+    """returns the names to read the gedcom files of a file by: archive!member
+    for every gedcom member of a zip archive, the file name itself otherwise
+    """
+    if _compression(filename) != "zip":
+        return [filename]
+    # imported here as most files aren't zip archives
+    import zipfile
+    with zipfile.ZipFile(filename) as archive:
+        return [filename + MEMBER_SEPARATOR + member for member in _gedcom_members(archive)]
+
+
+def open_binary(filename):
+    """open a gedcom file for reading its bytes, decompressing it when it is compressed
+
+    Args:
+        filename (string): path of the file, or archive.zip!member.ged for a zip member
+    Returns:
+        io.BufferedReader of the (decompressed) bytes
+    Raises:
+        IOError: when the file can't be read or the zip member can't be chosen
+    """
+    path, member = split_member(filename)
+    compression = _compression(path)
+    if compression is None:
+        if member is not None:
+            raise IOError("%s is not a zip archive" % path)
+        return open(path, "rb", buffering=BUFFER_SIZE)
+    # the decompressors are imported when a compressed file is read
+    if compression == "gzip":
+        import gzip
+        stream = gzip.open(path)
+    elif compression == "bz2":
+        import bz2
+        stream = bz2.open(path)
+    elif compression == "xz":
+        import lzma
+        stream = lzma.open(path)
+    else:
+        import zipfile
+        with zipfile.ZipFile(path) as archive:
+            if member is None:
+                members = _gedcom_members(archive)
+                if len(members) != 1:
+                    raise IOError("%s holds %i gedcom files, name one as %s%sMEMBER" % (
+                        path, len(members), path, MEMBER_SEPARATOR))
+                member = members[0]
+            try:
+                # the archive file stays open until the member is closed
+                stream = archive.open(member)
+            except KeyError:
+                raise IOError("%s has no member %s" % (path, member))
+    return io.BufferedReader(stream, COMPRESSED_BUFFER_SIZE)
+
+
+def detect_encoding(filename):
+    """returns the (python codec name, byte order mark length) of a gedcom file
+    """
+    with open_binary(filename) as raw:
+        return sniff_encoding(raw.read(SNIFF_SIZE))
+
+
+class GedcomReader(object):
+    """GedcomReader
+    Iterates the decoded lines of a gedcom file, with their line endings
+
+    Args:
+        raw (file): binary stream positioned at the start of the file
+    Attributes:
+        encoding (string): python codec the file is decoded with
+        errors (string): error handler of the decoder, undecodable bytes become lone
+            surrogates: one per byte with surrogateescape, UTF-16 code units with surrogatepass
+        start_offset (int): byte offset of the first line, after the byte order mark
+        byte_length (callable): returns the number of bytes of a decoded line,
+            None for the UTF-8 default
+    """
+
+    def __init__(self, raw):
+        self._buffer = raw if isinstance(raw, io.BufferedReader) else io.BufferedReader(raw, BUFFER_SIZE)
+        self.encoding, self.start_offset = sniff_encoding(self._buffer.peek(SNIFF_SIZE)[:SNIFF_SIZE])
+        if self.start_offset:
+            self._buffer.read(self.start_offset)
+        if self.encoding in SINGLE_BYTE:
+            self.byte_length = len
+        elif self.encoding.startswith("utf-16"):
+            self.byte_length = utf16_length
+        else:
+            self.byte_length = None
+        # surrogateescape only steps over bytes from 0x80, lone UTF-16 surrogates need surrogatepass
+        self.errors = "surrogatepass" if self.encoding.startswith("utf-16") else "surrogateescape"
+        # newline="" splits on CRLF, CR and LF without translating the endings
+        self._text = io.TextIOWrapper(self._buffer, self.encoding, self.errors, newline="")
+
+    @classmethod
+    def open(cls, filename):
+        """open a gedcom file, compressed or not, see open_binary
+
+        Raises:
+            IOError: when the file can't be read
+        """
+        return cls(open_binary(filename))
+
+    def __iter__(self):
+        if self.encoding == "ansel":
+            return (order_diacritics(line) for line in self._text)
+        return iter(self._text)
+
+    def close(self):
+        """close the file
+        """
+        self._text.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
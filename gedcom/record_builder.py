@@ -0,0 +1,146 @@
+"""RecordBuilder
+Drives the record handlers of People and Families from the parsed lines of a gedcom file
+
+Keeps a stack of the open tags so every line knows its parent tag at any depth
+and finds its handler with a single dict lookup on (parent tag, tag).  Level 0
+lines have no parent tag (None).  Valid lines of a record without a handler are
+kept on the record as facts, handlers can be registered to keep their lines
+as facts too.  A handled level 1 line (e.g. NAME or FAMC) with
+kept sub lines is kept as a fact too, so the sub lines keep their parent.
+Invalid lines of a record go to the optional ExtraTags side store.
+
+CONT and CONC lines under a fact are joined into the fact's value: CONT starts
+a new line and CONC continues the current one.  The pieces are collected in a
+list and joined once after the last continuation line.
+"""
+from sys import intern
+
+CONTINUATIONS = ("CONT", "CONC")
+# tags of facts whose values repeat across records and are interned, pointer
+# values (@S1@) are interned too
+INTERNED_VALUES = frozenset(("PLAC", "TYPE", "OCCU", "RELI", "NATI", "CAUS", "STAT"))
+
+
+class RecordBuilder(object):
+    """RecordBuilder
+    Dispatch table of line handlers keyed by (parent tag, tag) plus the level stack
+
+    Attributes:
+        handlers (dict): (parent tag, tag): callable taking the line data dict
+        kept (set): (parent tag, tag) of the handled lines also kept as facts
+        record (Person or Family): record of the open level 0 line, None for other records
+        extras (ExtraTags): store for the invalid lines of records, None to drop them
+    """
+
+    def __init__(self):
+        self.handlers = {}
+        self.kept = set()
+        self.record = None
+        self.extras = None
+        # data of the open level 1 line when it was handled and isn't kept as a fact yet
+        self._level_1 = None
+        # level of the last fact while continuation lines can follow it, -1 otherwise,
+        # and the pieces of its value once the first continuation line came
+        self._text_level = -1
+        self._text_parts = None
+        # tag of the open line at each level, the first _open entries are the
+        # parents the next line can have
+        self._tags = []
+        self._open = 0
+
+    def register(self, parent_tag, tag, handler, keep=False):
+        """register the handler of a tag under a parent tag
+
+        Args:
+            parent_tag (string): tag of the enclosing line, None for level 0 records
+            tag (string): tag of the line
+            handler (callable): called with the line data dict.  Handlers of
+                level 0 lines return the record they start
+            keep (bool): keep the handled lines as facts of the record too
+        """
+        self.handlers[(parent_tag, tag)] = handler
+        if keep:
+            self.kept.add((parent_tag, tag))
+        else:
+            self.kept.discard((parent_tag, tag))
+
+    def process_line_data(self, data):
+        """track the line on the level stack and call the handler of valid lines,
+        keeping valid lines without a handler as facts of the open record.
+        line data is a dict of the format:
+        {
+            "level": int,
+            "tag": string,
+            "args": string,
+            "valid": "Y" or "N"
+        }
+        Invalid lines are kept on the stack so their sub lines aren't
+        attributed to the previous tag
+        """
+        level = data["level"]
+        tags = self._tags
+        if 0 < level <= self._open:
+            parent_tag = tags[level - 1]
+        else:
+            # level 0 or a line skipping levels, which has no known parent
+            parent_tag = None
+            while len(tags) <= level:
+                tags.append(None)
+            for idx in range(self._open, level):
+                tags[idx] = None
+        if level < len(tags):
+            tags[level] = data["tag"]
+        else:
+            tags.append(data["tag"])
+        self._open = level + 1
+
+        if self._text_level >= 0:
+            if level == self._text_level + 1 and data["tag"] in CONTINUATIONS and data["valid"] == "Y":
+                if self._text_parts is None:
+                    self._text_parts = [self.record.get_facts()[-1][2]]
+                if data["tag"] == "CONT":
+                    self._text_parts.append("\n")
+                self._text_parts.append(data["args"])
+                return
+            self.finish()
+
+        if level == 0:
+            handler = self.handlers.get((None, data["tag"])) if data["valid"] == "Y" else None
+            self.record = None if handler is None else handler(data)
+            self._level_1 = None
+        elif data["valid"] == "Y" and parent_tag is not None:
+            key = (parent_tag, data["tag"])
+            handler = self.handlers.get(key)
+            if handler is not None:
+                handler(data)
+                if level == 1:
+                    self._level_1 = data
+            if (handler is None or key in self.kept) and self.record is not None:
+                self._keep_level_1(level)
+                args = data["args"]
+                if data["tag"] in INTERNED_VALUES or args[:1] == "@":
+                    args = intern(args)
+                self.record.add_fact(level, intern(data["tag"]), args)
+                self._text_level = level
+        elif self.extras is not None and self.record is not None:
+            self._keep_level_1(level)
+            self.extras.add(self.record, len(self.record.get_facts()), level, data["tag"], data["args"])
+
+    def finish(self):
+        """join the continuation lines of the last fact into its value.  Called
+        after the last line of the file
+        """
+        if self._text_parts is not None:
+            level, tag, _ = self.record.get_facts()[-1]
+            self.record.set_last_fact(level, tag, "".join(self._text_parts))
+            self._text_parts = None
+        self._text_level = -1
+
+    def _keep_level_1(self, level):
+        """keep the handled level 1 line a kept line is under as a fact
+        """
+        if level == 1:
+            self._level_1 = None
+        elif self._level_1 is not None:
+            self.record.add_fact(1, intern(self._level_1["tag"]), self._level_1["args"])
+            self._level_1 = None
@@ -0,0 +1,129 @@
+"""RecordIndex
+Dict of record id to Person or Family that keeps its ids in natural order
+
+Validation and the report tables go through the records in id order so the
+results don't change between runs.  The order is natural: the numeric part of
+an id is compared as a number so @I2@ comes before @I10@.  The ordered ids are
+built once, on the first pass after the file is read, and shared by every pass
+until an id is added or removed.
+"""
+
+
+def natural_key(record_id):
+    """returns the sort key of an id: the text before its first number, the
+    number and the rest, with the id itself to order ids like @I01@ and @I1@
+
+    Args:
+        record_id (string): id of an individual or family
+    Returns:
+        tuple
+    """
+    # the usual @I123@ form by slicing
+    digits = record_id[2:-1]
+    if digits.isdecimal() and not record_id[1].isdecimal() and not record_id[-1].isdecimal():
+        return record_id[:2], int(digits), record_id[-1], record_id
+    # other ids are scanned for their first number, re isn't imported at startup for them
+    length = len(record_id)
+    start = 0
+    while start < length and not record_id[start].isdecimal():
+        start += 1
+    if start == length:
+        return record_id, -1, "", record_id
+    end = start + 1
+    while end < length and record_id[end].isdecimal():
+        end += 1
+    return record_id[:start], int(record_id[start:end]), record_id[end:], record_id
+
+
+def ordered_ids(records):
+    """returns the ids of a records mapping in natural order.  Mappings with
+    their own index (RecordIndex, columnar.MappedRecords) share it, others are sorted
+
+    Args:
+        records (dict): record id: Person or Family
+    Returns:
+        string[]
+    """
+    get_ordered_ids = getattr(records, "get_ordered_ids", None)
+    if get_ordered_ids is not None:
+        return get_ordered_ids()
+    return sorted(records, key=natural_key)
+
+
+class RecordIndex(dict):
+    """RecordIndex
+    dict of the records of People or Families with the ids in natural order.
+    Adding or removing an id drops the order, replacing the record of an id doesn't.
+    Every change counts up the version, see get_version
+    """
+    # class default, unpickling sets the items before the instance state
+    _version = 0
+
+    def __init__(self, *args, **kwargs):
+        dict.__init__(self, *args, **kwargs)
+        self._ordered = None
+        self._version = 0
+
+    def get_version(self):
+        """returns the number of changes so far.  Families resolves its references
+        again when the version of its records moved on
+        Returns:
+            int
+        """
+        return self._version
+
+    def get_ordered_ids(self):
+        """returns the ids in natural order, sorted on the first call after a change
+        Returns:
+            string[]
+        """
+        if self._ordered is None:
+            self._ordered = sorted(self, key=natural_key)
+        return self._ordered
+
+    def __setitem__(self, record_id, record):
+        if record_id not in self:
+            self._ordered = None
+        self._version += 1
+        dict.__setitem__(self, record_id, record)
+
+    def __delitem__(self, record_id):
+        dict.__delitem__(self, record_id)
+        self._ordered = None
+        self._version += 1
+
+    def pop(self, *args):
+        self._ordered = None
+        self._version += 1
+        return dict.pop(self, *args)
+
+    def popitem(self):
+        self._ordered = None
+        self._version += 1
+        return dict.popitem(self)
+
+    def setdefault(self, record_id, record=None):
+        if record_id not in self:
+            self._ordered = None
+            self._version += 1
+        return dict.setdefault(self, record_id, record)
+
+    def update(self, *args, **kwargs):
+        self._ordered = None
+        self._version += 1
+        dict.update(self, *args, **kwargs)
+
+    def __ior__(self, other):
+        self._ordered = None
+        self._version += 1
+        return dict.__ior__(self, other)
+
+    def clear(self):
+        self._ordered = None
+        self._version += 1
+        dict.clear(self)
+
+    def __getstate__(self):
+        """pickles the records without the order, rebuilt when it is used
+        """
+        return {"_ordered": None, "_version": 0}
@@ -0,0 +1,108 @@
+"""Snapshot
+Binary sidecar cache of a parsed gedcom file so unchanged files don't have to be re-parsed
+
+The snapshot is written next to the gedcom file as <file>.snapshot and holds the
+parsed (not yet validated) ValidationMessages, People and Families.  It is keyed by
+the size, modification time and sha256 hash of the source file.  The snapshot is
+pickled so it must only be loaded from a trusted cache location.
+"""
+import gc
+import hashlib
+import os
+import pickle
+import struct
+
+# bump whenever Person, Family, People, Families or ValidationMessages change shape
+SNAPSHOT_VERSION = 11
+SNAPSHOT_SUFFIX = ".snapshot"
+MAGIC = b"GEDSNAP\0"
+# magic, version, source size, source mtime in ns, sha256 of source
+HEADER = struct.Struct("<8sIQq32s")
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def snapshot_path(filename):
+    """returns the sidecar snapshot path for a gedcom file
+    """
+    return filename + SNAPSHOT_SUFFIX
+
+
+def hash_file(filename):
+    """returns the sha256 digest of a file
+    Returns:
+        bytes
+    """
+    digest = hashlib.sha256()
+    with open(filename, "rb") as file_data:
+        for chunk in iter(lambda: file_data.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _without_gc(func, *args):
+    """call func with the cyclic garbage collector paused.  Unpickling creates
+    an object per person and family which otherwise triggers a collection
+    every few hundred objects and makes loading several times slower
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return func(*args)
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def load_snapshot(filename):
+    """load the snapshot of a gedcom file if there is a current one.
+    A matching size and mtime is trusted, if only the mtime differs the content hash decides
+
+    Args:
+        filename (string): path of the gedcom file
+    Returns:
+        (ValidationMessages, People, Families) or None when there is no usable snapshot
+    """
+    try:
+        stat = os.stat(filename)
+        with open(snapshot_path(filename), "rb") as snap:
+            header = snap.read(HEADER.size)
+            if len(header) != HEADER.size:
+                return None
+            magic, version, size, mtime_ns, content_hash = HEADER.unpack(header)
+            if magic != MAGIC or version != SNAPSHOT_VERSION or size != stat.st_size:
+                return None
+            if mtime_ns != stat.st_mtime_ns and content_hash != hash_file(filename):
+                return None
+            return _without_gc(pickle.load, snap)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def save_snapshot(filename, source_stat, validation_msgs, peeps, fam):
+    """write the snapshot of a parsed gedcom file.  The file is written to a
+    temporary name first so readers never see a partial snapshot.  Nothing is
+    written if the gedcom file changed since it was parsed
+
+    Args:
+        filename (string): path of the gedcom file
+        source_stat (os.stat_result): stat of the gedcom file taken before parsing
+        validation_msgs (ValidationMessages): messages found while parsing
+        peeps (People): parsed people
+        fam (Families): parsed families
+    """
+    content_hash = hash_file(filename)
+    stat = os.stat(filename)
+    if stat.st_size != source_stat.st_size or stat.st_mtime_ns != source_stat.st_mtime_ns:
+        return
+    header = HEADER.pack(MAGIC, SNAPSHOT_VERSION, stat.st_size, stat.st_mtime_ns, content_hash)
+    path = snapshot_path(filename)
+    tmp_path = "%s.%i.tmp" % (path, os.getpid())
+    try:
+        with open(tmp_path, "wb") as snap:
+            snap.write(header)
+            _without_gc(pickle.dump, (validation_msgs, peeps, fam), snap, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except OSError:
+        # the cache is optional, a read only location just means no snapshot
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
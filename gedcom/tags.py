@@ -1,6 +1,8 @@
 """Tags module
 Handles reading gedom files
 """
+from grammar import CONTEXTS, ROOT
+from reader import is_ascii
 
 
 class TagsError(Exception):
@@ -9,16 +11,22 @@ class TagsError(Exception):
 
     Args:
         message (str): error message
-        line (int): line where error occurred
+        line (int): line number where error occurred
+        offset (int): byte offset of the start of the line
+        text (str): the line that caused the error
     """
 
-    def __init__(self, message, line):
+    def __init__(self, message, line, offset=None, text=None):
         super(TagsError, self).__init__(message)
         self.message = message
         self.line = line
+        self.offset = offset
+        self.text = text
 
     def __str__(self):
-        return 'ERROR: %s at line: %i' % (self.message, self.line)
+        if self.offset is None:
+            return 'ERROR: %s at line: %i' % (self.message, self.line)
+        return 'ERROR: %s at line: %i (byte offset %i)' % (self.message, self.line, self.offset)
 
 
 class Tags:
@@ -29,36 +37,33 @@ class Tags:
         all_tags: list of all the tags
         valid_tags: list of only the valid tags
         invalid_tags: list of only the invalid tags
+        line_number (int): number of the last processed line, starting at 1
+        offset (int): byte offset of the start of the last processed line
+        next_offset (int): byte offset just after the last processed line
+    Args:
+        byte_length (callable): returns the number of bytes of a line in the
+            file's encoding, None for utf-8
+        start_offset (int): byte offset of the first line, e.g. after a byte order mark
     """
 
-    VALID_TAGS = {
-        "INDI": 0,
-        "NAME": 1,
-        "SEX": 1,
-        "BIRT": 1,
-        "DEAT": 1,
-        "FAMC": 1,
-        "FAMS": 1,
-        "FAM": 0,
-        "MARR": 1,
-        "HUSB": 1,
-        "WIFE": 1,
-        "CHIL": 1,
-        "DIV": 1,
-        "DATE": 2,
-        "HEAD": 0,
-        "TRLR": 0,
-        "NOTE": 0
-    }
-
-    def __init__(self):
+    def __init__(self, byte_length=None, start_offset=0):
         self.all_tags = []
         self.valid_tags = dict()
         self.invalid_tags = dict()
+        self.line_number = 0
+        self.offset = start_offset
+        self.next_offset = start_offset
+        self._byte_length = byte_length
+        # grammar context of the open line at each level after the root, the
+        # first _open entries are the parents the next line can have
+        self._contexts = [ROOT]
+        self._open = 1
 
     def processline(self, line):
         """
-        process each line to parse out the data to a dict
+        process each line to parse out the data to a dict.  Lines are expected
+        in file order with their line endings so the line number and byte offset
+        (of the line in the file's encoding) can be tracked
 
         Returns:
             {
@@ -67,35 +72,79 @@ class Tags:
                "args": string,
                 "valid": "Y" or "N"
             }
+        Raises:
+            TagsError: when the line doesn't start with a level or has bytes that
+                aren't valid in the file's encoding
         """
-        data = {"level": 0, "tag": "", "args": "", "valid": "Y"}
-        pieces = line.rstrip().split(" ")
+        self.line_number += 1
+        self.offset = self.next_offset
+        if self._byte_length is not None:
+            self.next_offset += self._byte_length(line)
+            if not is_ascii(line):
+                self._check_decoded(line)
+        elif is_ascii(line):
+            # only other lines need encoding to count their bytes
+            self.next_offset += len(line)
+        else:
+            try:
+                self.next_offset += len(line.encode("utf-8"))
+            except UnicodeEncodeError:
+                # bytes the reader couldn't decode, kept as surrogates
+                self.next_offset += len(line.encode("utf-8", "surrogateescape"))
+                self._check_decoded(line)
+
+        pieces = line.rstrip().split(" ", 2)
 
         # Level
         try:
-            data["level"] = int(pieces.pop(0))
+            level = int(pieces[0])
 
         except ValueError:
-            raise TagsError("Invalid level found for line", line)
+            raise TagsError("Invalid level found for line", self.line_number, self.offset, line.rstrip())
+        if level < 0:
+            raise TagsError("Invalid level found for line", self.line_number, self.offset, line.rstrip())
 
         # Tag
-        if len(pieces) > 1:
-            if pieces[1] == "INDI" or pieces[1] == "FAM":
-                data["tag"] = pieces[1]
-                data["args"] = pieces[0]
+        tag = ""
+        args = ""
+        if len(pieces) > 2:
+            if level == 0 and pieces[1].startswith("@"):
+                # record lines have their id before the tag
+                tag = pieces[2].split(" ", 1)[0]
+                args = pieces[1]
 
             else:
-                data["tag"] = pieces.pop(0)
-                data["args"] = ' '.join(pieces)
+                tag = pieces[1]
+                args = pieces[2]
 
-        else:
-            data["tag"] = ' '.join(pieces)
+        elif len(pieces) > 1:
+            tag = pieces[1]
 
-        if data["tag"] not in self.VALID_TAGS:
-            data["valid"] = "N"
+        # the line is valid when the grammar has its tag under the open parent line
+        contexts = self._contexts
+        if level < self._open:
+            context = CONTEXTS.get((contexts[level], tag))
         else:
-            tag_level = self.VALID_TAGS.get(data["tag"])
-            if tag_level != data["level"]:
-                data["valid"] = "N"
+            # a line skipping levels has no parent context
+            context = None
+            while len(contexts) <= level:
+                contexts.append(None)
+            for idx in range(self._open, level + 1):
+                contexts[idx] = None
+        if level + 1 < len(contexts):
+            contexts[level + 1] = context
+        else:
+            contexts.append(context)
+        self._open = level + 2
+
+        return {"level": level, "tag": tag, "args": args, "valid": "Y" if context is not None else "N"}
 
-        return data
+    def _check_decoded(self, line):
+        """raise a TagsError when a line has lone surrogates, the bytes GedcomReader
+        couldn't decode in the file's encoding
+        """
+        try:
+            line.encode("utf-8")
+        except UnicodeEncodeError:
+            raise TagsError("Invalid bytes for the file's encoding found for line", self.line_number, self.offset,
+                            line.encode("utf-8", "replace").decode("utf-8").rstrip())
@@ -0,0 +1,145 @@
+"""Test cases for the baseline module
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import gedcom
+from baseline import Baseline, fingerprint
+from validation_messages import ValidationMessages
+
+GEDCOM_DIR = os.path.dirname(os.path.abspath(__file__))
+SAMPLE = os.path.join(GEDCOM_DIR, "..", "samples", "sample_01.ged")
+
+
+# husband born after the marriage: US02 for @I1@ and US10 for @F1@
+EARLY_MARRIAGE = """0 HEAD
+0 @I1@ INDI
+1 NAME Tony /Tiger/
+1 SEX M
+1 BIRT
+2 DATE 1 JAN 1970
+1 FAMS @F1@
+0 @I2@ INDI
+1 NAME Minnie /Mouse/
+1 SEX F
+1 BIRT
+2 DATE 1 JAN 1940
+1 FAMS @F1@
+0 @F1@ FAM
+1 HUSB @I1@
+1 WIFE @I2@
+1 MARR
+2 DATE 1 JAN 1960
+0 TRLR
+"""
+
+
+def validate(baseline=None, skip_rules=False, filename=SAMPLE):
+    """load and validate the sample file, returns the messages
+    """
+    msgs, peeps, fam = gedcom.load_file(filename, baseline=baseline, skip_rules=skip_rules)
+    fam.validate()
+    peeps.validate()
+    return msgs
+
+
+class TestBaseline(unittest.TestCase):
+    """test cases for the Baseline class
+    """
+
+    def setUp(self):
+        """creates a temporary directory for the baseline files
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """removes the temporary directory
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def test_check(self):
+        """known findings are matched on user story, id and message text
+        """
+        known = Baseline([("US16", "@F1@", fingerprint("All males in a family must have the same last name"))])
+
+        self.assertTrue(known.check("US16", "@F1@", "All males in a family must have the same last name"))
+        self.assertFalse(known.check("US16", "@F2@", "All males in a family must have the same last name"))
+        self.assertFalse(known.check("US25", "@F1@", "All males in a family must have the same last name"))
+        self.assertEqual(1, known.get_suppressed_count())
+        self.assertTrue(known.has_findings(("US15", "US16"), "@F1@"))
+        self.assertFalse(known.has_findings(("US15",), "@F1@"))
+
+    def test_load_invalid(self):
+        """lines that aren't three tab separated fields are rejected with their line number
+        """
+        path = os.path.join(self.tmp_dir, "baseline.txt")
+        with open(path, "w", encoding="utf-8") as out:
+            out.write("# gedcom validation baseline 1\nUS16\t@F1@\t0123456789abcdef\nUS16 @F2@\n")
+
+        with self.assertRaises(ValueError) as err:
+            Baseline.load(path)
+        self.assertIn("line 3", str(err.exception))
+
+    def test_messages(self):
+        """known findings are left out of the messages, templates are checked formatted
+        """
+        msgs = ValidationMessages()
+        msgs.set_baseline(Baseline([("US11", "@F2@", fingerprint("Bigamy for @I2@ Great /Tiger/"))]))
+        msgs.add_message("FAMILY", "US11", "@F2@", "NA", "Bigamy for %s %s", args=("@I2@", "Great /Tiger/"))
+        msgs.add_message("FAMILY", "US11", "@F3@", "NA", "Bigamy for %s %s", args=("@I2@", "Great /Tiger/"))
+
+        self.assertEqual(["@F3@"], [msg["user_id"] for msg in msgs.get_messages()])
+        self.assertEqual({"US11": 1}, msgs.get_counts())
+
+    def test_save_and_load(self):
+        """a run with the baseline of an earlier run reports nothing, the written
+        baseline is the same with rules skipped
+        """
+        path = os.path.join(self.tmp_dir, "baseline.txt")
+        recorded = Baseline(record=True)
+        all_msgs = validate(recorded)
+        recorded.save(path)
+        self.assertLess(0, all_msgs.get_count())
+
+        known = Baseline.load(path)
+        self.assertEqual(0, validate(known).get_count())
+        self.assertEqual(all_msgs.get_count(), known.get_suppressed_count())
+
+        again = os.path.join(self.tmp_dir, "again.txt")
+        skipping = Baseline.load(path, record=True)
+        self.assertEqual(0, validate(skipping, skip_rules=True).get_count())
+        self.assertEqual(0, skipping.get_suppressed_count())
+        skipping.save(again)
+        with open(path) as first, open(again) as second:
+            self.assertEqual(first.read(), second.read())
+
+    def test_findings_of_spouses_kept(self):
+        """US02 findings the family date checks report under a spouse's id survive a
+        run with rules skipped, and a known US10 doesn't skip the other checks
+        """
+        filename = os.path.join(self.tmp_dir, "early.ged")
+        with open(filename, "w") as out:
+            out.write(EARLY_MARRIAGE)
+        path = os.path.join(self.tmp_dir, "baseline.txt")
+        recorded = Baseline(record=True)
+        found = [(msg["user_story"], msg["user_id"]) for msg in validate(recorded, filename=filename).get_messages()]
+        self.assertIn(("US02", "@I1@"), found)
+        self.assertIn(("US10", "@F1@"), found)
+        recorded.save(path)
+
+        again = os.path.join(self.tmp_dir, "again.txt")
+        skipping = Baseline.load(path, record=True)
+        self.assertEqual(0, validate(skipping, skip_rules=True, filename=filename).get_count())
+        skipping.save(again)
+        with open(path) as first, open(again) as second:
+            self.assertEqual(first.read(), second.read())
+        self.assertEqual(0, validate(Baseline.load(again), filename=filename).get_count())
+
+        with open(again) as lines:
+            us10 = [line for line in lines if line.startswith("US10")]
+        with open(path, "w") as out:
+            out.writelines(us10)
+        only_us10 = Baseline.load(path)
+        new = [(msg["user_story"], msg["user_id"]) for msg in validate(only_us10, True, filename).get_messages()]
+        self.assertEqual([("US02", "@I1@")], new)
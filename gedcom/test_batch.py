@@ -0,0 +1,111 @@
+"""Test cases for the batch module
+"""
+import gzip
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+import zipfile
+import batch
+
+SAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "samples")
+
+
+class TestBatch(unittest.TestCase):
+    """test cases for batch validation
+    Attributes:
+        tmp_dir (string): directory with copies of the sample files
+    """
+
+    def setUp(self):
+        """copy the sample files to a temp directory with a nested folder
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.tmp_dir, "nested"))
+        shutil.copyfile(os.path.join(SAMPLES, "sample_01.ged"), os.path.join(self.tmp_dir, "a.ged"))
+        shutil.copyfile(os.path.join(SAMPLES, "sample_01.ged"), os.path.join(self.tmp_dir, "nested", "b.ged"))
+        with open(os.path.join(self.tmp_dir, "notes.txt"), "w") as out:
+            out.write("not a gedcom file")
+        with open(os.path.join(self.tmp_dir, "bad.ged"), "w") as out:
+            out.write("0 HEAD\nX NAME broken\n")
+
+    def tearDown(self):
+        """delete the temp directory
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def test_collect_files(self):
+        """directories are walked for .ged files and globs are expanded
+        """
+        expected = sorted([os.path.join(self.tmp_dir, "a.ged"), os.path.join(self.tmp_dir, "bad.ged"),
+                           os.path.join(self.tmp_dir, "nested", "b.ged")])
+        self.assertEqual(expected, batch.collect_files([self.tmp_dir]))
+        self.assertEqual([os.path.join(self.tmp_dir, "nested", "b.ged")],
+                         batch.collect_files([os.path.join(self.tmp_dir, "*", "*.ged")]))
+
+    def test_collect_archives(self):
+        """compressed files are collected and zip archives expand into their gedcom members
+        """
+        with gzip.open(os.path.join(self.tmp_dir, "c.ged.gz"), "wb") as out:
+            out.write(b"0 HEAD\n0 TRLR\n")
+        with zipfile.ZipFile(os.path.join(self.tmp_dir, "nested", "d.zip"), "w") as archive:
+            archive.write(os.path.join(self.tmp_dir, "a.ged"), "one.ged")
+            archive.write(os.path.join(self.tmp_dir, "a.ged"), "two.GED")
+            archive.writestr("readme.txt", "not a gedcom file")
+        archive_path = os.path.join(self.tmp_dir, "nested", "d.zip")
+
+        files = batch.collect_files([self.tmp_dir])
+        self.assertIn(os.path.join(self.tmp_dir, "c.ged.gz"), files)
+        self.assertIn(archive_path + "!one.ged", files)
+        self.assertIn(archive_path + "!two.GED", files)
+        self.assertNotIn(archive_path, files)
+        self.assertEqual({"US11": 2}, batch.validate_file(archive_path + "!two.GED")["counts"])
+
+    def test_validate_file(self):
+        """a file summary has the counts per user story
+        """
+        result = batch.validate_file(os.path.join(self.tmp_dir, "a.ged"))
+
+        self.assertIsNone(result["error"])
+        self.assertEqual({"US11": 2}, result["counts"])
+        self.assertEqual(21, result["people"])
+        self.assertEqual(10, result["families"])
+
+    def test_validate_file_errors(self):
+        """unreadable and broken files are reported instead of stopping the batch
+        """
+        self.assertIsNotNone(batch.validate_file(os.path.join(self.tmp_dir, "missing.ged"))["error"])
+        self.assertIsNotNone(batch.validate_file(os.path.join(self.tmp_dir, "bad.ged"))["error"])
+
+    def test_rule_errors(self):
+        """a rule raising on unexpected data fails only its own file, the others still report
+        """
+        with open(os.path.join(self.tmp_dir, "nested", "no_birth.ged"), "w") as out:
+            out.write("0 HEAD\n0 @I1@ INDI\n1 NAME Bob /Hope/\n1 SEX M\n1 BIRT\n2 DATE 1 JAN 1950\n1 FAMS @F1@\n"
+                      "0 @I2@ INDI\n1 NAME Kid /Hope/\n1 FAMC @F1@\n0 @F1@ FAM\n1 HUSB @I1@\n1 CHIL @I2@\n0 TRLR\n")
+        self.assertIn("TypeError", batch.validate_file(os.path.join(self.tmp_dir, "nested", "no_birth.ged"))["error"])
+
+        output = io.StringIO()
+        sys.stdout = output
+        results = batch.run_batch(batch.collect_files([os.path.join(self.tmp_dir, "nested")]), workers=2)
+        sys.stdout = sys.__stdout__
+
+        self.assertEqual(["b.ged"], [os.path.basename(result["file"]) for result in results if result["error"] is None])
+        self.assertIn("files: 2 ok: 1 errors: 1", output.getvalue())
+
+    def test_run(self):
+        """all files are validated in the pool and aggregated
+        """
+        output = io.StringIO()
+        sys.stdout = output
+        status = batch.run(["--workers", "2", os.path.join(self.tmp_dir, "*.ged"),
+                            os.path.join(self.tmp_dir, "nested")])
+        sys.stdout = sys.__stdout__
+
+        self.assertEqual(1, status)
+        text = output.getvalue()
+        self.assertIn("files: 3 ok: 2 errors: 1", text)
+        self.assertIn("US11\t4", text)
+        self.assertIn("bad.ged\tERROR", text)
@@ -0,0 +1,106 @@
+"""Test cases for the columnar module
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import gedcom
+from columnar import write_columnar, load_columnar, ColumnarTree, ColumnarError
+from validation_messages import ValidationMessages
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "samples", "sample_01.ged")
+
+
+class TestColumnar(unittest.TestCase):
+    """test cases for the columnar snapshot
+    Attributes:
+        peeps (People): people parsed from the sample file
+        fam (Families): families parsed from the sample file
+        filename (string): columnar snapshot of the sample file
+    """
+
+    def setUp(self):
+        """parse the sample file and write its columnar snapshot
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, "sample.col")
+        _, self.peeps, self.fam = gedcom.load_file(SAMPLE)
+        write_columnar(self.filename, self.peeps, self.fam)
+
+    def tearDown(self):
+        """delete the temp directory
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def test_people_lookups(self):
+        """every person read off the mapped file matches the parsed person
+        """
+        mapped_peeps, _, tree = load_columnar(self.filename, ValidationMessages())
+
+        self.assertEqual(len(self.peeps.individuals), len(mapped_peeps.individuals))
+        self.assertEqual(list(self.peeps.individuals.keys()), list(mapped_peeps.individuals.keys()))
+        for person_id, person in self.peeps.individuals.items():
+            mapped = mapped_peeps.individuals[person_id]
+            self.assertEqual(person.get_person_id(), mapped.get_person_id())
+            self.assertEqual(person.get_name(), mapped.get_name())
+            self.assertEqual((person.get_given_name(), person.get_surname(), person.get_name_suffix()),
+                             (mapped.get_given_name(), mapped.get_surname(), mapped.get_name_suffix()))
+            self.assertEqual(person.get_gender(), mapped.get_gender())
+            self.assertEqual(person.get_birth_date(), mapped.get_birth_date())
+            self.assertEqual(person.get_death_date(), mapped.get_death_date())
+            self.assertEqual(person.get_is_alive(), mapped.get_is_alive())
+            self.assertEqual(person.get_children_of_families(), mapped.get_children_of_families())
+            self.assertEqual(person.get_spouse_of_families(), mapped.get_spouse_of_families())
+        self.assertNotIn("@I999@", mapped_peeps.individuals)
+        with self.assertRaises(KeyError):
+            mapped_peeps.individuals["@I999@"]
+        tree.close()
+
+    def test_family_lookups(self):
+        """every family read off the mapped file matches the parsed family
+        """
+        _, mapped_fam, tree = load_columnar(self.filename, ValidationMessages())
+
+        self.assertEqual(sorted(self.fam.families.keys()), sorted(mapped_fam.families.keys()))
+        for fam_id, family in self.fam.families.items():
+            mapped = mapped_fam.families[fam_id]
+            self.assertEqual(family.get_husband_id(), mapped.get_husband_id())
+            self.assertEqual(family.get_wife_id(), mapped.get_wife_id())
+            self.assertEqual(family.get_married_date(), mapped.get_married_date())
+            self.assertEqual(family.get_divorced_date(), mapped.get_divorced_date())
+            self.assertEqual(family.get_children(), mapped.get_children())
+        tree.close()
+
+    def test_validation_matches(self):
+        """validating the mapped tree gives the same messages as the parsed tree
+        """
+        msgs = ValidationMessages()
+        mapped_peeps, mapped_fam, tree = load_columnar(self.filename, msgs)
+        parsed_msgs, peeps, fam = gedcom.load_file(SAMPLE)
+
+        fam.validate()
+        peeps.validate()
+        mapped_fam.validate()
+        mapped_peeps.validate()
+
+        self.assertEqual(parsed_msgs.get_messages(), msgs.get_messages())
+        tree.close()
+
+    def test_columns(self):
+        """columns are typed memoryviews over the mapped file
+        """
+        tree = ColumnarTree(self.filename)
+        births = tree.column("p_birth")
+
+        self.assertEqual("i", births.format)
+        self.assertEqual(len(self.peeps.individuals), len(births))
+        self.assertEqual(len(self.peeps.individuals), tree.person_count)
+        self.assertEqual(len(self.fam.families), tree.family_count)
+        births.release()
+        tree.close()
+
+    def test_not_columnar(self):
+        """other files are rejected
+        """
+        with self.assertRaises(ColumnarError):
+            ColumnarTree(SAMPLE)
@@ -0,0 +1,133 @@
+"""Test cases for the daemon module
+"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+from daemon import TreeRegistry, DaemonServer
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "samples", "sample_01.ged")
+
+
+class TestDaemon(unittest.TestCase):
+    """test cases for the daemon API
+    Attributes:
+        server (DaemonServer): server on a free local port
+        url (string): base url of the server
+    """
+
+    def setUp(self):
+        """serve a copy of the sample file on a free port
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, "sample.ged")
+        shutil.copyfile(SAMPLE, self.filename)
+        self.server = DaemonServer(TreeRegistry([self.filename]), 0)
+        self.url = "http://127.0.0.1:%i" % self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,))
+        self.thread.start()
+
+    def tearDown(self):
+        """stop the server and delete the temp directory
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.tmp_dir)
+
+    def get(self, path, method="GET"):
+        """returns the decoded json response of a request
+        """
+        with urlopen(Request(self.url + path, method=method)) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+    def test_trees(self):
+        """loaded trees are listed
+        """
+        trees = self.get("/trees")
+        self.assertEqual(1, len(trees))
+        self.assertEqual("sample", trees[0]["name"])
+        self.assertEqual(21, trees[0]["people"])
+
+    def test_messages(self):
+        """validation messages of a tree
+        """
+        messages = self.get("/trees/sample/messages")
+        self.assertEqual(2, len(messages))
+        self.assertEqual("US11", messages[0]["user_story"])
+
+    def test_lookups(self):
+        """person and family lookups
+        """
+        person = self.get("/trees/sample/people/@I2@")
+        self.assertEqual("Great /Tiger/", person["name"])
+        self.assertEqual(["@F2@", "@F3@"], person["spouse_of"])
+
+        family = self.get("/trees/sample/families/%40F2%40")
+        self.assertEqual("@I2@", family["husband"])
+
+        with self.assertRaises(HTTPError) as err:
+            self.get("/trees/sample/people/@I999@")
+        self.assertEqual(404, err.exception.code)
+
+    def test_reports(self):
+        """report listing and rendering
+        """
+        self.assertIn("deceased", self.get("/trees/sample/reports"))
+        report = self.get("/trees/sample/reports/deceased")
+        self.assertIn("Deceased Individuals", report["text"])
+
+    def test_reload(self):
+        """reload picks up changes in the file
+        """
+        with open(self.filename, "a") as out:
+            out.write("0 @I99@ INDI\n1 NAME New /Person/\n")
+
+        with self.assertRaises(HTTPError):
+            self.get("/trees/sample/people/@I99@")
+        self.assertEqual(22, self.get("/trees/sample/reload", "POST")["people"])
+        self.assertEqual("New /Person/", self.get("/trees/sample/people/@I99@")["name"])
+
+    def test_reload_error(self):
+        """a reload failing in validation answers 500 and keeps the previous tree
+        """
+        with open(self.filename, "w") as out:
+            out.write("0 HEAD\n0 @I1@ INDI\n1 NAME Bob /Hope/\n1 SEX M\n1 BIRT\n2 DATE 1 JAN 1950\n1 FAMS @F1@\n"
+                      "0 @I2@ INDI\n1 NAME Kid /Hope/\n1 FAMC @F1@\n0 @F1@ FAM\n1 HUSB @I1@\n1 CHIL @I2@\n0 TRLR\n")
+
+        with self.assertRaises(HTTPError) as err:
+            self.get("/trees/sample/reload", "POST")
+        self.assertEqual(500, err.exception.code)
+        self.assertIn("reload failed", json.loads(err.exception.read().decode("utf-8"))["error"])
+        err.exception.close()
+        self.assertEqual(21, self.get("/trees")[0]["people"])
+
+    def test_duplicate_names(self):
+        """files of the same name in different directories are rejected
+        """
+        os.mkdir(os.path.join(self.tmp_dir, "other"))
+        other = os.path.join(self.tmp_dir, "other", "sample.ged")
+        shutil.copyfile(SAMPLE, other)
+
+        with self.assertRaises(ValueError):
+            TreeRegistry([self.filename, other])
+
+    def test_concurrent_requests(self):
+        """requests on several threads all get answers
+        """
+        results = []
+
+        def worker():
+            for _ in range(10):
+                results.append(self.get("/trees/sample/people/@I2@")["id"])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(["@I2@"] * 40, results)
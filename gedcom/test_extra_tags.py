@@ -0,0 +1,39 @@
+"""Test cases for the extra tags module
+"""
+import unittest
+from extra_tags import ExtraTags
+from family import Family
+from person import Person
+
+
+class TestExtraTags(unittest.TestCase):
+    """test cases for the ExtraTags class
+    """
+
+    def test_lines_by_record(self):
+        """lines are returned per record in file order with their tags
+        """
+        extras = ExtraTags()
+        person = Person("@I1@")
+        family = Family("@F1@")
+        extras.add(person, 0, 1, "_CURRENT", "Y")
+        extras.add(person, 2, 2, "_MARNM", "Tiger")
+        extras.add(family, 1, 1, "_CURRENT", "N")
+
+        self.assertEqual(3, len(extras))
+        self.assertEqual([(0, 1, "_CURRENT", "Y"), (2, 2, "_MARNM", "Tiger")], extras.get_lines(person))
+        self.assertEqual([(1, 1, "_CURRENT", "N")], extras.get_lines(family))
+        self.assertEqual([], extras.get_lines(Person("@I2@")))
+        self.assertEqual([person, family], extras.get_records())
+        self.assertEqual(extras.tag_id("_CURRENT"), 0)
+
+    def test_max_lines(self):
+        """lines past the limit are counted instead of kept
+        """
+        extras = ExtraTags(max_lines=1)
+        person = Person("@I1@")
+
+        self.assertTrue(extras.add(person, 0, 1, "_A", "1"))
+        self.assertFalse(extras.add(person, 0, 1, "_B", "2"))
+        self.assertEqual(1, extras.dropped)
+        self.assertEqual([(0, 1, "_A", "1")], extras.get_lines(person))
@@ -1305,7 +1305,7 @@ class TestFamilies(unittest.TestCase):
             "message": "marriage before age 14 for " + peep32.get_person_id() + " " +
                        peep32.get_name()
         }
-        self.assertDictEqual(err1, results[0])
+        self.assertDictEqual(err1, results[4])
         err2 = {
             "error_id": "FAMILY",
             "user_story": "US10",
@@ -1314,7 +1314,7 @@ class TestFamilies(unittest.TestCase):
             "message": "marriage before age 14 for " + peep35.get_person_id() + " " +
                        peep35.get_name()
         }
-        self.assertDictEqual(err2, results[1])
+        self.assertDictEqual(err2, results[5])
         err3 = {
             "error_id": "FAMILY",
             "user_story": "US10",
@@ -1323,7 +1323,7 @@ class TestFamilies(unittest.TestCase):
             "message": "marriage before age 14 for " + peep36.get_person_id() + " " +
                        peep36.get_name()
         }
-        self.assertDictEqual(err3, results[2])
+        self.assertDictEqual(err3, results[6])
         err4 = {
             "error_id": "FAMILY",
             "user_story": "US10",
@@ -1332,7 +1332,7 @@ class TestFamilies(unittest.TestCase):
             "message": "marriage before age 14 for " + peep37.get_person_id() + " " +
                        peep37.get_name()
         }
-        self.assertDictEqual(err4, results[3])
+        self.assertDictEqual(err4, results[7])
         err5 = {
             "error_id": "INDIVIDUAL",
             "user_story": "US02",
@@ -1340,7 +1340,7 @@ class TestFamilies(unittest.TestCase):
             "name": peep1.get_name(),
             "message": "Birth date should occur before marriage of an individual"
         }
-        self.assertDictEqual(err5, results[4])
+        self.assertDictEqual(err5, results[0])
         err6 = {
             "error_id": "FAMILY",
             "user_story": "US10",
@@ -1348,7 +1348,7 @@ class TestFamilies(unittest.TestCase):
             "name": "NA",
             "message": "marriage before age 14 for " + peep1.get_person_id() + " " + peep1.get_name()
         }
-        self.assertDictEqual(err6, results[5])
+        self.assertDictEqual(err6, results[1])
         err7 = {
             "error_id": "INDIVIDUAL",
             "user_story": "US02",
@@ -1356,7 +1356,7 @@ class TestFamilies(unittest.TestCase):
             "name": peep2.get_name(),
             "message": "Birth date should occur before marriage of an individual"
         }
-        self.assertDictEqual(err7, results[6])
+        self.assertDictEqual(err7, results[2])
         err8 = {
             "error_id": "FAMILY",
             "user_story": "US10",
@@ -1364,7 +1364,7 @@ class TestFamilies(unittest.TestCase):
             "name": "NA",
             "message": "marriage before age 14 for " + peep2.get_person_id() + " " + peep2.get_name()
         }
-        self.assertDictEqual(err8, results[7])
+        self.assertDictEqual(err8, results[3])
 
     def test_us04_validation_marriage_before_divorce(self):
         """US04: testing that marriage occurred before divorce
@@ -2593,9 +2593,11 @@ class TestFamilies(unittest.TestCase):
         self.peeps.individuals[test_child.get_person_id()] = test_child
         """ US12: Test if parents are too old
         """
+        # the rule follows the references validate() resolves first
+        self.fam.resolve_references()
         test_family = self.fam.families["@F1@"]  # type: Family
         self.assertTrue(self.fam._us12_validate_parents_not_too_old(test_family))
-        self.assertEqual(len(self.msgs._messages), 0)
+        self.assertEqual(len(self.msgs.get_messages()), 0)
 
         # type: Person
         husband = self.peeps.individuals[test_family.get_husband_id()]
@@ -2610,6 +2612,71 @@ class TestFamilies(unittest.TestCase):
         self.assertFalse(self.fam._us12_validate_parents_not_too_old(test_family))
         self.assertEqual(len(self.msgs.get_messages()), 2)
 
+    def test_dangling_references(self):
+        """ids that point to no record are reported as XREF and left out of the
+        resolved references instead of failing validation and reports
+        """
+        husband = Person("@I1@")
+        husband.set_name("Tony /Tiger/")
+        husband.set_gender("M")
+        husband.add_spouse_of_family("@F1@")
+        husband.add_spouse_of_family("@F9@")
+        self.peeps.individuals[husband.get_person_id()] = husband
+        family = Family("@F1@")
+        family.set_husband_id("@I1@")
+        family.set_wife_id("@I8@")
+        family.set_date("1 JAN 1990", "married")
+        family.add_child("@I9@")
+        self.fam.families[family.get_family_id()] = family
+
+        self.fam.validate()
+        self.peeps.validate()
+
+        self.assertIs(husband, family.get_husband())
+        self.assertIsNone(family.get_wife())
+        self.assertEqual([], family.get_child_people())
+        self.assertEqual([family], husband.get_families_as_spouse())
+        xrefs = [(msg["user_id"], msg["message"]) for msg in self.msgs.get_messages() if msg["user_story"] == "XREF"]
+        self.assertEqual([("@F1@", "WIFE @I8@ points to no individual"),
+                          ("@F1@", "CHIL @I9@ points to no individual"),
+                          ("@I1@", "FAMS @F9@ points to no family")], xrefs)
+
+        output = io.StringIO()
+        sys.stdout = output
+        self.fam.print_all()
+        self.fam.us30_print_married()
+        self.fam.us34_print_big_age_diff()
+        sys.stdout = sys.__stdout__
+        self.assertIn("Tony /Tiger/", output.getvalue())
+
+    def test_references_resolved_once(self):
+        """validation resolves the references once, reports only resolve again after
+        a record changed.  XREF messages are in natural id order
+        """
+        for family_id in ("@F10@", "@F2@"):
+            family = Family(family_id)
+            family.set_wife_id("@I8@")
+            self.fam.families[family_id] = family
+
+        self.fam.validate()
+        self.peeps.validate()
+        self.assertEqual(["@F2@", "@F10@"], [msg["user_id"] for msg in self.msgs.get_messages()
+                                             if msg["user_story"] == "XREF"])
+
+        passes = []
+        resolve = self.fam._resolve_family_links
+        self.fam._resolve_family_links = lambda report: passes.append(report) or resolve(report)
+        output = io.StringIO()
+        sys.stdout = output
+        self.fam.print_all()
+        self.fam.us30_print_married()
+        self.assertEqual([], passes)
+        self.fam.families["@F3@"] = Family("@F3@")
+        self.fam.print_all()
+        self.fam.us30_print_married()
+        sys.stdout = sys.__stdout__
+        self.assertEqual([False], passes)
+
     def test_us24_unique_families_by_spouses(self):
         """US24 No more than one family with the same spouses by name
         and the same marriage date should appear in a GEDCOM file.
@@ -2729,6 +2796,8 @@ class TestFamilies(unittest.TestCase):
     def test_us33_print_orphaned(self):
         """ US33 print orphaned list test
         """
+        # the expected tables were written in November 2017
+        self.peeps.set_as_of(datetime(2017, 11, 10))
         # no children
         test_family = Family("@F1@")
         test_family.set_husband_id("@I1@")
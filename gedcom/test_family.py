@@ -75,3 +75,22 @@ class TestFamilies(unittest.TestCase):
 
         self.assertEqual(2, len(fam.get_children()))
         self.assertEqual(child_id_2, fam.get_children()[1])
+
+    def test_source_span(self):
+        """test the source span of the record
+        """
+        fam = Family("@F11@")
+        self.assertIsNone(fam.get_source_span())
+
+        fam.set_source_span(10, 42)
+        self.assertEqual((10, 42), fam.get_source_span())
+
+    def test_facts(self):
+        """test keeping lines that aren't stored in a field
+        """
+        record = Family("@F11@")
+        self.assertEqual([], record.get_facts())
+
+        record.add_fact(1, "RESI", "")
+        record.add_fact(2, "PLAC", "Paris")
+        self.assertEqual([(1, "RESI", ""), (2, "PLAC", "Paris")], record.get_facts())
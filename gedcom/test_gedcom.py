@@ -0,0 +1,196 @@
+"""Test cases for the gedcom command line program
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+import gedcom
+from tags import TagsError
+from validation_messages import ValidationMessages, ValidationStopped
+
+GEDCOM_DIR = os.path.dirname(os.path.abspath(__file__))
+PROGRAM = os.path.join(GEDCOM_DIR, "gedcom.py")
+SAMPLE = os.path.join(GEDCOM_DIR, "..", "samples", "sample_01.ged")
+
+
+def imported_modules(args):
+    """run the program with -X importtime and return the names of the imported modules
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", PROGRAM] + args,
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    modules = set()
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            modules.add(line.rsplit("|", 1)[1].strip())
+    return result, modules
+
+
+class TestGedcom(unittest.TestCase):
+    """test cases for the command line program
+    """
+
+    def test_validate_only_skips_prettytable(self):
+        """startup guard: a validation only run must not import prettytable
+        """
+        result, modules = imported_modules(["--validate-only", SAMPLE])
+
+        self.assertEqual(0, result.returncode)
+        self.assertIn("US11\tFAMILY\t@F2@\tNA\tBigamy for @I2@ Great /Tiger/", result.stdout)
+        self.assertNotIn("prettytable", modules)
+        self.assertNotIn("argparse", modules)
+
+    def test_startup_skips_re(self):
+        """startup guard: parsing and validating don't import re.  Only strptime
+        does, so the file has no dates
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "no_dates.ged")
+            with open(path, "w") as out:
+                out.write("0 HEAD\n1 CHAR UTF-8\n0 @I1@ INDI\n1 NAME Bob /Hope/\n1 SEX M\n1 FAMS @F1@\n"
+                          "0 @F1@ FAM\n1 HUSB @I1@\n0 TRLR\n")
+            result, modules = imported_modules(["--validate-only", path])
+
+        self.assertEqual(0, result.returncode)
+        self.assertNotIn("re", modules)
+
+    def test_reports_load_prettytable(self):
+        """report output still loads prettytable when tables are printed
+        """
+        result, modules = imported_modules([SAMPLE])
+
+        self.assertEqual(0, result.returncode)
+        self.assertIn("Individuals", result.stdout)
+        self.assertIn("prettytable", modules)
+
+    def test_usage(self):
+        """missing file name prints usage
+        """
+        result = subprocess.run([sys.executable, PROGRAM], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, universal_newlines=True)
+
+        self.assertNotEqual(0, result.returncode)
+        self.assertIn("Usage:", result.stderr)
+
+    def test_as_of(self):
+        """runs with the same --as-of date give the same output, checked against that date
+        """
+        args = [sys.executable, PROGRAM, "--validate-only", "--as-of", "1950-01-01", SAMPLE]
+        first = subprocess.run(args, stdout=subprocess.PIPE, universal_newlines=True)
+        second = subprocess.run(args, stdout=subprocess.PIPE, universal_newlines=True)
+
+        self.assertEqual(0, first.returncode)
+        self.assertEqual(first.stdout, second.stdout)
+        self.assertIn("US01\tINDIVIDUAL\t", first.stdout)
+        self.assertIsNone(gedcom.parse_args([SAMPLE])["as_of"])
+        self.assertEqual(1950, gedcom.parse_args(["--as-of", "1950-01-01", SAMPLE])["as_of"].year)
+        with self.assertRaises(SystemExit):
+            gedcom.parse_args(["--as-of", "1 JAN 1950", SAMPLE])
+
+    def test_load_as_of(self):
+        """every load takes ages at its own date unless one is given
+        """
+        before = datetime.now()
+        _, peeps, _ = gedcom.load_file(SAMPLE)
+        self.assertLessEqual(before, peeps.get_as_of())
+
+        _, pinned, _ = gedcom.load_file(SAMPLE, as_of=datetime(1990, 1, 1))
+        self.assertEqual(datetime(1990, 1, 1), pinned.get_as_of())
+        self.assertEqual(20, pinned.individuals["@I1@"].get_age(pinned.get_as_of()))
+        self.assertLessEqual(before, gedcom.load_file(SAMPLE)[1].get_as_of())
+
+    def test_recover(self):
+        """recovering runs report every bad line and keep parsing
+        """
+        lines = ["0 HEAD\n", "0 @I1@ INDI\n", "1 NAME Bob /Hope/\n", "X bad line\n",
+                 "1 BIRT\n", "2 DATE ABT 1900\n", "1 SEX M\n", "0 TRLR\n"]
+        msgs = ValidationMessages()
+        peeps, _ = gedcom.parse_file(lines, msgs, recover=True)
+
+        self.assertEqual("M", peeps.individuals["@I1@"].get_gender())
+        self.assertEqual([
+            {"error_id": "GEDCOM", "user_story": "PARSE", "user_id": "line 4", "name": "NA",
+             "message": "Invalid level found for line at byte offset 37: X bad line", "span": (37, 48)},
+            {"error_id": "GEDCOM", "user_story": "PARSE", "user_id": "line 6", "name": "NA",
+             "message": "Invalid date at byte offset 55: 2 DATE ABT 1900", "span": (55, 71)}], msgs.get_messages())
+
+        with self.assertRaises(TagsError):
+            gedcom.parse_file(lines, ValidationMessages())
+
+    def test_fail_fast_parse(self):
+        """a fail fast parse error stops a recovering parse at that line
+        """
+        lines = ["0 HEAD\n", "0 @I1@ INDI\n", "X bad line\n", "Y bad line\n", "0 TRLR\n"]
+        msgs = ValidationMessages()
+        msgs.set_limits(fail_fast=["PARSE"])
+
+        with self.assertRaises(ValidationStopped):
+            gedcom.parse_file(lines, msgs, recover=True)
+        self.assertEqual(["line 3"], [msg["user_id"] for msg in msgs.get_messages()])
+
+    def test_max_errors(self):
+        """a run stopped by --max-errors prints the messages so far without the reports
+        and exits with its own status
+        """
+        result = subprocess.run([sys.executable, PROGRAM, "--max-errors", "1", SAMPLE], stdout=subprocess.PIPE,
+                                stderr=subprocess.PIPE, universal_newlines=True)
+
+        self.assertEqual(gedcom.EXIT_STOPPED, result.returncode)
+        self.assertIn("Bigamy for @I2@ Great /Tiger/", result.stdout)
+        self.assertEqual(1, result.stdout.count("Bigamy"))
+        self.assertNotIn("Individuals", result.stdout)
+        self.assertIn("Validation stopped", result.stderr)
+        self.assertEqual(["US01", "US22"], gedcom.parse_args(["--fail-fast=us01,US22", SAMPLE])["fail_fast"])
+        self.assertEqual(["PARSE"], gedcom.parse_args(["--fail-fast", "PARSE", SAMPLE])["fail_fast"])
+        with self.assertRaises(SystemExit):
+            gedcom.parse_args(["--max-errors", "0", SAMPLE])
+
+    def test_source_spans(self):
+        """records carry the byte span of their lines and messages reference it
+        """
+        lines = ["0 HEAD\n", "0 @I1@ INDI\n", "1 NAME Bob /Hope/\n", "0 @F1@ FAM\n", "1 HUSB @I1@\n",
+                 "1 HUSB @I2@\n", "0 TRLR\n"]
+        msgs = ValidationMessages()
+        peeps, fam = gedcom.parse_file(lines, msgs)
+
+        self.assertEqual((7, 37), peeps.individuals["@I1@"].get_source_span())
+        self.assertEqual((37, 72), fam.families["@F1@"].get_source_span())
+        self.assertEqual((37, 72), peeps.find_source_span("@F1@"))
+        self.assertIsNone(peeps.find_source_span("@I9@"))
+
+        msgs.add_message("FAMILY", "US00", "@F1@", "NA", "test")
+        self.assertEqual((37, 72), msgs.get_messages()[-1]["span"])
+
+    def test_read_source(self):
+        """the raw record is read by seeking to its span
+        """
+        msgs, peeps, fam = gedcom.load_file(SAMPLE)
+
+        source = gedcom.read_source(SAMPLE, fam.families["@F2@"].get_source_span())
+        self.assertTrue(source.startswith("0 @F2@ FAM"))
+        self.assertIn("1 HUSB @I2@", source)
+        self.assertNotIn("@F3@", source)
+
+    def test_interned_xrefs(self):
+        """a record id and the links to it are the same string object
+        """
+        _, peeps, fam = gedcom.load_file(SAMPLE)
+        family_ids = {family_id: family_id for family_id in fam.families}
+        for family in fam.families.values():
+            for child_id in family.get_children():
+                self.assertIs(peeps.individuals[child_id].get_person_id(), child_id)
+        for person in peeps.individuals.values():
+            for family_id in person.get_spouse_of_families():
+                self.assertIs(family_ids[family_id], family_id)
+
+    def test_keep_extras(self):
+        """unrecognized lines are only kept when asked for
+        """
+        _, peeps, fam = gedcom.load_file(SAMPLE)
+        self.assertIsNone(peeps.get_extra_tags())
+
+        _, peeps, fam = gedcom.load_file(SAMPLE, keep_extras=True)
+        extras = peeps.get_extra_tags()
+        self.assertEqual([(3, 2, "_MARNM", "Tiger")], extras.get_lines(peeps.individuals["@I2@"]))
+        self.assertEqual([(4, 1, "_CURRENT", "N")], extras.get_lines(fam.families["@F2@"]))
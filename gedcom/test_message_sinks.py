@@ -0,0 +1,106 @@
+"""Test cases for the message sinks module
+"""
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from message_sinks import JsonlSink, MemorySink, SqliteSink, open_sink, render
+from validation_messages import ValidationMessages
+
+RECORDS = [
+    ("FAMILY", "US11", "@F2@", "NA", "Bigamy for %s %s", ("@I2@", "Great /Tiger/"), (10, 20)),
+    ("INDIVIDUAL", "US01", "@I1@", "Tony /Tiger/", "Birth date should occur before current date", None, None),
+    ("FAMILY", "US10", "@F1@", "NA", "marriage before age 14 for %s %s", ("@I1@", "Tony /Tiger/"), None),
+    ("FAMILY", "US01", "@F1@", "NA", "Married 100% before current date", None, (0, 10)),
+]
+
+
+class TestMessageSinks(unittest.TestCase):
+    """test cases for the memory, JSONL and SQLite sinks
+    """
+
+    def setUp(self):
+        """creates a temporary directory for the sink files
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """removes the temporary directory
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def test_render(self):
+        """templates are formatted with their arguments, messages without arguments
+        are kept as they are.  The span only shows when known
+        """
+        self.assertEqual({"error_id": "FAMILY", "user_story": "US11", "user_id": "@F2@", "name": "NA",
+                          "message": "Bigamy for @I2@ Great /Tiger/", "span": (10, 20)}, render(RECORDS[0]))
+        self.assertNotIn("span", render(RECORDS[1]))
+        self.assertEqual("Married 100% before current date", render(RECORDS[3])["message"])
+
+    def test_sinks(self):
+        """every sink gives back the same messages in the order they were added or by user story
+        """
+        for sink in (MemorySink(), JsonlSink(os.path.join(self.tmp_dir, "m.jsonl")),
+                     SqliteSink(os.path.join(self.tmp_dir, "m.sqlite"))):
+            for record in RECORDS:
+                sink.add(record)
+            self.assertEqual([render(record) for record in RECORDS],
+                             [render(record) for record in sink.records()], type(sink).__name__)
+            self.assertEqual(["US01", "US01", "US10", "US11"],
+                             [record[1] for record in sink.records(by_story=True)])
+            self.assertEqual("@I1@", list(sink.records(by_story=True))[0][2])
+            sink.close()
+
+    def test_jsonl_templates(self):
+        """JSONL lines keep the template and its arguments apart, formatted when read
+        """
+        path = os.path.join(self.tmp_dir, "m.jsonl")
+        sink = JsonlSink(path)
+        sink.add(RECORDS[0])
+        sink.close()
+
+        with open(path, encoding="utf-8") as lines:
+            line = json.loads(lines.readline())
+        self.assertEqual("Bigamy for %s %s", line["template"])
+        self.assertEqual(["@I2@", "Great /Tiger/"], line["args"])
+        self.assertNotIn("message", line)
+
+    def test_jsonl_by_story(self):
+        """JSONL records read by user story keep the order they were added within a story
+        """
+        sink = JsonlSink(os.path.join(self.tmp_dir, "m.jsonl"))
+        records = [record[:2] + ("@I%i@" % idx,) + record[3:] for idx in range(50) for record in RECORDS]
+        for record in records:
+            sink.add(record)
+
+        self.assertEqual(sorted(records, key=lambda record: record[1]), list(sink.records(by_story=True)))
+        first = sink.records(by_story=True)
+        self.assertEqual("US01", next(first)[1])
+        first.close()
+        self.assertEqual(records, list(sink.records()))
+        sink.close()
+
+    def test_open_sink(self):
+        """file sinks are chosen by extension
+        """
+        for name, sink_class in (("m.jsonl", JsonlSink), ("m.db", SqliteSink)):
+            sink = open_sink(os.path.join(self.tmp_dir, name))
+            self.assertIsInstance(sink, sink_class)
+            sink.close()
+        self.assertIsNone(open_sink(os.path.join(self.tmp_dir, "m.txt")))
+
+    def test_set_sink(self):
+        """messages added before the sink is set move to it
+        """
+        msgs = ValidationMessages()
+        msgs.add_message("FAMILY", "US11", "@F2@", "NA", "Bigamy for %s %s", args=("@I2@", "Great /Tiger/"))
+        path = os.path.join(self.tmp_dir, "m.jsonl")
+        msgs.set_sink(JsonlSink(path))
+        msgs.add_message("INDIVIDUAL", "US01", "@I1@", "Tony /Tiger/", "Birth date should occur before current date")
+        msgs.close()
+
+        with open(path, encoding="utf-8") as lines:
+            self.assertEqual(2, len(lines.readlines()))
+        self.assertEqual({"US11": 1, "US01": 1}, msgs.get_counts())
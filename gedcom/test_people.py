@@ -105,6 +105,22 @@ class TestPeople(unittest.TestCase):
         # add a person
         self.assertEqual(0, len(self.peeps.individuals))
 
+    def test_name_parts(self):
+        """GIVN and SURN lines under NAME replace the parts split from the name
+        """
+        for data in ({"level": 0, "tag": "INDI", "args": "@I1@", "valid": "Y"},
+                     {"level": 1, "tag": "NAME", "args": "Jan /van Dyck/", "valid": "Y"},
+                     {"level": 2, "tag": "SURN", "args": "Dyck", "valid": "Y"},
+                     {"level": 0, "tag": "INDI", "args": "@I2@", "valid": "Y"},
+                     {"level": 1, "tag": "NAME", "args": "Anna /Smith/", "valid": "Y"}):
+            self.peeps.process_line_data(data)
+
+        first = self.peeps.individuals["@I1@"]
+        self.assertEqual(("Jan", "Dyck"), (first.get_given_name(), first.get_surname()))
+        self.assertEqual([(1, "NAME", "Jan /van Dyck/"), (2, "SURN", "Dyck")], first.get_facts())
+        second = self.peeps.individuals["@I2@"]
+        self.assertEqual(("Anna", "Smith"), (second.get_given_name(), second.get_surname()))
+
     def test_add_multiple_people(self):
         """adding mulitiple people to make sure they are both read in
         """
@@ -213,7 +229,8 @@ class TestPeople(unittest.TestCase):
         date_obj = datetime.strptime(birth_date["args"], '%d %b %Y')
         self.assertEqual(
             date_obj, self.peeps.individuals[data["args"]].get_birth_date())
-        age = int((datetime.now().date() - date_obj.date()).days / 365.2425)
+        now = self.peeps.get_as_of()
+        age = now.year - 1970 - ((now.month, now.day) < (6, 15))
         self.assertEqual(age, self.peeps.individuals[data["args"]].get_age())
 
     def test_death_date_no_birth(self):
@@ -854,6 +871,8 @@ class TestPeople(unittest.TestCase):
     def test_us31_print_single(self):
         """ US31 Unit tests
         """
+        # the expected tables were written in November 2017
+        self.peeps.set_as_of(datetime(2017, 11, 10))
         single_person = Person("@I3@")
         single_person.set_name("Margo /Hemmingway/")
         single_person.set_gender("F")
@@ -1000,6 +1019,8 @@ class TestPeople(unittest.TestCase):
     def test_us_38_print_upcoming_birthdays(self):
         """ US38 Unit tests
         """
+        # the expected tables were written in November 2017
+        self.peeps.set_as_of(datetime(2017, 11, 10))
         recent_birthday_person = Person("@I3@")
         recent_birthday_person.set_name("Margo /Hemmingway/")
         recent_birthday_person.set_gender("F")
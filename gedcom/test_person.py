@@ -25,6 +25,29 @@ class TestPerson(unittest.TestCase):
         self.assertEqual(name, peep.get_name())
         self.assertEqual(gender, peep.get_gender())
 
+    def test_name_parts(self):
+        """the name is split into given name, surname and suffix when it is set
+        """
+        peep = Person("@I01@")
+        peep.set_name("Mickey Walt /Mouse/ Jr.")
+        self.assertEqual(("Mickey Walt", "Mouse", "Jr."),
+                         (peep.get_given_name(), peep.get_surname(), peep.get_name_suffix()))
+
+        peep.set_name("Pluto")
+        self.assertEqual(("Pluto", None, ""), (peep.get_given_name(), peep.get_surname(), peep.get_name_suffix()))
+        peep.set_name("/Duck/")
+        self.assertEqual(("", "Duck", ""), (peep.get_given_name(), peep.get_surname(), peep.get_name_suffix()))
+
+        peep.set_given_name("Donald")
+        peep.set_surname("McDuck")
+        self.assertEqual(("Donald", "McDuck"), (peep.get_given_name(), peep.get_surname()))
+        self.assertEqual("/Duck/", peep.get_name())
+        # the surname is stripped whether or not the name has a closing slash
+        peep.set_name("A / B / C")
+        self.assertEqual(("A", "B", "C"), (peep.get_given_name(), peep.get_surname(), peep.get_name_suffix()))
+        peep.set_name("A / B")
+        self.assertEqual(("A", "B", ""), (peep.get_given_name(), peep.get_surname(), peep.get_name_suffix()))
+
     def test_birth_date(self):
         """test birth date
         """
@@ -49,14 +72,11 @@ class TestPerson(unittest.TestCase):
         """test age without death but with birth date
         """
         peep = Person("@I01@")
-        birth_date = datetime.strptime(
-            "7 SEP 1988", '%d %b %Y')
         peep.set_date("7 SEP 1988", "birth")
+        now = datetime.now()
+        expected_age = now.year - 1988 - ((now.month, now.day) < (9, 7))
 
-        expected_age = int(
-            (peep.CURRENT_TIME - birth_date).days / peep.DAYS_IN_YEAR)
-
-        self.assertEqual(expected_age, peep.get_age())
+        self.assertEqual(expected_age, peep.get_age(now))
 
     def test_age_with_death(self):
         """test age with death
@@ -122,3 +142,36 @@ class TestPerson(unittest.TestCase):
         peep.set_date("1 JAN 1980", "birth")
 
         self.assertEqual(20, peep.get_age_at_date(test_date))
+
+    def test_age_as_of(self):
+        """ages are whole calendar years at the date given and cached per date
+        """
+        peep = Person("@I01@")
+        peep.set_date("29 FEB 1980", "birth")
+        self.assertEqual(40, peep.get_age(datetime(2021, 2, 28)))
+        as_of = datetime(2021, 3, 1)
+        self.assertEqual(41, peep.get_age(as_of))
+        self.assertEqual(41, peep.get_age(as_of))
+        peep.set_date("1 MAR 1990", "birth")
+        self.assertEqual(31, peep.get_age(as_of))
+        peep.set_date("1 JAN 2000", "death")
+        self.assertEqual(9, peep.get_age(as_of))
+
+    def test_source_span(self):
+        """test the source span of the record
+        """
+        peep = Person("@I01@")
+        self.assertIsNone(peep.get_source_span())
+
+        peep.set_source_span(10, 42)
+        self.assertEqual((10, 42), peep.get_source_span())
+
+    def test_facts(self):
+        """test keeping lines that aren't stored in a field
+        """
+        record = Person("@I01@")
+        self.assertEqual([], record.get_facts())
+
+        record.add_fact(1, "RESI", "")
+        record.add_fact(2, "PLAC", "Paris")
+        self.assertEqual([(1, "RESI", ""), (2, "PLAC", "Paris")], record.get_facts())
@@ -0,0 +1,162 @@
+"""Test cases for the reader module
+"""
+import bz2
+import codecs
+import gzip
+import io
+import lzma
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+import zipfile
+import gedcom
+import reader
+
+RECORDS = ("0 HEAD\n1 CHAR %s\n0 @I1@ INDI\n1 NAME %s /Smith/\n1 SEX M\n1 BIRT\n2 DATE 1 JAN 1900\n"
+           "0 @I2@ INDI\n1 NAME Ann /Smith/\n0 TRLR\n")
+
+
+class TestReader(unittest.TestCase):
+    """test cases for the reader module
+    """
+
+    def setUp(self):
+        """creates a temporary directory for the encoded files
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        """removes the temporary directory
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, data):
+        """write bytes to a gedcom file and return its path
+        """
+        path = os.path.join(self.tmp_dir, "test.ged")
+        with open(path, "wb") as out:
+            out.write(data)
+        return path
+
+    def test_sniff_encoding(self):
+        """byte order marks come before the CHAR line, which defaults to utf-8
+        """
+        self.assertEqual(("utf-8", 3), reader.sniff_encoding(b"\xef\xbb\xbf0 HEAD\n1 CHAR ANSEL\n"))
+        self.assertEqual(("utf-16-le", 2), reader.sniff_encoding(b"\xff\xfe0\x00"))
+        self.assertEqual(("utf-16-be", 2), reader.sniff_encoding(b"\xfe\xff\x000"))
+        self.assertEqual(("utf-16-le", 0), reader.sniff_encoding("0 HEAD\n".encode("utf-16-le")))
+        self.assertEqual(("ansel", 0), reader.sniff_encoding(b"0 HEAD\r\n1 CHAR ansel\r\n0 TRLR"))
+        self.assertEqual(("cp1252", 0), reader.sniff_encoding(b"0 HEAD\r1 CHAR ANSI\r0 TRLR"))
+        self.assertEqual(("utf-8", 0), reader.sniff_encoding(b"0 HEAD\n0 @N1@ NOTE\n1 CHAR ANSEL\n"))
+        self.assertEqual(("utf-8", 0), reader.sniff_encoding(b"0 HEAD\n1 CHAR EBCDIC\n"))
+        self.assertEqual(("ascii", 0), reader.sniff_encoding(b"0 HEAD\n1 CHAR \n1 CHAR ASCII\n0 TRLR"))
+
+    def test_ansel(self):
+        """ANSEL is decoded by table with the diacritics behind their base letter
+        """
+        self.assertEqual("Łød", reader.ansel_decode(b"\xa1\xb2d")[0])
+        self.assertEqual("José", reader.order_diacritics(reader.ansel_decode(b"Jos\xe2e")[0]))
+        self.assertEqual(b"\xa1", "Ł".encode("ansel"))
+
+    def test_is_ascii_fallback(self):
+        """the ASCII check without str.isascii of python 3.6 agrees with it
+        """
+        for line in ["0 HEAD\r\n", "", "1 NAME Jos\u0301e\n", "1 NOTE \udcff\n", "\x7f", "\x80"]:
+            self.assertEqual(all(ord(char) < 128 for char in line), reader._encodes_to_ascii(line))
+        with unittest.mock.patch("reader.is_ascii", reader._encodes_to_ascii):
+            self.assertEqual("Jose\u0301", reader.order_diacritics(reader.ansel_decode(b"Jos\xe2e")[0]))
+            self.assertEqual("Jose", reader.order_diacritics("Jose"))
+
+    def test_line_endings(self):
+        """CRLF, CR and LF endings are kept so lines count their bytes
+        """
+        source = reader.GedcomReader(io.BytesIO(b"0 HEAD\r\n1 CHAR UTF-8\r0 TRLR\n"))
+        self.assertEqual(["0 HEAD\r\n", "1 CHAR UTF-8\r", "0 TRLR\n"], list(source))
+
+    def test_encodings(self):
+        """the same records parse to the same entities and spans match the file bytes
+        in every encoding
+        """
+        for char, name, data in (("UTF-8", "José", None),
+                                 ("UNICODE", "José", None),
+                                 ("ANSEL", "Jose\u0301", b"Jos\xe2e"),
+                                 ("ANSI", "José", None)):
+            text = RECORDS % (char, "@NAME@")
+            encoding = reader.CHARSETS[char]
+            if char == "UNICODE":
+                raw = codecs.BOM_UTF16_LE + text.replace("\n", "\r\n").encode(encoding)
+            else:
+                raw = text.encode(encoding)
+            raw = raw.replace("@NAME@".encode(encoding), data or name.encode(encoding))
+            path = self.write(raw)
+
+            _, peeps, _ = gedcom.load_file(path)
+            person = peeps.individuals["@I1@"]
+            self.assertEqual(name + " /Smith/", person.get_name(), char)
+            source = gedcom.read_source(path, person.get_source_span())
+            self.assertTrue(source.startswith("0 @I1@ INDI"), char)
+            self.assertTrue(source.rstrip().endswith("2 DATE 1 JAN 1900"), char)
+
+    def test_invalid_bytes(self):
+        """bytes invalid in the file's encoding fail the line they are on, recovering
+        runs report it and keep the byte offsets of the lines after it exact
+        """
+        raw = (RECORDS % ("UTF-8", "@NAME@")).encode("utf-8").replace(b"@NAME@", "Jos\u00e9".encode("latin-1"))
+        path = self.write(raw)
+        with self.assertRaises(gedcom.TagsError) as err:
+            gedcom.load_file(path)
+        self.assertEqual(4, err.exception.line)
+        self.assertEqual(raw.index(b"1 NAME"), err.exception.offset)
+
+        msgs, peeps, _ = gedcom.load_file(path, recover=True)
+        self.assertEqual(["line 4"], [msg["user_id"] for msg in msgs.get_messages()])
+        self.assertEqual("1 NAME Jos? /Smith/", msgs.get_messages()[0]["message"].split(": ", 1)[1])
+        span = peeps.individuals["@I2@"].get_source_span()
+        self.assertEqual(raw.index(b"0 @I2@"), span[0])
+
+        # a UTF-16 file cut in half a character can't be decoded past its end
+        path = self.write((RECORDS % ("UNICODE", "Bob")).encode("utf-16-le") + b"\x00")
+        msgs, peeps, _ = gedcom.load_file(path, recover=True)
+        self.assertIn("@I2@", peeps.individuals)
+        self.assertEqual("PARSE", msgs.get_messages()[-1]["user_story"])
+        with self.assertRaises(gedcom.TagsError):
+            gedcom.load_file(path)
+
+    def test_compressed(self):
+        """gzip, bz2 and xz files are found by their magic bytes and read decompressed
+        """
+        raw = (RECORDS % ("UTF-8", "Bob")).encode("utf-8")
+        plain = self.write(raw)
+        _, plain_peeps, _ = gedcom.load_file(plain)
+        span = plain_peeps.individuals["@I2@"].get_source_span()
+        for compress in (gzip.compress, bz2.compress, lzma.compress):
+            path = self.write(compress(raw))
+            _, peeps, _ = gedcom.load_file(path)
+            self.assertEqual("Bob /Smith/", peeps.individuals["@I1@"].get_name())
+            self.assertEqual(span, peeps.individuals["@I2@"].get_source_span())
+            self.assertEqual("0 @I2@ INDI\n1 NAME Ann /Smith/\n", gedcom.read_source(path, span))
+            first = peeps.individuals["@I1@"].get_source_span()
+            sources = gedcom.read_sources(path, [span, first, span])
+            self.assertEqual([first, span], sorted(sources))
+            self.assertEqual(gedcom.read_source(plain, first), sources[first])
+
+    def test_zip_members(self):
+        """a zip archive with one gedcom file is read as that file, members of
+        archives with more are named after a !
+        """
+        path = os.path.join(self.tmp_dir, "tree.zip")
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("bob.ged", RECORDS % ("UTF-8", "Bob"))
+        self.assertEqual([path + "!bob.ged"], reader.expand_members(path))
+        self.assertEqual("Bob /Smith/", gedcom.load_file(path)[1].individuals["@I1@"].get_name())
+
+        with zipfile.ZipFile(path, "a", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("dir/jim.ged", RECORDS % ("UTF-8", "Jim"))
+        self.assertEqual([path + "!bob.ged", path + "!dir/jim.ged"], reader.expand_members(path))
+        self.assertEqual("Jim /Smith/", gedcom.load_file(path + "!dir/jim.ged")[1].individuals["@I1@"].get_name())
+        self.assertRaises(IOError, gedcom.load_file, path)
+        self.assertRaises(IOError, gedcom.load_file, path + "!missing.ged")
+        plain = self.write(b"0 HEAD\n0 TRLR\n")
+        self.assertEqual([plain], reader.expand_members(plain))
@@ -0,0 +1,125 @@
+"""Test cases for the record builder module
+"""
+import unittest
+from extra_tags import ExtraTags
+from person import Person
+from record_builder import RecordBuilder
+
+
+def line(level, tag, args="", valid="Y"):
+    """line data as returned by Tags.processline
+    """
+    return {"level": level, "tag": tag, "args": args, "valid": valid}
+
+
+class TestRecordBuilder(unittest.TestCase):
+    """test cases for the RecordBuilder class
+    """
+
+    def setUp(self):
+        """creates a builder recording the handled lines
+        """
+        self.handled = []
+        self.builder = RecordBuilder()
+        for parent_tag, tag in ((None, "INDI"), ("INDI", "BIRT"), ("BIRT", "DATE"),
+                                ("SOUR", "DATA"), ("DATA", "DATE")):
+            self.builder.register(parent_tag, tag,
+                                  lambda data, key=(parent_tag, tag): self.handled.append((key, data["args"])))
+
+    def test_dispatch_by_parent(self):
+        """handlers are looked up by the parent tag
+        """
+        for data in (line(0, "INDI", "@I1@"), line(1, "BIRT"), line(2, "DATE", "1 JAN 1900"),
+                     line(2, "SOUR", "@S1@", "N"), line(3, "DATA", "", "N"),
+                     line(4, "DATE", "2 FEB 1902", "N")):
+            self.builder.process_line_data(data)
+
+        self.assertEqual([((None, "INDI"), "@I1@"), (("INDI", "BIRT"), ""),
+                          (("BIRT", "DATE"), "1 JAN 1900")], self.handled)
+
+    def test_arbitrary_depth(self):
+        """lines deeper than level 2 get their parent from the level stack
+        """
+        for data in (line(0, "INDI", "@I1@"), line(1, "BIRT"), line(2, "SOUR", "@S1@"),
+                     line(3, "DATA"), line(4, "DATE", "2 FEB 1902"), line(2, "DATE", "1 JAN 1900")):
+            self.builder.process_line_data(data)
+
+        self.assertEqual([((None, "INDI"), "@I1@"), (("INDI", "BIRT"), ""), (("SOUR", "DATA"), ""),
+                          (("DATA", "DATE"), "2 FEB 1902"), (("BIRT", "DATE"), "1 JAN 1900")], self.handled)
+
+    def test_invalid_parent(self):
+        """sub lines of an invalid line aren't handled under the previous tag
+        """
+        for data in (line(0, "INDI", "@I1@"), line(1, "BIRT"), line(1, "EVEN", "", "N"),
+                     line(2, "DATE", "1 JAN 1900")):
+            self.builder.process_line_data(data)
+
+        self.assertEqual([((None, "INDI"), "@I1@"), (("INDI", "BIRT"), "")], self.handled)
+
+    def test_skipped_level(self):
+        """a line skipping a level has no parent and isn't handled
+        """
+        for data in (line(0, "INDI", "@I1@"), line(2, "BIRT"), line(0, "INDI", "@I2@")):
+            self.builder.process_line_data(data)
+
+        self.assertEqual([((None, "INDI"), "@I1@"), ((None, "INDI"), "@I2@")], self.handled)
+
+    def test_facts(self):
+        """valid lines of a record without a handler are kept on the record
+        """
+        person = Person("@I1@")
+        self.builder.register(None, "INDI", lambda data: person)
+        for data in (line(0, "INDI", "@I1@"), line(1, "BAPM"), line(2, "DATE", "1 JAN 1900"),
+                     line(2, "PLAC", "Paris"), line(1, "_CURRENT", "Y", "N"), line(1, "BIRT"),
+                     line(0, "@S1@", "SOUR"), line(1, "TITL", "Register")):
+            self.builder.process_line_data(data)
+
+        self.assertEqual([(1, "BAPM", ""), (2, "DATE", "1 JAN 1900"), (2, "PLAC", "Paris")],
+                         person.get_facts())
+        self.assertIsNone(self.builder.record)
+
+    def test_kept_handled_lines(self):
+        """lines of handlers registered with keep are handled and kept as facts
+        """
+        person = Person("@I1@")
+        self.builder.register(None, "INDI", lambda data: person)
+        self.builder.register("INDI", "NAME", lambda data: None)
+        self.builder.register("NAME", "GIVN", lambda data: self.handled.append(data["args"]), keep=True)
+        for data in (line(0, "INDI", "@I1@"), line(1, "NAME", "Bob /Hope/"), line(2, "GIVN", "Bob")):
+            self.builder.process_line_data(data)
+
+        self.assertEqual(["Bob"], self.handled)
+        self.assertEqual([(1, "NAME", "Bob /Hope/"), (2, "GIVN", "Bob")], person.get_facts())
+
+    def test_extras(self):
+        """invalid lines of a record go to the extras store, handled level 1 lines
+        with kept sub lines are kept as facts
+        """
+        person = Person("@I1@")
+        self.builder.register(None, "INDI", lambda data: person)
+        self.builder.register("INDI", "NAME", lambda data: None)
+        self.builder.extras = ExtraTags()
+        for data in (line(0, "INDI", "@I1@"), line(1, "NAME", "Bob /Hope/"), line(2, "GIVN", "Bob"),
+                     line(2, "_MARNM", "Hope", "N"), line(1, "_CURRENT", "Y", "N"), line(2, "_X", "1", "N"),
+                     line(1, "NAME", "Bob /Dole/"), line(2, "_MARNM", "Dole", "N"),
+                     line(0, "@S1@", "SOUR"), line(1, "_Y", "", "N")):
+            self.builder.process_line_data(data)
+
+        self.assertEqual([(1, "NAME", "Bob /Hope/"), (2, "GIVN", "Bob"), (1, "NAME", "Bob /Dole/")],
+                         person.get_facts())
+        self.assertEqual([(2, 2, "_MARNM", "Hope"), (2, 1, "_CURRENT", "Y"), (2, 2, "_X", "1"),
+                          (3, 2, "_MARNM", "Dole")], self.builder.extras.get_lines(person))
+
+    def test_continuations(self):
+        """CONT and CONC lines are joined into the value of the fact they continue
+        """
+        person = Person("@I1@")
+        self.builder.register(None, "INDI", lambda data: person)
+        for data in (line(0, "INDI", "@I1@"), line(1, "NOTE", "first"), line(2, "CONC", " line"),
+                     line(2, "CONT", "second"), line(2, "CONT"), line(2, "CONC", "fourth"),
+                     line(1, "BAPM"), line(2, "NOTE", "short"), line(3, "CONT", "note")):
+            self.builder.process_line_data(data)
+        self.builder.finish()
+
+        self.assertEqual([(1, "NOTE", "first line\nsecond\nfourth"), (1, "BAPM", ""),
+                          (2, "NOTE", "short\nnote")], person.get_facts())
@@ -0,0 +1,49 @@
+"""Test cases for the record index module
+"""
+import pickle
+import unittest
+from record_index import RecordIndex, natural_key, ordered_ids
+
+
+class TestRecordIndex(unittest.TestCase):
+    """test cases for the RecordIndex class
+    """
+
+    def test_natural_key(self):
+        """numbers in ids are compared as numbers
+        """
+        ids = ["@I10@", "@F2@", "@I2@", "@I1@", "@I01@", "@SUBM@", "@I2a@"]
+        self.assertEqual(["@F2@", "@I01@", "@I1@", "@I2@", "@I2a@", "@I10@", "@SUBM@"],
+                         sorted(ids, key=natural_key))
+
+    def test_ordered_ids(self):
+        """the order is kept until an id is added or removed
+        """
+        records = RecordIndex()
+        records["@I10@"] = "a"
+        records["@I9@"] = "b"
+        ordered = records.get_ordered_ids()
+        self.assertEqual(["@I9@", "@I10@"], ordered)
+        records["@I9@"] = "c"
+        self.assertIs(ordered, ordered_ids(records))
+
+        records["@I1@"] = "d"
+        self.assertEqual(["@I1@", "@I9@", "@I10@"], records.get_ordered_ids())
+        del records["@I9@"]
+        self.assertEqual(["@I1@", "@I10@"], records.get_ordered_ids())
+        records.update({"@I2@": "e"})
+        self.assertEqual(["@I1@", "@I2@", "@I10@"], records.get_ordered_ids())
+        records.pop("@I1@")
+        self.assertEqual(["@I2@", "@I10@"], records.get_ordered_ids())
+        version = records.get_version()
+        records["@I2@"] = "f"
+        self.assertLess(version, records.get_version())
+
+        copy = pickle.loads(pickle.dumps(records))
+        self.assertEqual({"@I2@": "f", "@I10@": "a"}, copy)
+        self.assertEqual(["@I2@", "@I10@"], copy.get_ordered_ids())
+
+    def test_plain_dict(self):
+        """plain dicts are sorted in natural order
+        """
+        self.assertEqual(["@F3@", "@F20@"], ordered_ids({"@F20@": None, "@F3@": None}))
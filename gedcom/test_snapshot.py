@@ -0,0 +1,102 @@
+"""Test cases for the snapshot module
+"""
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+import gedcom
+import snapshot
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "samples", "sample_01.ged")
+
+
+class TestSnapshot(unittest.TestCase):
+    """test cases for the snapshot cache
+    Attributes:
+        filename (string): copy of the sample gedcom file in a temp directory
+    """
+
+    def setUp(self):
+        """copy the sample file to a temp directory
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, "sample.ged")
+        shutil.copyfile(SAMPLE, self.filename)
+
+    def tearDown(self):
+        """delete the temp directory
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def test_no_snapshot(self):
+        """nothing to load before a snapshot is written
+        """
+        self.assertIsNone(snapshot.load_snapshot(self.filename))
+
+    def test_round_trip(self):
+        """the loaded snapshot matches the parsed file
+        """
+        msgs, peeps, fam = gedcom.load_file(self.filename, True)
+        self.assertTrue(os.path.exists(snapshot.snapshot_path(self.filename)))
+
+        cached = snapshot.load_snapshot(self.filename)
+        self.assertIsNotNone(cached)
+        cached_msgs, cached_peeps, cached_fam = cached
+
+        self.assertEqual(sorted(peeps.individuals.keys()), sorted(cached_peeps.individuals.keys()))
+        self.assertEqual(sorted(fam.families.keys()), sorted(cached_fam.families.keys()))
+        person = peeps.individuals["@I2@"]
+        cached_person = cached_peeps.individuals["@I2@"]
+        self.assertEqual(person.get_name(), cached_person.get_name())
+        self.assertEqual(person.get_birth_date(), cached_person.get_birth_date())
+        self.assertEqual(person.get_spouse_of_families(), cached_person.get_spouse_of_families())
+
+        # validation still works on the loaded objects and gives the same results
+        fam.validate()
+        peeps.validate()
+        cached_fam.validate()
+        cached_peeps.validate()
+        self.assertEqual(msgs.get_messages(), cached_msgs.get_messages())
+
+    def test_changed_file_is_stale(self):
+        """a modified gedcom file invalidates the snapshot
+        """
+        gedcom.load_file(self.filename, True)
+        with open(self.filename, "a") as out:
+            out.write("0 @I99@ INDI\n1 NAME New /Person/\n")
+
+        self.assertIsNone(snapshot.load_snapshot(self.filename))
+        _, peeps, _ = gedcom.load_file(self.filename, True)
+        self.assertIn("@I99@", peeps.individuals)
+        self.assertIn("@I99@", snapshot.load_snapshot(self.filename)[1].individuals)
+
+    def test_touched_file_uses_hash(self):
+        """a new mtime with the same content still uses the snapshot
+        """
+        gedcom.load_file(self.filename, True)
+        stat = os.stat(self.filename)
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        self.assertIsNotNone(snapshot.load_snapshot(self.filename))
+
+    def test_version_mismatch(self):
+        """snapshots from another format version are ignored
+        """
+        gedcom.load_file(self.filename, True)
+        path = snapshot.snapshot_path(self.filename)
+        with open(path, "r+b") as snap:
+            snap.seek(len(snapshot.MAGIC))
+            snap.write(struct.pack("<I", snapshot.SNAPSHOT_VERSION + 1))
+
+        self.assertIsNone(snapshot.load_snapshot(self.filename))
+
+    def test_corrupt_snapshot(self):
+        """a truncated snapshot is ignored
+        """
+        gedcom.load_file(self.filename, True)
+        path = snapshot.snapshot_path(self.filename)
+        with open(path, "r+b") as snap:
+            snap.truncate(snapshot.HEADER.size + 10)
+
+        self.assertIsNone(snapshot.load_snapshot(self.filename))
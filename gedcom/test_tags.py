@@ -0,0 +1,107 @@
+"""Test cases for tags module
+"""
+import unittest
+import unittest.mock
+from reader import _encodes_to_ascii, utf16_length
+from tags import Tags, TagsError
+
+
+class TestTags(unittest.TestCase):
+    """test cases for tags class
+    Attributes:
+        tags (Tags): Tags test object
+    """
+
+    def setUp(self):
+        """creates tags object
+        """
+        self.tags = Tags()
+
+    def tearDown(self):
+        """delete tags object
+        """
+        del self.tags
+
+    def test_valid_line(self):
+        """parse a valid tag line
+        """
+        self.tags.processline("0 @I1@ INDI\n")
+        data = self.tags.processline("1 NAME Bob /Hope/\n")
+        self.assertEqual({"level": 1, "tag": "NAME", "args": "Bob /Hope/", "valid": "Y"}, data)
+
+    def test_record_line(self):
+        """the id comes before the tag on INDI and FAM lines
+        """
+        data = self.tags.processline("0 @I1@ INDI\n")
+        self.assertEqual({"level": 0, "tag": "INDI", "args": "@I1@", "valid": "Y"}, data)
+
+    def test_invalid_tag(self):
+        """unknown tags and tags on the wrong level are not valid
+        """
+        self.assertEqual("N", self.tags.processline("1 BLAH sdfsd\n")["valid"])
+        self.assertEqual("N", self.tags.processline("2 NAME Bob\n")["valid"])
+
+    def test_context(self):
+        """tags are only valid under the parents the grammar allows them
+        """
+        lines = [("0 @I1@ INDI\n", "Y"), ("1 DATE 1 JAN 1900\n", "N"), ("1 BAPM\n", "Y"),
+                 ("2 DATE 1 JAN 1900\n", "Y"), ("2 PLAC Paris\n", "Y"), ("3 MAP\n", "Y"),
+                 ("4 LATI N48.85\n", "Y"), ("1 _CURRENT Y\n", "N"), ("2 DATE 1 JAN 1900\n", "N"),
+                 ("1 HUSB @I2@\n", "N"), ("0 @F1@ FAM\n", "Y"), ("1 HUSB @I2@\n", "Y"),
+                 ("1 MARR\n", "Y"), ("2 HUSB\n", "Y"), ("3 AGE 25y\n", "Y"), ("3 DATE 1 JAN 1900\n", "N"),
+                 ("1 NAME Bob\n", "N")]
+        for line, valid in lines:
+            self.assertEqual(valid, self.tags.processline(line)["valid"], line)
+
+    def test_other_records(self):
+        """records other than INDI and FAM also have their id before the tag
+        """
+        data = self.tags.processline("0 @S1@ SOUR\n")
+        self.assertEqual({"level": 0, "tag": "SOUR", "args": "@S1@", "valid": "Y"}, data)
+        data = self.tags.processline("1 TITL Parish register\n")
+        self.assertEqual({"level": 1, "tag": "TITL", "args": "Parish register", "valid": "Y"}, data)
+
+    def test_skipped_level(self):
+        """a line skipping a level and its sub lines are not valid
+        """
+        self.tags.processline("0 @I1@ INDI\n")
+        self.assertEqual("N", self.tags.processline("2 DATE 1 JAN 1900\n")["valid"])
+        self.assertEqual("N", self.tags.processline("3 TIME 12:00\n")["valid"])
+        self.assertEqual("Y", self.tags.processline("1 SEX M\n")["valid"])
+
+    def test_line_tracking(self):
+        """line numbers and byte offsets follow the processed lines
+        """
+        self.tags.processline("0 HEAD\r\n")
+        self.assertEqual(1, self.tags.line_number)
+        self.assertEqual(0, self.tags.offset)
+        self.tags.processline("1 NAME Zoë /Smith/\n")
+        self.assertEqual(2, self.tags.line_number)
+        self.assertEqual(8, self.tags.offset)
+        self.tags.processline("0 TRLR\n")
+        self.assertEqual(3, self.tags.line_number)
+        self.assertEqual(28, self.tags.offset)
+
+    def test_line_tracking_without_isascii(self):
+        """offsets are the same with the ASCII check python 3.6 uses
+        """
+        with unittest.mock.patch("tags.is_ascii", _encodes_to_ascii):
+            self.test_line_tracking()
+            tags = Tags(utf16_length)
+            tags.processline("0 HEAD\r\n")
+            tags.processline("1 NAME Zoë /Smith/\n")
+            tags.processline("0 TRLR\n")
+            self.assertEqual(54, tags.offset)
+            with self.assertRaises(TagsError):
+                Tags().processline("1 NOTE \udcff\n")
+
+    def test_invalid_level(self):
+        """a line without a level raises with the line number, offset and text
+        """
+        self.tags.processline("0 HEAD\n")
+        with self.assertRaises(TagsError) as err:
+            self.tags.processline("X NAME broken\n")
+        self.assertEqual(2, err.exception.line)
+        self.assertEqual(7, err.exception.offset)
+        self.assertEqual("X NAME broken", err.exception.text)
+        self.assertEqual("ERROR: Invalid level found for line at line: 2 (byte offset 7)", str(err.exception))
@@ -0,0 +1,185 @@
+"""Test cases for the tree cache module
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from tree_cache import TreeCache, estimate_tree_bytes
+from loaded_tree import LoadedTree
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "samples", "sample_01.ged")
+
+
+class TestTreeCache(unittest.TestCase):
+    """test cases for the LRU tree cache
+    Attributes:
+        files (string[]): gedcom files in a temp directory with different content
+    """
+
+    def setUp(self):
+        """write three small gedcom files
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.files = []
+        for idx in range(3):
+            filename = os.path.join(self.tmp_dir, "tree%i.ged" % idx)
+            with open(filename, "w") as out:
+                out.write("0 @I%i@ INDI\n1 NAME Tree /Number%i/\n" % (idx, idx))
+            self.files.append(filename)
+        self.loads = []
+
+    def tearDown(self):
+        """delete the temp directory
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def loader(self, filename):
+        """counting loader with a fixed size per tree
+        """
+        self.loads.append(filename)
+        return filename
+
+    def test_hits_and_misses(self):
+        """second get of a file is a hit
+        """
+        cache = TreeCache(100, self.loader, lambda tree: 10)
+        self.assertEqual(self.files[0], cache.get(self.files[0]))
+        self.assertEqual(self.files[0], cache.get(self.files[0]))
+
+        metrics = cache.get_metrics()
+        self.assertEqual(1, metrics["hits"])
+        self.assertEqual(1, metrics["misses"])
+        self.assertEqual(1, len(self.loads))
+        self.assertEqual(10, metrics["bytes"])
+
+    def test_lru_eviction_by_bytes(self):
+        """least recently used trees are evicted once over the memory budget
+        """
+        cache = TreeCache(25, self.loader, lambda tree: 10)
+        cache.get(self.files[0])
+        cache.get(self.files[1])
+        cache.get(self.files[0])
+        cache.get(self.files[2])
+
+        metrics = cache.get_metrics()
+        self.assertEqual(1, metrics["evictions"])
+        self.assertEqual(2, metrics["trees"])
+        # file 1 was the least recently used
+        cache.get(self.files[0])
+        self.assertEqual(3, len(self.loads))
+        cache.get(self.files[1])
+        self.assertEqual(4, len(self.loads))
+
+    def test_oversized_tree(self):
+        """a tree over the budget is still cached on its own
+        """
+        cache = TreeCache(5, self.loader, lambda tree: 10)
+        cache.get(self.files[0])
+        self.assertEqual(1, cache.get_metrics()["trees"])
+        cache.get(self.files[1])
+        self.assertEqual(1, cache.get_metrics()["trees"])
+        self.assertEqual(1, cache.get_metrics()["evictions"])
+
+    def test_changed_content(self):
+        """a changed file is loaded again and replaces the old version
+        """
+        cache = TreeCache(100, self.loader, lambda tree: 10)
+        cache.get(self.files[0])
+        stat = os.stat(self.files[0])
+        with open(self.files[0], "a") as out:
+            out.write("0 @I9@ INDI\n")
+        os.utime(self.files[0], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        cache.get(self.files[0])
+        self.assertEqual(2, len(self.loads))
+        self.assertEqual(1, cache.get_metrics()["trees"])
+
+    def test_changed_during_load(self):
+        """a tree loaded while the file changed is returned but not cached under the old hash
+        """
+        def changing_loader(filename):
+            stat = os.stat(filename)
+            with open(filename, "a") as out:
+                out.write("0 @I9@ INDI\n")
+            os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            return self.loader(filename)
+
+        cache = TreeCache(100, changing_loader, lambda tree: 10)
+        self.assertEqual(self.files[0], cache.get(self.files[0]))
+        metrics = cache.get_metrics()
+        self.assertEqual(1, metrics["changed_during_load"])
+        self.assertEqual(0, metrics["trees"])
+
+        cache = TreeCache(100, self.loader, lambda tree: 10)
+        cache.get(self.files[0])
+        self.assertEqual(1, cache.get_metrics()["trees"])
+
+    def test_evicted_hashes_dropped(self):
+        """remembered hashes are only kept for files with a cached tree
+        """
+        cache = TreeCache(25, self.loader, lambda tree: 10)
+        for filename in self.files:
+            cache.get(filename)
+        self.assertEqual({os.path.abspath(filename) for filename in self.files[1:]}, set(cache._hashes))
+        self.assertEqual(set(cache._entries), set(cache._cached.items()))
+        cache.invalidate(self.files[1])
+        self.assertEqual({os.path.abspath(self.files[2])}, set(cache._hashes))
+        self.assertEqual(set(cache._entries), set(cache._cached.items()))
+        self.assertEqual(10, cache.get_metrics()["bytes"])
+
+        def failing_loader(filename):
+            raise ValueError("bad file")
+
+        cache = TreeCache(100, failing_loader)
+        with self.assertRaises(ValueError):
+            cache.get(self.files[0])
+        self.assertEqual({}, cache._hashes)
+
+    def test_concurrent_loads_are_shared(self):
+        """threads asking for the same tree while it loads share one load
+        """
+        release = threading.Event()
+
+        def slow_loader(filename):
+            release.wait(10)
+            return self.loader(filename)
+
+        cache = TreeCache(100, slow_loader, lambda tree: 10)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get(self.files[0]))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        while cache.get_metrics()["misses"] < 4:
+            threading.Event().wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([self.files[0]] * 4, results)
+        self.assertEqual(1, len(self.loads))
+        self.assertEqual(3, cache.get_metrics()["shared_loads"])
+
+    def test_load_error(self):
+        """a failed load is raised and not cached
+        """
+        def failing_loader(filename):
+            raise ValueError("bad file")
+
+        cache = TreeCache(100, failing_loader)
+        with self.assertRaises(ValueError):
+            cache.get(self.files[0])
+        self.assertEqual(1, cache.get_metrics()["load_errors"])
+        self.assertEqual(0, cache.get_metrics()["trees"])
+
+    def test_default_loader(self):
+        """the default loader parses and validates the file
+        """
+        filename = os.path.join(self.tmp_dir, "sample.ged")
+        shutil.copyfile(SAMPLE, filename)
+        cache = TreeCache(10 ** 9)
+        tree = cache.get(filename)
+
+        self.assertIsInstance(tree, LoadedTree)
+        self.assertEqual(2, len(tree.messages.get_messages()))
+        self.assertEqual(estimate_tree_bytes(tree), cache.get_metrics()["bytes"])
@@ -3,7 +3,8 @@
 import unittest
 import io
 import sys
-from validation_messages import ValidationMessages
+from message_sinks import SummarySink
+from validation_messages import ValidationMessages, ValidationStopped
 from people import People
 
 
@@ -53,3 +54,54 @@ class TestValidationMessages(unittest.TestCase):
 +------------+------------+------+-----------+------------------------+
 """
         self.assertEqual(test_output, output.getvalue())
+
+    def test_template(self):
+        """templates are formatted with their arguments when the messages are read
+        """
+        self.msgs.add_message("FAMILY", "US11", "@F2@", "NA", "Bigamy for %s %s", args=("@I2@", "Great /Tiger/"))
+
+        self.assertEqual("Bigamy for @I2@ Great /Tiger/", self.msgs.get_messages()[0]["message"])
+        self.assertEqual({"US11": 1}, self.msgs.get_counts())
+
+    def test_summary(self):
+        """summary mode counts every message and keeps the first ones of each user story
+        """
+        msgs = ValidationMessages(SummarySink(2))
+        for idx in range(1000):
+            msgs.add_message("FAMILY", "US26", "@F%i@" % idx, "NA", "corresponding child link missing for %s %s",
+                             args=("@I%i@" % idx, "Bob /Hope/"))
+        msgs.add_message(People.CLASS_IDENTIFIER, "US01", "@I7@", "Test Name", "Birth date should occur before current date")
+
+        self.assertEqual([("US01", "INDIVIDUAL", 1), ("US26", "FAMILY", 1000)], msgs.get_summary())
+        self.assertEqual(3, len(msgs.get_messages()))
+        self.assertEqual(1001, msgs.get_count())
+        self.assertIsNone(self.msgs.get_summary())
+
+        output = io.StringIO()
+        sys.stdout = output
+        msgs.print_lines()
+        sys.stdout = sys.__stdout__
+        self.assertEqual("US01\tINDIVIDUAL\t1 messages\n"
+                         "US01\tINDIVIDUAL\t@I7@\tTest Name\tBirth date should occur before current date\n"
+                         "US26\tFAMILY\t1000 messages\n"
+                         "US26\tFAMILY\t@F0@\tNA\tcorresponding child link missing for @I0@ Bob /Hope/\n"
+                         "US26\tFAMILY\t@F1@\tNA\tcorresponding child link missing for @I1@ Bob /Hope/\n",
+                         output.getvalue())
+
+    def test_limits(self):
+        """the message reaching the maximum or of a fail fast user story stops with the messages so far
+        """
+        self.msgs.set_limits(max_errors=2)
+        self.msgs.add_message(People.CLASS_IDENTIFIER, "US01", "@I1@", "Test Name", "Birth date should occur before current date")
+        with self.assertRaises(ValidationStopped) as stopped:
+            self.msgs.add_message(People.CLASS_IDENTIFIER, "US01", "@I2@", "Test Name", "Birth date should occur before current date")
+        self.assertIs(self.msgs, stopped.exception.messages)
+        self.assertEqual(["@I1@", "@I2@"], [msg["user_id"] for msg in self.msgs.get_messages()])
+
+        msgs = ValidationMessages()
+        msgs.set_limits(fail_fast=["US11"])
+        msgs.add_message("FAMILY", "US26", "@F1@", "NA", "corresponding child link missing for %s %s",
+                         args=("@I1@", "Bob /Hope/"))
+        with self.assertRaises(ValidationStopped):
+            msgs.add_message("FAMILY", "US11", "@F2@", "NA", "Bigamy for %s %s", args=("@I2@", "Great /Tiger/"))
+        self.assertEqual({"US26": 1, "US11": 1}, msgs.get_counts())
@@ -0,0 +1,179 @@
+"""Test cases for the watcher module
+"""
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from daemon import TreeRegistry
+from loaded_tree import LoadedTree
+from watcher import FileWatcher, TreeHolder
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "samples", "sample_01.ged")
+
+
+class TestWatcher(unittest.TestCase):
+    """test cases for the file watcher and tree holder
+    Attributes:
+        filename (string): copy of the sample file in a temp directory
+    """
+
+    def setUp(self):
+        """copy the sample file to a temp directory
+        """
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, "sample.ged")
+        shutil.copyfile(SAMPLE, self.filename)
+
+    def tearDown(self):
+        """delete the temp directory
+        """
+        shutil.rmtree(self.tmp_dir)
+
+    def append_person(self):
+        """add a person to the gedcom file and make sure the mtime moves
+        """
+        stat = os.stat(self.filename)
+        with open(self.filename, "a") as out:
+            out.write("0 @I99@ INDI\n1 NAME New /Person/\n")
+        os.utime(self.filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+    def test_file_watcher_check(self):
+        """only real changes are reported
+        """
+        changes = []
+        watcher = FileWatcher(self.filename, changes.append)
+
+        self.assertFalse(watcher.check())
+        self.append_person()
+        self.assertTrue(watcher.check())
+        self.assertFalse(watcher.check())
+        self.assertEqual([self.filename], changes)
+
+    def test_file_watcher_missing_file(self):
+        """a file that is briefly missing isn't a change
+        """
+        watcher = FileWatcher(self.filename, lambda _: None)
+        os.rename(self.filename, self.filename + ".bak")
+        self.assertFalse(watcher.check())
+        os.rename(self.filename + ".bak", self.filename)
+        self.assertFalse(watcher.check())
+
+    def test_holder_reload(self):
+        """a background reload swaps in a new version
+        """
+        holder = TreeHolder(self.filename, LoadedTree)
+        old_tree = holder.get()
+        self.assertEqual(1, holder.version)
+
+        self.append_person()
+        holder.reload_async()
+        self.assertTrue(holder.wait(10))
+
+        self.assertEqual(2, holder.version)
+        self.assertIsNot(old_tree, holder.get())
+        self.assertIn("@I99@", holder.get().people.individuals)
+        self.assertNotIn("@I99@", old_tree.people.individuals)
+
+    def test_holder_serves_old_tree_while_loading(self):
+        """readers get the old tree until the new one is completely loaded
+        """
+        started = threading.Event()
+        release = threading.Event()
+        loads = []
+
+        def slow_loader(filename):
+            if loads:
+                started.set()
+                release.wait(10)
+            loads.append(filename)
+            return len(loads)
+
+        holder = TreeHolder(self.filename, slow_loader)
+        holder.reload_async()
+        self.assertTrue(started.wait(10))
+        self.assertEqual(1, holder.get())
+        release.set()
+        self.assertTrue(holder.wait(10))
+        self.assertEqual(2, holder.get())
+
+    def test_holder_keeps_tree_on_failure(self):
+        """a broken file keeps the old tree and records the error
+        """
+        holder = TreeHolder(self.filename, LoadedTree)
+        old_tree = holder.get()
+        with open(self.filename, "a") as out:
+            out.write("X broken line\n")
+
+        holder.reload_async()
+        self.assertTrue(holder.wait(10))
+
+        self.assertIs(old_tree, holder.get())
+        self.assertEqual(1, holder.version)
+        self.assertIsNotNone(holder.last_error)
+
+    def test_holder_coalesces_changes(self):
+        """changes during a reload lead to exactly one more reload
+        """
+        started = threading.Event()
+        release = threading.Event()
+        loads = []
+
+        def slow_loader(filename):
+            if len(loads) == 1:
+                started.set()
+                release.wait(10)
+            loads.append(filename)
+            return len(loads)
+
+        holder = TreeHolder(self.filename, slow_loader)
+        holder.reload_async()
+        self.assertTrue(started.wait(10))
+        holder.reload_async()
+        holder.reload_async()
+        release.set()
+        self.assertTrue(holder.wait(10))
+        self.assertEqual(3, len(loads))
+        self.assertEqual(3, holder.version)
+
+    def test_holder_drops_stale_reload(self):
+        """a reload that finishes after a later started one doesn't replace its tree
+        """
+        started = threading.Event()
+        release = threading.Event()
+        loads = []
+
+        def slow_loader(filename):
+            loads.append(filename)
+            result = len(loads)
+            if result == 2:
+                started.set()
+                release.wait(10)
+            return result
+
+        holder = TreeHolder(self.filename, slow_loader)
+        holder.reload_async()
+        self.assertTrue(started.wait(10))
+        self.assertEqual(3, holder.reload())
+        release.set()
+        self.assertTrue(holder.wait(10))
+
+        self.assertEqual(3, holder.get())
+        self.assertEqual(2, holder.version)
+        self.assertIsNone(holder.last_error)
+
+    def test_registry_watch(self):
+        """watched registries reload changed files on their own
+        """
+        registry = TreeRegistry([self.filename], 0.01)
+        try:
+            self.append_person()
+            holder = registry.get_holder("sample")
+            for _ in range(500):
+                if holder.version > 1:
+                    break
+                threading.Event().wait(0.01)
+            holder.wait(10)
+            self.assertIn("@I99@", registry.get("sample").people.individuals)
+        finally:
+            registry.close()
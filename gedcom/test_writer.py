@@ -0,0 +1,132 @@
+"""Test cases for the writer module
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+import gedcom
+import writer
+
+SAMPLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "samples", "sample_01.ged")
+
+
+def person_state(person):
+    """everything stored for a person
+    """
+    return (person.get_person_id(), person.get_name(), person.get_gender(), person.get_birth_date(),
+            person.get_death_date(), person.get_is_alive(), person.get_children_of_families(),
+            person.get_spouse_of_families(), person.get_facts())
+
+
+def family_state(family):
+    """everything stored for a family
+    """
+    return (family.get_family_id(), family.get_husband_id(), family.get_wife_id(), family.get_children(),
+            family.get_married_date(), family.get_divorced_date(), family.get_facts())
+
+
+def load(filename):
+    """parse, keeping the unrecognized lines, and validate a file
+    """
+    msgs, peeps, fam = gedcom.load_file(filename, keep_extras=True)
+    fam.validate()
+    peeps.validate()
+    return msgs, peeps, fam
+
+
+def tree_state(msgs, peeps, fam):
+    """entities, unrecognized lines and messages without their source spans
+    """
+    extras = peeps.get_extra_tags()
+    return ([person_state(person) + (extras.get_lines(person),) for person in peeps.individuals.values()],
+            [family_state(family) + (extras.get_lines(family),) for family in fam.families.values()],
+            [{key: value for key, value in msg.items() if key != "span"} for msg in msgs.get_messages()])
+
+
+class TestWriter(unittest.TestCase):
+    """test cases for writing gedcom files
+    """
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmp_dir, "out.ged")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_round_trip(self):
+        """parse -> write -> parse gives the same entities, kept lines and messages
+        """
+        msgs, peeps, fam = load(SAMPLE)
+        writer.write_file(self.filename, peeps, fam)
+        written = load(self.filename)
+
+        self.assertEqual(tree_state(msgs, peeps, fam), tree_state(*written))
+        self.assertEqual(2, len(written[0].get_messages()))
+
+        # writing the written file again gives the same bytes
+        again = os.path.join(self.tmp_dir, "again.ged")
+        writer.write_file(again, written[1], written[2])
+        with open(self.filename, "rb") as first, open(again, "rb") as second:
+            self.assertEqual(first.read(), second.read())
+
+    def test_long_note(self):
+        """a note continued over thousands of lines is one value and is written back the same
+        """
+        text = "\n".join("line %i:" % idx + "x y" * (idx % 100) for idx in range(3000))
+        first, continuations = writer.split_value(text)
+        with open(self.filename, "w") as out:
+            out.write("0 HEAD\n0 @I1@ INDI\n1 NAME Bob /Hope/\n1 NOTE %s\n" % first)
+            out.writelines("2 %s %s\n" % continuation for continuation in continuations)
+            out.write("1 SEX M\n0 TRLR\n")
+        _, peeps, fam = load(self.filename)
+        self.assertEqual([(1, "NOTE", text)], peeps.individuals["@I1@"].get_facts())
+        self.assertEqual("M", peeps.individuals["@I1@"].get_gender())
+
+        again = os.path.join(self.tmp_dir, "again.ged")
+        writer.write_file(again, peeps, fam)
+        _, written_peeps, _ = load(again)
+        self.assertEqual([(1, "NOTE", text)], written_peeps.individuals["@I1@"].get_facts())
+
+    def test_changed_fields(self):
+        """changed fields are written with the sub lines kept for them
+        """
+        _, peeps, fam = load(SAMPLE)
+        person = peeps.individuals["@I2@"]
+        person.set_name("Grand /Tiger/")
+        person.get_spouse_of_families().remove("@F3@")
+        person.set_date_value(datetime(1961, 2, 3), "death")
+        writer.write_file(self.filename, peeps, fam, ["@I2@"], [])
+
+        with open(self.filename) as written:
+            lines = written.read().splitlines()
+        self.assertEqual(["0 @I2@ INDI", "1 SEX M", "1 FAMC @F4@", "1 FAMS @F2@", "1 DEAT", "2 DATE 3 FEB 1961",
+                          "1 NAME Grand /Tiger/", "2 GIVN Great", "2 SURN Tiger", "2 _MARNM Tiger",
+                          "1 BIRT", "2 DATE 21 MAR 1960", "0 TRLR"], lines[6:])
+
+    def test_subset(self):
+        """only the records asked for are written, in the order given
+        """
+        _, peeps, fam = load(SAMPLE)
+        writer.write_file(self.filename, peeps, fam, ["@I3@", "@I1@"], ["@F2@"])
+        # not validated, the family refers to individuals that weren't written
+        _, written_peeps, written_fam = gedcom.load_file(self.filename)
+
+        self.assertEqual(["@I3@", "@I1@"], list(written_peeps.individuals.keys()))
+        self.assertEqual(["@F2@"], list(written_fam.families.keys()))
+        self.assertEqual(family_state(fam.families["@F2@"]), family_state(written_fam.families["@F2@"]))
+
+    def test_split_value(self):
+        """new lines become CONT lines and long lines CONC lines not cut next to a space
+        """
+        self.assertEqual(("short", []), writer.split_value("short"))
+        self.assertEqual(("one", [("CONT", "two"), ("CONT", ""), ("CONT", "three")]),
+                         writer.split_value("one\ntwo\n\nthree"))
+        self.assertEqual(("abcd", [("CONC", "ef g"), ("CONC", "hij")]),
+                         writer.split_value("abcdef ghij", 4))
+
+    def test_format_date(self):
+        """dates are written the way they are parsed
+        """
+        self.assertEqual("6 MAR 1917", writer.format_date(datetime(1917, 3, 6)))
@@ -0,0 +1,199 @@
+"""TreeCache
+Bounded in memory cache of parsed and validated trees for services hosting many files
+
+Entries are keyed by the absolute file path and the sha256 of its content and are
+evicted least recently used first once the estimated memory of all cached trees is
+over the budget.  The content hash of a path is only recomputed when its size or
+modification time changes and a tree is only cached when the file is unchanged
+after loading it, so it is never stored under the hash of other content.  A miss
+loads through the sidecar snapshot when there is one or parses the file,
+concurrent requests for the same tree share a single load.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from loaded_tree import LoadedTree
+from snapshot import hash_file
+
+# approximate bytes held per record of a loaded tree, measured with tracemalloc
+PERSON_BYTES = 560
+FAMILY_BYTES = 560
+MESSAGE_BYTES = 300
+
+
+def estimate_tree_bytes(tree):
+    """estimated memory used by a LoadedTree
+
+    Args:
+        tree (LoadedTree): loaded tree
+    Returns:
+        int
+    """
+    record_bytes = len(tree.people.individuals) * PERSON_BYTES + len(tree.families.families) * FAMILY_BYTES
+    return record_bytes + tree.messages.get_count() * MESSAGE_BYTES
+
+
+def _file_stat(path):
+    """returns (mtime in ns, size) of a file
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+class TreeCache(object):
+    """TreeCache
+    LRU cache of LoadedTree bounded by estimated memory
+
+    Args:
+        max_bytes (int): memory budget for all cached trees.  A single tree over
+            the budget is still returned and cached until the next load
+        loader (callable): builds a tree from a file name, defaults to a LoadedTree
+            that goes through the sidecar snapshot cache
+        estimate (callable): returns the estimated bytes of a tree
+    """
+
+    def __init__(self, max_bytes, loader=None, estimate=estimate_tree_bytes):
+        self.max_bytes = max_bytes
+        self._loader = loader if loader is not None else lambda filename: LoadedTree(filename, True)
+        self._estimate = estimate
+        self._lock = threading.Lock()
+        # key: (tree, estimated bytes), least recently used first
+        self._entries = OrderedDict()
+        # key: Future of a load in progress
+        self._loading = {}
+        # path: content hash of its cached tree, at most one per path
+        self._cached = {}
+        # path: number of loads in progress
+        self._loading_paths = {}
+        # path: ((mtime in ns, size), content hash) of the paths cached or loading
+        self._hashes = {}
+        self._bytes = 0
+        self._metrics = {"hits": 0, "misses": 0, "evictions": 0, "shared_loads": 0, "load_errors": 0,
+                         "changed_during_load": 0}
+
+    def _key(self, filename):
+        """returns ((absolute path, content hash), file stat), hashing only when the
+        file stat changed.  The stat is taken before hashing so a change while
+        hashing shows after the load
+        """
+        path = os.path.abspath(filename)
+        stat = _file_stat(path)
+        with self._lock:
+            known = self._hashes.get(path)
+        if known is not None and known[0] == stat:
+            return (path, known[1]), stat
+        content_hash = hash_file(path)
+        with self._lock:
+            self._hashes[path] = (stat, content_hash)
+        return (path, content_hash), stat
+
+    def get(self, filename):
+        """returns the tree of a file from the cache, loading it on a miss
+
+        Args:
+            filename (string): gedcom file
+        Returns:
+            LoadedTree
+        Raises:
+            IOError, TagsError, ValueError: when the file can't be loaded
+        """
+        key, stat = self._key(filename)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._metrics["hits"] += 1
+                return entry[0]
+            self._metrics["misses"] += 1
+            future = self._loading.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._loading[key] = future
+                self._loading_paths[key[0]] = self._loading_paths.get(key[0], 0) + 1
+            else:
+                self._metrics["shared_loads"] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            tree = self._loader(filename)
+        except BaseException as err:
+            with self._lock:
+                self._end_load(key)
+                self._metrics["load_errors"] += 1
+                self._forget_hash(key[0])
+            future.set_exception(err)
+            raise
+
+        try:
+            unchanged = _file_stat(key[0]) == stat
+        except OSError:
+            unchanged = False
+        with self._lock:
+            self._end_load(key)
+            if unchanged:
+                self._store(key, tree)
+            else:
+                # the tree may hold content newer than the hash, return it without caching
+                self._metrics["changed_during_load"] += 1
+                self._hashes.pop(key[0], None)
+        future.set_result(tree)
+        return tree
+
+    def _end_load(self, key):
+        """remove a finished load.  Must be called with the lock held
+        """
+        del self._loading[key]
+        count = self._loading_paths.pop(key[0]) - 1
+        if count:
+            self._loading_paths[key[0]] = count
+
+    def _store(self, key, tree):
+        """add a loaded tree, drop the older version of the same file and evict down to the budget.
+        Must be called with the lock held
+        """
+        self._drop(key[0])
+        size = self._estimate(tree)
+        self._entries[key] = (tree, size)
+        self._cached[key[0]] = key[1]
+        self._bytes += size
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            (path, _), (_, evicted_size) = self._entries.popitem(last=False)
+            del self._cached[path]
+            self._bytes -= evicted_size
+            self._metrics["evictions"] += 1
+            self._forget_hash(path)
+
+    def _drop(self, path):
+        """drop the cached tree of a path if there is one.  Must be called with the lock held
+        """
+        content_hash = self._cached.pop(path, None)
+        if content_hash is not None:
+            self._bytes -= self._entries.pop((path, content_hash))[1]
+
+    def _forget_hash(self, path):
+        """drop the remembered hash of a path that has no cached tree and no load in progress.
+        Must be called with the lock held
+        """
+        if path not in self._cached and path not in self._loading_paths:
+            self._hashes.pop(path, None)
+
+    def invalidate(self, filename):
+        """drop every cached version of a file
+        """
+        path = os.path.abspath(filename)
+        with self._lock:
+            self._drop(path)
+            self._hashes.pop(path, None)
+
+    def get_metrics(self):
+        """returns the cache counters plus the current number of trees and estimated bytes
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics["trees"] = len(self._entries)
+            metrics["bytes"] = self._bytes
+            return metrics
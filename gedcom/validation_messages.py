@@ -1,50 +1,269 @@
 """ValidationMessages
 Used to store validation error messages
+
+Messages are given as a template and its arguments and stored as compact
+tuples in a sink (see message_sinks), the text is only formatted when the
+messages are read or printed.  The default sink keeps them in memory, file
+sinks keep little or nothing per message in memory.  With a SummarySink only
+the counts and a few examples of each user story are kept and printed.
+
+With limits set, adding the message that reaches the maximum number of
+messages, or a message of a fail fast user story, raises ValidationStopped so
+parsing or validation ends there with the messages found so far.
 """
-from prettytable import PrettyTable
+from sys import intern
+from message_sinks import MemorySink, SummarySink, render
+
+
+class ValidationStopped(Exception):
+    """ValidationStopped
+    Raised when the messages reach the limits of ValidationMessages.set_limits
+
+    Args:
+        messages (ValidationMessages): messages found until the limit
+        reason (string): why it stopped
+    """
+
+    def __init__(self, messages, reason):
+        super(ValidationStopped, self).__init__(reason)
+        self.messages = messages
 
 
 class ValidationMessages(object):
     """ValidationMessages
     Used to store validation error messages
+
+    Args:
+        sink (MemorySink, SummarySink, JsonlSink or SqliteSink): where the messages go, in memory when None
     """
+    PARSE_ERROR_ID = "GEDCOM"
+    PARSE_USER_STORY = "PARSE"
+
+    def __init__(self, sink=None):
+        self._sink = MemorySink() if sink is None else sink
+        # user story: number of messages
+        self._counts = {}
+        self._count = 0
+        self._span_lookup = None
+        self._baseline = None
+        self._skip_rules = False
+        # see set_limits, checked only when there are limits
+        self._limited = False
+        self._max_errors = None
+        self._fail_fast = frozenset()
+
+    def set_sink(self, sink):
+        """send the messages to another sink, the messages added so far are moved
+        to it.  Known findings of the baseline are dropped on the way
+
+        Args:
+            sink (MemorySink, SummarySink, JsonlSink or SqliteSink): sink the messages go to from now on
+        Raises:
+            ValidationStopped: when the moved messages reach a limit of set_limits
+        """
+        previous = self._sink
+        self._sink = sink
+        self._counts = {}
+        self._count = 0
+        try:
+            for record in previous.records():
+                if not self._known(record[1], record[2], record[4], record[5]):
+                    self._store(record)
+        finally:
+            previous.close()
+
+    def close(self):
+        """close the sink, writing out what file sinks still hold
+        """
+        self._sink.close()
+
+    def set_baseline(self, baseline, skip_rules=False):
+        """drop the messages of known findings from now on.  Messages added before
+        are only checked when they are moved with set_sink
+
+        Args:
+            baseline (Baseline): known findings, None to keep every message
+            skip_rules (bool): skip the rules the baseline has findings of for an
+                individual or family, see skip_rule
+        """
+        self._baseline = baseline
+        self._skip_rules = skip_rules and baseline is not None
+
+    def set_limits(self, max_errors=None, fail_fast=None):
+        """stop with ValidationStopped when a message reaches a limit.  Messages
+        left out by the baseline don't count
+
+        Args:
+            max_errors (int): number of messages to stop at, None for no maximum
+            fail_fast (iterable): user stories (e.g. US01 or PARSE) to stop at the first message of
+        """
+        self._max_errors = max_errors
+        self._fail_fast = frozenset(fail_fast or ())
+        self._limited = max_errors is not None or bool(self._fail_fast)
 
-    def __init__(self):
-        self._messages = []
+    def get_baseline(self):
+        """returns the baseline of known findings, None when there is none
+        """
+        return self._baseline
 
-    def add_message(self, error_id: str, user_story: str, user_identifier: str, name: str, message: str):
+    def get_skip_rules(self):
+        """returns whether rules are skipped for known findings, see skip_rule
+        """
+        return self._skip_rules
+
+    def skip_rule(self, user_stories, user_identifier):
+        """returns whether a rule can be skipped for an individual or family because
+        the baseline has findings of its user stories for it.  Only when rule
+        skipping is on
+
+        Args:
+            user_stories (tuple): user stories the rule reports
+            user_identifier (str): id of the individual or family
+        Returns:
+            bool
+        """
+        return self._skip_rules and self._baseline.has_findings(user_stories, user_identifier)
+
+    def set_span_lookup(self, span_lookup):
+        """sets how the source span of a message's individual or family is found.
+        Messages added afterwards get a "span" entry when the span is known
+
+        Args:
+            span_lookup: (callable) takes the id of an individual or family, returns (start, end) or None
+        """
+        self._span_lookup = span_lookup
+
+    def add_message(self, error_id: str, user_story: str, user_identifier: str, name: str, message: str,
+                    span: tuple = None, args: tuple = None):
         """add a new message.  Make sure to include the id of the person or family.
         If it's a person include their name
 
         Args:
             user_identifier: (str) identifier string of the individual or family
             name: (str) name of individual or family
-            message: (str) validation error message
+            message: (str) validation error message, a % template when args are given
             error_id: (str) Class of error that this affects. Either INDIVIDUAL or FAMILY
             user_story: (str) user story id
+            span: (tuple) byte offsets (start, end) of the source, looked up by user_identifier when not given
+            args: (tuple) arguments of the message template, formatted when the message is read
+        Raises:
+            ValidationStopped: when the message reaches a limit of set_limits
+        """
+        if self._known(user_story, user_identifier, message, args):
+            return
+        if span is None and self._span_lookup is not None:
+            span = self._span_lookup(user_identifier)
+        if args is not None:
+            message = intern(message)
+        self._store((error_id, user_story, user_identifier, name, message, args, span))
+
+    def _known(self, user_story, user_identifier, message, args):
+        """returns whether a message is a known finding of the baseline
+        """
+        return self._baseline is not None and self._baseline.check(
+            user_story, user_identifier, message if args is None else message % args)
+
+    def _store(self, record):
+        """add a record tuple to the sink and count it
+        Raises:
+            ValidationStopped: when the message reaches a limit
+        """
+        self._sink.add(record)
+        self._counts[record[1]] = self._counts.get(record[1], 0) + 1
+        self._count += 1
+        if self._limited:
+            if record[1] in self._fail_fast:
+                raise ValidationStopped(self, "fail fast on %s %s" % (record[1], record[2]))
+            if self._max_errors is not None and self._count >= self._max_errors:
+                raise ValidationStopped(self, "--max-errors %i reached" % self._count)
+
+    def add_parse_error(self, line, offset, end, message, text):
+        """add a syntax error found while parsing the file
+
+        Args:
+            line: (int) line number of the error
+            offset: (int) byte offset of the start of the line
+            end: (int) byte offset just after the line
+            message: (str) error message
+            text: (str) the line that caused the error
         """
-        self._messages.append({
-            "error_id": error_id,
-            "user_story": user_story,
-            "user_id": user_identifier,
-            "name": name,
-            "message": message
-        })
+        self.add_message(self.PARSE_ERROR_ID, self.PARSE_USER_STORY, "line %i" % line, "NA",
+                         "%s at byte offset %i: %s", (offset, end), (message, offset, text))
 
     def get_messages(self):
         """returns all the messages.  Each message is a dict with an attribute "message".
+        The messages are formatted into a new list on every call, see iter_messages.
+        Only the examples are returned in summary mode
         """
-        return self._messages
+        return list(self.iter_messages())
 
-    def print_all(self):
-        """print all messages sorted by id of individual or family
+    def iter_messages(self, by_story=False):
+        """yields the messages as dicts one at a time, formatting each as it is read
+
+        Args:
+            by_story (bool): order by user story instead of the order they were added
+        """
+        for record in self._sink.records(by_story):
+            yield render(record)
+
+    def get_count(self):
+        """returns the number of messages
+        """
+        return self._count
+
+    def get_counts(self):
+        """returns the number of messages of each user story
+        Returns:
+            dict user story: int
         """
-        messages = sorted(self._messages, key=lambda msg: msg['user_story'])
+        return dict(self._counts)
 
+    def get_summary(self):
+        """returns the message counts of summary mode, None when all messages are kept
+        Returns:
+            (string, string, int)[] user story, error id and number of messages
+        """
+        if isinstance(self._sink, SummarySink):
+            return self._sink.get_summary()
+        return None
+
+    def print_all(self):
+        """print all messages sorted by id of individual or family.  In summary
+        mode the counts are printed first and only the examples are listed
+        """
+        # loaded lazily so validation only runs never import prettytable
+        from prettytable import PrettyTable
+        summary = self.get_summary()
+        if summary is not None:
+            summary_table = PrettyTable(["Error Type", "User Story", "Count"])
+            for story, error_id, count in summary:
+                summary_table.add_row([error_id, story, count])
+            print(summary_table)
+            print("Examples")
         pretty_table = PrettyTable(
             ["Error Type", "User Story", "ID", "Name", "Message"])
-        for message in messages:
+        for message in self.iter_messages(by_story=True):
             pretty_table.add_row(
                 [message["error_id"], message["user_story"], message["user_id"], message["name"], message["message"]])
 
         print(pretty_table)
+
+    def print_lines(self):
+        """print all messages sorted by user story as tab separated lines.
+        Used for validation only runs where no table output is wanted.  In summary
+        mode every error type and user story starts with a line of its count
+        """
+        summary = self.get_summary()
+        if summary is not None:
+            examples = {}
+            for message in self.iter_messages(by_story=True):
+                examples.setdefault((message["user_story"], message["error_id"]), []).append(message)
+            for story, error_id, count in summary:
+                print("%s\t%s\t%i messages" % (story, error_id, count))
+                for message in examples.get((story, error_id), ()):
+                    print("\t".join([message["user_story"], message["error_id"], message["user_id"],
+                                     message["name"], message["message"]]))
+            return
+        for message in self.iter_messages(by_story=True):
+            print("\t".join([message["user_story"], message["error_id"], message["user_id"],
+                             message["name"], message["message"]]))
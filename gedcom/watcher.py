@@ -0,0 +1,180 @@
+"""Watcher
+Reloads long lived trees in the background when their gedcom file changes
+
+FileWatcher polls a file's size and modification time.  TreeHolder keeps the
+current tree of a file together with a version number.  A reload builds a complete
+new tree on a background thread while readers keep getting the old one, then the
+reference is swapped in a single assignment.
+"""
+import os
+import threading
+import time
+
+
+class FileWatcher(object):
+    """FileWatcher
+    Polls a file for size or modification time changes, no external dependencies
+
+    Args:
+        filename (string): file to watch
+        on_change (callable): called with the file name after every change
+        interval (float): seconds between polls
+    """
+
+    def __init__(self, filename, on_change, interval=1.0):
+        self.filename = filename
+        self.interval = interval
+        self._on_change = on_change
+        self._last_stat = self._stat()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _stat(self):
+        """returns (mtime in ns, size) or None when the file is missing
+        """
+        try:
+            stat = os.stat(self.filename)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def check(self):
+        """poll once and call on_change if the file changed since the last poll.
+        A missing file (e.g. while being replaced) is not a change
+
+        Returns:
+            bool True if the file changed
+        """
+        stat = self._stat()
+        if stat is None or stat == self._last_stat:
+            return False
+        self._last_stat = stat
+        self._on_change(self.filename)
+        return True
+
+    def start(self):
+        """start polling on a daemon thread
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll, name="watch " + self.filename)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """stop polling and wait for the thread to finish
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _poll(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+
+class TreeHolder(object):
+    """TreeHolder
+    Versioned reference to the current tree of a gedcom file.  get() never waits
+    for a reload, it returns whichever tree is current.  Reloads are numbered when
+    they start and the result of one that finishes after a later started reload is
+    dropped, so older content never replaces a newer tree
+
+    Args:
+        filename (string): gedcom file
+        loader (callable): builds a tree from a file name, e.g. daemon.LoadedTree
+    Attributes:
+        version (int): number of trees loaded so far, starting at 1
+        last_error (Exception): error of the last failed reload or None
+    """
+
+    def __init__(self, filename, loader):
+        self.filename = filename
+        self._loader = loader
+        self._tree = loader(filename)
+        self.version = 1
+        self.last_error = None
+        self._lock = threading.Lock()
+        # number of the last reload started and of the last one whose result was kept
+        self._started = 0
+        self._finished = 0
+        self._reloading = False
+        self._pending = False
+        self._thread = None
+
+    def get(self):
+        """returns the current tree
+        """
+        return self._tree
+
+    def reload(self):
+        """load the file again on the calling thread and swap the new tree in.
+        On failure the current tree is kept and the error is recorded in last_error
+        and raised.  Results of a reload that a later started reload already
+        finished before are dropped
+
+        Returns:
+            tree the new current tree
+        """
+        with self._lock:
+            self._started += 1
+            generation = self._started
+        try:
+            tree = self._loader(self.filename)
+        except Exception as err:
+            with self._lock:
+                if generation > self._finished:
+                    self._finished = generation
+                    self.last_error = err
+            raise
+        with self._lock:
+            if generation > self._finished:
+                self._finished = generation
+                self._tree = tree
+                self.version += 1
+                self.last_error = None
+            return self._tree
+
+    def reload_async(self):
+        """reload on a background thread.  Changes that arrive while a reload is
+        running are coalesced into one more reload once it finishes
+        """
+        with self._lock:
+            if self._reloading:
+                self._pending = True
+                return
+            self._reloading = True
+            self._thread = threading.Thread(target=self._background_reload, name="reload " + self.filename)
+            self._thread.daemon = True
+            self._thread.start()
+
+    def wait(self, timeout=None):
+        """wait for a running background reload to finish, mostly for tests
+
+        Returns:
+            bool True if no reload is running anymore
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            thread = self._thread
+            if thread is None:
+                return True
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            thread.join(remaining)
+            if thread.is_alive():
+                return False
+            if self._thread is thread:
+                return True
+
+    def _background_reload(self):
+        while True:
+            try:
+                self.reload()
+            except Exception:  # keep serving the old tree whatever went wrong, reload recorded the error
+                pass
+            with self._lock:
+                if not self._pending:
+                    self._reloading = False
+                    self._thread = None
+                    return
+                self._pending = False
@@ -0,0 +1,244 @@
+"""Writer
+Writes People and Families back out as a GEDCOM 5.5.1 file
+
+Records are written from the Person and Family fields, the facts kept while
+parsing and, when they were kept, the unrecognized lines of the ExtraTags store,
+so a parsed file written back out parses to the same entities.  Lines are
+collected per record and written to a binary file in large utf-8 encoded chunks.
+
+Only individuals and families are written, other records (SOUR, NOTE, ...) of
+the source file aren't kept by the parser.
+"""
+
+MONTHS = ("JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC")
+# longest value written on one line before it is continued with CONC
+MAX_VALUE_LENGTH = 200
+# lines collected before they are encoded and written
+CHUNK_LINES = 1 << 15
+HEADER = ("0 HEAD", "1 SOUR ssw-555-gedcom", "1 GEDC", "2 VERS 5.5.1", "2 FORM LINEAGE-LINKED", "1 CHAR UTF-8")
+
+# tags of the level 1 lines stored in Person and Family fields
+PERSON_FIELDS = ("NAME", "SEX", "FAMC", "FAMS")
+FAMILY_FIELDS = ("HUSB", "WIFE", "CHIL")
+# field lines a record has at most one of
+SINGLE_FIELDS = ("NAME", "SEX", "HUSB", "WIFE")
+
+
+def format_date(date):
+    """returns a datetime as a gedcom date, e.g. 6 MAR 1917
+    """
+    return "%i %s %i" % (date.day, MONTHS[date.month - 1], date.year)
+
+
+def split_value(value, max_length=MAX_VALUE_LENGTH):
+    """split a value into the first line and its continuation lines.  New lines
+    start CONT lines and long lines are cut into CONC lines, never next to a
+    space as some readers strip them
+
+    Args:
+        value (string): value to write
+        max_length (int): longest value on one line
+    Returns:
+        (string, [(string, string)]) first line and (CONT or CONC, value) continuations
+    """
+    continuations = []
+    first = None
+    for text in value.split("\n"):
+        tag = "CONT"
+        while True:
+            cut = len(text)
+            if cut > max_length:
+                cut = max_length
+                while cut > 1 and (text[cut - 1] == " " or text[cut] == " "):
+                    cut -= 1
+            if first is None:
+                first = text[:cut]
+            else:
+                continuations.append((tag, text[:cut]))
+            text = text[cut:]
+            tag = "CONC"
+            if not text:
+                break
+    return first, continuations
+
+
+class GedcomWriter(object):
+    """GedcomWriter
+    Streams records to a binary file
+
+    Args:
+        out (file): file opened in binary mode
+        extras (ExtraTags): unrecognized lines to write back, None for none
+        newline (string): line ending
+    """
+
+    def __init__(self, out, extras=None, newline="\n"):
+        self._out = out
+        self._extras = extras
+        self._newline = newline
+        self._lines = []
+
+    def _line(self, level, tag, value=""):
+        """add a line, continuing long and multi line values
+        """
+        if len(value) <= MAX_VALUE_LENGTH and "\n" not in value:
+            self._lines.append("%i %s %s" % (level, tag, value) if value else "%i %s" % (level, tag))
+            return
+        first, continuations = split_value(value)
+        self._lines.append("%i %s %s" % (level, tag, first) if first else "%i %s" % (level, tag))
+        for cont_tag, text in continuations:
+            self._lines.append("%i %s %s" % (level + 1, cont_tag, text) if text else "%i %s" % (level + 1, cont_tag))
+
+    def _end_record(self):
+        """write the collected lines once there are enough of them
+        """
+        if len(self._lines) >= CHUNK_LINES:
+            self.flush()
+
+    def flush(self):
+        """encode and write the collected lines
+        """
+        if self._lines:
+            self._lines.append("")
+            self._out.write(self._newline.join(self._lines).encode("utf-8"))
+            self._lines = []
+
+    def write_header(self):
+        """write the HEAD record
+        """
+        for line in HEADER:
+            self._lines.append(line)
+
+    def write_trailer(self):
+        """write the TRLR record and flush
+        """
+        self._lines.append("0 TRLR")
+        self.flush()
+
+    def _kept_subtrees(self, record):
+        """returns the kept lines of a record (facts merged with extras in file order)
+        split into the subtrees of their level 1 lines
+        """
+        facts = record.get_facts()
+        extras = [] if self._extras is None else self._extras.get_lines(record)
+        subtrees = []
+        extra_idx = 0
+        for fact_idx in range(len(facts) + 1):
+            while extra_idx < len(extras) and extras[extra_idx][0] <= fact_idx:
+                line = extras[extra_idx][1:]
+                extra_idx += 1
+                if line[0] == 1 or not subtrees:
+                    subtrees.append([line])
+                else:
+                    subtrees[-1].append(line)
+            if fact_idx < len(facts):
+                line = facts[fact_idx]
+                if line[0] == 1 or not subtrees:
+                    subtrees.append([line])
+                else:
+                    subtrees[-1].append(line)
+        return subtrees
+
+    def _write_record(self, field_tags, fields, dates, subtrees):
+        """write the lines of a record.  Field lines without a kept subtree come
+        first, then the kept subtrees in file order with the field values and the
+        event dates put back in
+
+        Args:
+            field_tags (tuple): tags of the record's field lines
+            fields (list): (tag, value) of the level 1 field lines in writing order
+            dates (dict): event tag: date or None of the dated events
+            subtrees (list): kept subtrees of the record
+        """
+        fields_left = list(fields)
+        # id of a subtree of a field line: value to write
+        anchored = {}
+        for subtree in subtrees:
+            tag, value = subtree[0][1], subtree[0][2]
+            if (tag, value) in fields_left:
+                fields_left.remove((tag, value))
+                anchored[id(subtree)] = value
+            elif tag in SINGLE_FIELDS:
+                # the field was changed since it was parsed
+                for field in fields_left:
+                    if field[0] == tag:
+                        fields_left.remove(field)
+                        anchored[id(subtree)] = field[1]
+                        break
+
+        kept_events = set(subtree[0][1] for subtree in subtrees if subtree[0][0] == 1)
+        dates_left = {}
+        for tag, value in fields_left:
+            self._line(1, tag, value)
+        for tag, date in dates.items():
+            if date is None:
+                continue
+            if tag in kept_events:
+                dates_left[tag] = date
+            else:
+                self._line(1, tag)
+                self._line(2, "DATE", format_date(date))
+
+        for subtree in subtrees:
+            level, tag, value = subtree[0]
+            if tag in field_tags and level == 1 and id(subtree) not in anchored:
+                # the field line was removed since it was parsed
+                continue
+            self._line(level, tag, anchored.get(id(subtree), value))
+            if level == 1 and tag in dates_left:
+                self._line(2, "DATE", format_date(dates_left.pop(tag)))
+            for line in subtree[1:]:
+                self._line(*line)
+        self._end_record()
+
+    def write_person(self, person):
+        """write the INDI record of a person
+        """
+        self._lines.append("0 %s INDI" % person.get_person_id())
+        fields = []
+        if person.get_name():
+            fields.append(("NAME", person.get_name()))
+        if person.get_gender():
+            fields.append(("SEX", person.get_gender()))
+        fields.extend(("FAMC", fam_id) for fam_id in person.get_children_of_families())
+        fields.extend(("FAMS", fam_id) for fam_id in person.get_spouse_of_families())
+        self._write_record(PERSON_FIELDS, fields, {"BIRT": person.get_birth_date(), "DEAT": person.get_death_date()},
+                           self._kept_subtrees(person))
+
+    def write_family(self, family):
+        """write the FAM record of a family
+        """
+        self._lines.append("0 %s FAM" % family.get_family_id())
+        fields = []
+        if family.get_husband_id():
+            fields.append(("HUSB", family.get_husband_id()))
+        if family.get_wife_id():
+            fields.append(("WIFE", family.get_wife_id()))
+        fields.extend(("CHIL", child_id) for child_id in family.get_children())
+        self._write_record(FAMILY_FIELDS, fields, {"MARR": family.get_married_date(), "DIV": family.get_divorced_date()},
+                           self._kept_subtrees(family))
+
+
+def write_file(filename, peeps, fam, person_ids=None, family_ids=None, newline="\n"):
+    """write individuals and families to a gedcom file
+
+    Args:
+        filename (string): output path
+        peeps (People): individuals, their ExtraTags store is written too when it was kept
+        fam (Families): families
+        person_ids (iterable): ids of the individuals to write in that order, None for all
+        family_ids (iterable): ids of the families to write in that order, None for all
+        newline (string): line ending
+    """
+    if person_ids is None:
+        person_ids = peeps.individuals.keys()
+    if family_ids is None:
+        family_ids = fam.families.keys()
+    with open(filename, "wb") as out:
+        writer = GedcomWriter(out, peeps.get_extra_tags(), newline)
+        writer.write_header()
+        for person_id in person_ids:
+            writer.write_person(peeps.individuals[person_id])
+        for family_id in family_ids:
+            writer.write_family(fam.families[family_id])
+        writer.write_trailer()